@@ -96,8 +96,11 @@ class ProjectRunner:
             # Mostrar barra de progresso animada
             self.mostrar_barra_progresso()
 
-            # Comando para executar ETL - executa apenas o main.py sem argumentos específicos
-            cmd = [sys.executable, 'tce_back/main.py']
+            # Comando para executar ETL - "completo" roda a carga inteira, senão apenas o loader informado.
+            # Pela fila_carga, para não repetir o trabalho de outra execução em andamento (ex.: dashboard)
+            cmd = [sys.executable, 'tce_back/main.py', '--fila']
+            if tipo_dado != "completo":
+                cmd.append(tipo_dado)
 
             # Executar com timeout
             result = subprocess.run(
@@ -109,7 +112,9 @@ class ProjectRunner:
             )
 
             if result.returncode == 0:
-                print("✅ ETL concluído com sucesso!"                print("📊 Dados atualizados e prontos para visualização"                return True
+                print("✅ ETL concluído com sucesso!")
+                print("📊 Dados atualizados e prontos para visualização")
+                return True
             else:
                 print(f"❌ Erro na execução do ETL {tipo_dado}")
                 print(f"Saída de erro: {result.stderr}")
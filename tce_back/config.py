@@ -9,3 +9,100 @@ DB_CONFIG = {
     "host": os.getenv("DB_HOST", "localhost"),
     "port": os.getenv("DB_PORT", "5432")
 }
+
+# Cliente HTTP compartilhado (keep-alive e política única de retry/timeout)
+HTTP_CONFIG = {
+    "pool_connections": int(os.getenv("HTTP_POOL_CONNECTIONS", "4")),
+    "pool_maxsize": int(os.getenv("HTTP_POOL_MAXSIZE", "16")),
+    "timeout": float(os.getenv("HTTP_TIMEOUT", "30")),
+    "retries": int(os.getenv("HTTP_RETRIES", "5")),
+    "backoff_factor": float(os.getenv("HTTP_BACKOFF_FACTOR", "2")),
+}
+
+# Motor de busca assíncrono: requisições simultâneas por endpoint e no total
+FETCH_CONFIG = {
+    "por_endpoint": int(os.getenv("FETCH_CONCORRENCIA_ENDPOINT", "8")),
+    "limite_global": int(os.getenv("FETCH_CONCORRENCIA_GLOBAL", "16")),
+    "concorrente": os.getenv("FETCH_CONCORRENTE", "0") == "1",
+}
+
+# Armazenamento local das respostas brutas da API (modos: off, gravar, cache, replay)
+RAW_STORE_CONFIG = {
+    "diretorio": os.getenv("RAW_STORE_DIR", os.path.join("data", "raw_api")),
+    "modo": os.getenv("RAW_STORE_MODO", "off"),
+    "retencao_dias": int(os.getenv("RAW_STORE_RETENCAO_DIAS", "30")),
+}
+
+# Escrita em lote das tabelas fato (métodos: copy, values, linha)
+BULK_CONFIG = {
+    "metodo": os.getenv("ETL_BULK_METODO", "copy"),
+    "tamanho_lote": int(os.getenv("ETL_BULK_LOTE", "500")),
+}
+
+# Pool de conexões do engine SQLAlchemy compartilhado (um por processo)
+DB_POOL_CONFIG = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1") == "1",
+}
+
+# Modo de atualização: recarrega os últimos N meses já processados de cada tipo_dado (0 desativa o tipo).
+# ETL_REFRESH_JANELAS sobrepõe a janela padrão por tipo, ex.: "receita=6,notas_empenho=2".
+REFRESH_CONFIG = {
+    "ativo": os.getenv("ETL_REFRESH", "0") == "1",
+    # Recarrega todas as partições selecionadas, não só a janela recente (main.py --forcar)
+    "forcar": os.getenv("ETL_FORCAR", "0") == "1",
+    "meses_padrao": int(os.getenv("ETL_REFRESH_MESES", "3")),
+    "janelas": {
+        tipo.strip(): int(meses)
+        for tipo, meses in (
+            item.split("=") for item in os.getenv("ETL_REFRESH_JANELAS", "").split(",") if "=" in item
+        )
+    },
+}
+
+# Fila de trabalho distribuída (fila_carga): lease de cada job, intervalo do heartbeat, tentativas e espera do worker ocioso
+FILA_CONFIG = {
+    "lease_segundos": int(os.getenv("ETL_FILA_LEASE", "300")),
+    "heartbeat_segundos": int(os.getenv("ETL_FILA_HEARTBEAT", "60")),
+    "max_tentativas": int(os.getenv("ETL_FILA_TENTATIVAS", "3")),
+    "espera_segundos": int(os.getenv("ETL_FILA_ESPERA", "5")),
+}
+
+def faixa_inteiros(valor):
+    """Converte "2023-2024,2026" em [2023, 2024, 2026]; vazio retorna lista vazia."""
+    numeros = []
+    for parte in (valor or "").split(","):
+        parte = parte.strip()
+        if not parte:
+            continue
+        inicio, _, fim = parte.partition("-")
+        numeros.extend(range(int(inicio), int(fim or inicio) + 1))
+    return sorted(set(numeros))
+
+# Recorte do período carregado (main.py --anos/--meses); vazio mantém o período padrão de cada loader
+PERIODO_CONFIG = {
+    "anos": faixa_inteiros(os.getenv("ETL_ANOS", "")),
+    "meses": faixa_inteiros(os.getenv("ETL_MESES", "")),
+}
+
+# Métricas do ETL: além da tabela etl_metrics, arquivo opcional no formato do Prometheus (textfile collector)
+METRICAS_CONFIG = {
+    "arquivo": os.getenv("ETL_METRICAS_ARQUIVO", ""),
+}
+
+# Logs do ETL: nível (main.py --verbose usa DEBUG) e formato ("texto" ou "json", uma linha por evento)
+LOG_CONFIG = {
+    "nivel": os.getenv("ETL_LOG_NIVEL", "INFO").upper(),
+    "formato": os.getenv("ETL_LOG_FORMATO", "texto"),
+}
+
+# Exportação Parquet das tabelas de fatos (main.py --exportar-parquet): diretório, linhas por lote do cursor
+# do servidor (um row group por lote) e compressão
+EXPORTACAO_CONFIG = {
+    "diretorio": os.getenv("ETL_EXPORTACAO_DIR", "data/parquet"),
+    "linhas_por_lote": int(os.getenv("ETL_EXPORTACAO_LOTE", "50000")),
+    "compressao": os.getenv("ETL_EXPORTACAO_COMPRESSAO", "zstd"),
+}
@@ -13,6 +13,7 @@ from etl_interface import (
     ping_db,
     ping_api,
     get_ultima_execucao_por_tipo,
+    get_estatisticas_pool,
 )
 
 st.set_page_config(page_title="Painel ETL - Dossiê", layout="wide")
@@ -57,6 +58,11 @@ with col_ok1:
     st.metric("DB", "OK" if ping_db() else "ERRO")
 with col_ok2:
     st.metric("API", "OK" if ping_api() else "ERRO")
+pool = get_estatisticas_pool()
+st.sidebar.caption(
+    f"Pool do banco: {pool['pico_em_uso']}/{pool['capacidade']} conexões no pico, "
+    f"{pool['checkouts']} checkouts, {pool['conexoes_abertas']} abertas"
+)
 
 st.header("1️⃣ Progresso por Tipo de Dado")
 df_prog = load_progresso_df()
@@ -165,9 +171,26 @@ if st.button("🔍 Mostrar Municípios Pendentes"):
 st.header("3️⃣ Executar Função ETL Manualmente")
 
 funcao = st.selectbox("Escolher função", load_funcoes(), index=0 if load_funcoes() else None)
+col_mun, col_anos, col_meses = st.columns(3)
+with col_mun:
+    municipios_sel = st.text_input("Municípios", "", help="Códigos separados por vírgula (ex.: 002,057); vazio = todos")
+with col_anos:
+    anos_sel = st.text_input("Anos", "", help="Ex.: 2024 ou 2023-2024; vazio = período padrão")
+with col_meses:
+    meses_sel = st.text_input("Meses", "", help="Ex.: 1-3,12; vazio = todos")
+forcar = st.checkbox("Recarregar partições já carregadas", value=False)
 if st.button("▶️ Executar Função"):
     try:
-        comando = ["python3", "main.py", funcao]
+        # Pela fila_carga, execuções sobrepostas (outro clique, agendamento) não repetem trabalho
+        comando = ["python3", "main.py", funcao, "--fila"]
+        if municipios_sel.strip():
+            comando += ["--municipios", municipios_sel.strip()]
+        if anos_sel.strip():
+            comando += ["--anos", anos_sel.strip()]
+        if meses_sel.strip():
+            comando += ["--meses", meses_sel.strip()]
+        if forcar:
+            comando.append("--forcar")
         with st.spinner(f"Executando {funcao}..."):
             inicio = time.time()
             resultado = subprocess.run(comando, capture_output=True, text=True)
@@ -1,45 +1,358 @@
 # api_client.py
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 import requests
-from config import API_BASE_URL
+from config import API_BASE_URL, HTTP_CONFIG, FETCH_CONFIG, RAW_STORE_CONFIG
+from metricas import get_metricas
+from data_extraction.response_store import ResponseStore
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from requests.exceptions import RequestException, SSLError
-import logging
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import MaxRetryError
+from requests.exceptions import RequestException
 
-def fetch_data(url):
-    """Faz a requisição à API e retorna os dados."""
-    retries = Retry(
-        total=5,
-        backoff_factor=2,
-        status_forcelist=[429, 500, 502, 503, 504],
-        connect=5,
-        read=5
+logger = logging.getLogger(__name__)
+
+# Marca as threads do FetchEngine: nelas a paginação não faz prefetch, para que cada busca ocupe uma
+# única requisição em voo dentro dos limites do motor (por endpoint e global)
+_thread_motor = threading.local()
+
+class _ContadorConexoes:
+    """Conta requisições e conexões (sockets) abertas pelo pool do urllib3."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requisicoes = 0
+        self.conexoes_novas = 0
+
+    def incrementar(self, campo):
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + 1)
+
+    def classes_pool(self):
+        """Gera classes de pool cujas conexões notificam este contador."""
+        contador = self
+
+        def instrumentar(base):
+            class ConexaoContada(base):
+                def connect(self):
+                    contador.incrementar("conexoes_novas")
+                    return super().connect()
+
+                def request(self, *args, **kwargs):
+                    contador.incrementar("requisicoes")
+                    return super().request(*args, **kwargs)
+
+            return ConexaoContada
+
+        class PoolHTTP(HTTPConnectionPool):
+            ConnectionCls = instrumentar(HTTPConnection)
+
+        class PoolHTTPS(HTTPSConnectionPool):
+            ConnectionCls = instrumentar(HTTPSConnection)
+
+        return {"http": PoolHTTP, "https": PoolHTTPS}
+
+def _retries(response):
+    """Quantidade de novas tentativas feitas pelo urllib3 até obter a resposta."""
+    retries = getattr(response.raw, "retries", None)
+    return len(retries.history) if retries is not None else 0
+
+class _Retry(Retry):
+    """Retry do urllib3 que anota no MaxRetryError o status da última tentativa e quantos retries foram feitos.
+
+    O urllib3 descarta o histórico ao esgotar as tentativas; sem ele, um RetryError por 429 (limite de
+    requisições da API) seria indistinguível de um por 5xx.
+    """
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        try:
+            return super().increment(method, url, response, error, _pool, _stacktrace)
+        except MaxRetryError as e:
+            e.ultimo_status = response.status if response is not None else None
+            e.retries = len(self.history)
+            raise
+
+class TCEClient:
+    """Cliente HTTP compartilhado: uma sessão com keep-alive, pool de conexões e política única de retry/timeout."""
+
+    def __init__(self, pool_connections=None, pool_maxsize=None, timeout=None, retries=None, backoff_factor=None, store=None):
+        self.store = store or ResponseStore(**RAW_STORE_CONFIG)
+        self.timeout = timeout if timeout is not None else HTTP_CONFIG["timeout"]
+        total = retries if retries is not None else HTTP_CONFIG["retries"]
+        retry = _Retry(
+            total=total,
+            backoff_factor=backoff_factor if backoff_factor is not None else HTTP_CONFIG["backoff_factor"],
+            status_forcelist=[429, 500, 502, 503, 504],
+            connect=total,
+            read=total
+        )
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections or HTTP_CONFIG["pool_connections"],
+            pool_maxsize=pool_maxsize or HTTP_CONFIG["pool_maxsize"],
+            max_retries=retry
+        )
+        self.contador = _ContadorConexoes()
+        self.adapter.poolmanager.pool_classes_by_scheme = self.contador.classes_pool()
+        self.session = requests.Session()
+        self.session.verify = False  # Desabilitando SSL por enquanto
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+    def get(self, url, params=None):
+        """Faz a requisição GET e retorna o JSON (ou None em caso de falha).
+
+        Conforme o modo do armazenamento local, a resposta pode vir do disco e/ou ser gravada nele.
+        """
+        if self.store.modo in ("cache", "replay"):
+            encontrado, data = self.store.ler(url, params)
+            if encontrado:
+                logger.debug(f"Resposta lida do armazenamento local: {url}")
+                return data
+            if self.store.modo == "replay":
+                logger.error(f"Resposta ausente no armazenamento local (modo replay): {url} {params or ''}")
+                return None
+
+        endpoint = endpoint_da_url(url)
+        inicio = time.perf_counter()
+        response = None
+        try:
+            logger.debug(f"Fazendo requisição para: {url}")
+            response = self.session.get(url, params=params, timeout=self.timeout)
+            latencia = time.perf_counter() - inicio
+            response.raise_for_status()  # Levanta exceção para qualquer status de erro HTTP
+            inicio_decode = time.perf_counter()
+            data = response.json()  # Processa a resposta JSON
+            get_metricas().registrar_requisicao(
+                endpoint, latencia, response.status_code, len(response.content),
+                time.perf_counter() - inicio_decode, _retries(response)
+            )
+
+            # Verifica se os dados retornados são válidos
+            if not data:
+                logger.debug(f"Nenhum dado retornado de: {url}")
+            else:
+                logger.debug(f"Dados retornados com sucesso de: {url}")
+
+            if self.store.modo in ("gravar", "cache"):
+                self.store.gravar(url, params, data)
+            return data
+
+        except requests.exceptions.JSONDecodeError as e:
+            # Subclasse de RequestException (requests 2.27+): tratada antes para ser contada como erro de JSON
+            get_metricas().registrar_requisicao(
+                endpoint, latencia, response.status_code, len(response.content),
+                time.perf_counter() - inicio_decode, _retries(response), erro="json"
+            )
+            logger.error(f"Erro ao decodificar o JSON da resposta: {e}")
+            return None
+
+        except requests.exceptions.RequestException as e:
+            if response is not None:
+                get_metricas().registrar_requisicao(
+                    endpoint, latencia, response.status_code, len(response.content), retries=_retries(response)
+                )
+            elif isinstance(e, requests.exceptions.RetryError):
+                # Retries esgotados em status da status_forcelist: classificado pelo status da última tentativa
+                esgotado = e.args[0]
+                status = getattr(esgotado, "ultimo_status", None)
+                get_metricas().registrar_requisicao(
+                    endpoint, time.perf_counter() - inicio, status, retries=getattr(esgotado, "retries", 0),
+                    erro=None if status else "rede"
+                )
+            else:
+                # Sem resposta: falha de rede
+                get_metricas().registrar_requisicao(endpoint, time.perf_counter() - inicio, erro="rede")
+            logger.error(f"Falha na requisição para: {url} - {e}")
+            return None
+
+    def estatisticas_conexoes(self):
+        """Retorna quantas requisições foram feitas e quantas conexões foram abertas ou reutilizadas."""
+        requisicoes = self.contador.requisicoes
+        novas = self.contador.conexoes_novas
+        return {
+            "requisicoes": requisicoes,
+            "conexoes_novas": novas,
+            "conexoes_reutilizadas": max(requisicoes - novas, 0),
+        }
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Retorna o cliente compartilhado do processo (recriado após fork)."""
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = TCEClient()
+            _client_pid = os.getpid()
+        return _client
+
+def log_estatisticas_conexoes():
+    """Imprime o resumo de reutilização de conexões do cliente compartilhado."""
+    stats = get_client().estatisticas_conexoes()
+    logger.info(
+        f"Conexões HTTP: {stats['requisicoes']} requisições, "
+        f"{stats['conexoes_novas']} conexões novas, {stats['conexoes_reutilizadas']} reutilizadas."
     )
-    session = requests.Session()
-    session.mount('https://', HTTPAdapter(max_retries=retries))
+    return stats
+
+def fetch_data(url, params=None):
+    """Faz a requisição à API e retorna os dados."""
+    return get_client().get(url, params)
+
+class FetchEngine:
+    """Motor de busca assíncrono: mantém até N requisições em voo por endpoint, respeitando um limite global.
+
+    As requisições continuam passando pelo cliente compartilhado (pool de conexões); o asyncio
+    apenas controla quantas ficam em voo, e os resultados são entregues na thread chamadora.
+    """
+
+    def __init__(self, por_endpoint=None, limite_global=None):
+        self.por_endpoint = por_endpoint or FETCH_CONFIG["por_endpoint"]
+        self.limite_global = limite_global or FETCH_CONFIG["limite_global"]
 
+    def executar(self, endpoint, itens, buscar, consumir):
+        """Executa buscar(item) em paralelo e chama consumir(item, resultado) conforme cada busca termina.
+
+        `endpoint` é o nome do endpoint ou uma função item -> endpoint, usada para agrupar os limites.
+        Retorna a quantidade de itens cuja busca falhou.
+        """
+        return asyncio.run(self._executar(endpoint, itens, buscar, consumir))
+
+    @staticmethod
+    def _buscar(buscar, item):
+        _thread_motor.ativo = True
+        return buscar(item)
+
+    async def _executar(self, endpoint, itens, buscar, consumir):
+        loop = asyncio.get_running_loop()
+        limite_global = asyncio.Semaphore(self.limite_global)
+        limites_endpoint = {}
+        falhas = 0
+
+        def nome_endpoint(item):
+            return endpoint(item) if callable(endpoint) else endpoint
+
+        async def tarefa(item, executor):
+            nome = nome_endpoint(item)
+            limite = limites_endpoint.setdefault(nome, asyncio.Semaphore(self.por_endpoint))
+            async with limite_global, limite:
+                try:
+                    return item, await loop.run_in_executor(executor, self._buscar, buscar, item), None
+                except Exception as e:
+                    return item, None, e
+
+        # Janela limitada de tarefas pendentes para não acumular resultados em memória
+        janela = self.limite_global * 2
+        pendentes = set()
+        iterador = iter(itens)
+        with ThreadPoolExecutor(max_workers=self.limite_global) as executor:
+            while True:
+                for item in iterador:
+                    pendentes.add(asyncio.ensure_future(tarefa(item, executor)))
+                    if len(pendentes) >= janela:
+                        break
+                if not pendentes:
+                    break
+                concluidas, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+                for concluida in concluidas:
+                    item, resultado, erro = concluida.result()
+                    if erro is not None:
+                        falhas += 1
+                        logger.error(f"Falha na busca de {nome_endpoint(item)} {item}: {erro}")
+                        continue
+                    consumir(item, resultado)
+        return falhas
+
+def endpoint_da_url(url):
+    """Extrai o nome do endpoint (caminho) de uma URL da API."""
+    return urlparse(url).path.strip("/")
+
+def extrair_pagina(response):
+    """Normaliza as formas de resposta paginada da API em (registros, total informado ou None)."""
+    if not response:
+        return [], None
+
+    data = response.get("data") if isinstance(response, dict) else response
+    total = None
+    if isinstance(data, dict):
+        registros = data.get("data") or []
+        total = data.get("total")
+    elif isinstance(data, list):
+        registros = data
+    else:
+        registros = []
+
+    if total is None and isinstance(response, dict):
+        total = response.get("total")
     try:
-        print(f"[INFO] Fazendo requisição para: {url}")
-        response = session.get(url, verify=False, timeout=30)  # Desabilitando SSL por enquanto
-        response.raise_for_status()  # Levanta exceção para qualquer status de erro HTTP
-        data = response.json()  # Processa a resposta JSON
-
-        # Verifica se os dados retornados são válidos
-        if not data:
-            print(f"[WARNING] Nenhum dado retornado de: {url}")
-        else:
-            print(f"[INFO] Dados retornados com sucesso de: {url}")
-        return data
+        total = int(total) if total is not None else None
+    except (TypeError, ValueError):
+        total = None
+    return registros, total
+
+def paginas(url, params=None, quantidade=100, prefetch=None, inicio=0):
+    """Gera, sob demanda, as páginas de um endpoint paginado por deslocamento/quantidade.
+
+    Cada item é (registros, deslocamento após a página, total informado ou None), o que permite
+    gravar um checkpoint por página e retomar depois a partir de `inicio`. Para quando a API
+    informa o `total` e ele foi atingido; sem `total`, para na primeira página vazia ou incompleta.
+    Com `prefetch`, a próxima página é buscada em segundo plano enquanto a atual é consumida; por
+    padrão só fora das threads do FetchEngine, cujos limites contam uma requisição por busca.
+    Falhas de requisição levantam RequestException em vez de encerrar a paginação silenciosamente.
+    """
+    params = dict(params or {})
+    if prefetch is None:
+        prefetch = not getattr(_thread_motor, "ativo", False)
+
+    def buscar(deslocamento):
+        response = fetch_data(url, {**params, "quantidade": quantidade, "deslocamento": deslocamento})
+        if response is None:
+            raise RequestException(f"Falha ao buscar {url} (deslocamento={deslocamento})")
+        return extrair_pagina(response)
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        deslocamento = inicio
+        proxima = executor.submit(buscar, deslocamento) if executor else None
+        while True:
+            registros, total = proxima.result() if executor else buscar(deslocamento)
+            if not registros:
+                return
+
+            deslocamento += len(registros)
+            if total is not None:
+                fim = deslocamento >= total
+            else:
+                fim = len(registros) < quantidade
+
+            if not fim and executor:
+                proxima = executor.submit(buscar, deslocamento)
 
-    except requests.exceptions.RequestException as e:
-        print(f"[ERROR] Falha na requisição para: {url} - {e}")
-        logging.error(f"Falha na requisição para: {url} - {e}")
-        return None
+            yield registros, deslocamento, total
 
-    except ValueError as e:
-        print(f"[ERROR] Erro ao decodificar o JSON da resposta: {e}")
-        logging.error(f"Erro ao decodificar JSON da resposta para {url}: {e}")
-        return None
+            if fim:
+                return
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def paginar(url, params=None, quantidade=100, prefetch=None):
+    """Gera, sob demanda, os registros de um endpoint paginado (ver `paginas`)."""
+    for registros, _, _ in paginas(url, params, quantidade, prefetch):
+        yield from registros
 
 def get_all_municipios():
     """Obtém os dados de municípios."""
@@ -47,7 +360,7 @@ def get_all_municipios():
     
     # Caso a resposta seja None (erro de requisição), retorna uma lista vazia
     if municipios is None:
-        print("[ERROR] Não foi possível carregar os dados dos municípios.")
+        logger.error("Não foi possível carregar os dados dos municípios.")
         return []
     
     # Verificar se a resposta é um dicionário e contém a chave 'data'
@@ -56,12 +369,12 @@ def get_all_municipios():
     
     # Caso a resposta seja uma lista, retorna diretamente a lista
     elif isinstance(municipios, list):
-        print("[INFO] A resposta é uma lista, retornando como está.")
+        logger.debug("A resposta é uma lista, retornando como está.")
         return municipios
     
     # Caso a resposta seja inesperada, retorna uma lista vazia
     else:
-        print("[ERROR] Estrutura de resposta inesperada.")
+        logger.error("Estrutura de resposta inesperada.")
         return []
 
 def get_orgaos(codigo_municipio, exercicio_orcamento):
@@ -93,55 +406,29 @@ def get_despesas(codigo_municipio, exercicio_orcamento, data_referencia, desloca
 def get_agentes_publicos(codigo_municipio, exercicio_orcamento, deslocamento=0, quantidade=100):
     """Obtém dados de agentes públicos de um município."""
     endpoint = f"agentes_publicos?codigo_municipio={codigo_municipio}&exercicio_orcamento={exercicio_orcamento}&quantidade={quantidade}&deslocamento={deslocamento}"
-    session = requests.Session()
+    response_json = fetch_data(f"{API_BASE_URL}{endpoint}")
 
-    retries = Retry(
-        total=5,
-        backoff_factor=1,
-        status_forcelist=[500, 502, 503, 504],
-    )
-    session.mount("https://", HTTPAdapter(max_retries=retries))
+    if response_json is None:
+        return {"agentes": [], "total": 0}
 
-    try:
-        response = session.get(f"{API_BASE_URL}{endpoint}", timeout=10, verify=False)
-
-        response.raise_for_status()
-
-        response_json = response.json()
-
-        if isinstance(response_json, dict) and "data" in response_json:
-            data_section = response_json["data"]
-            if isinstance(data_section, dict) and "data" in data_section:
-                agentes = data_section["data"]
-                total = data_section.get("total", len(agentes))
-                print(f"[INFO] {len(agentes)} agentes públicos encontrados. Total esperado: {total}")
-                return {"agentes": agentes, "total": total}
-            elif isinstance(data_section, list):
-                print(f"[INFO] Dados retornados em formato de lista.")
-                return {"agentes": data_section, "total": len(data_section)}
-            else:
-                print(f"[WARNING] Estrutura inesperada de 'data': {data_section}")
-                return {"agentes": [], "total": 0}
-        elif isinstance(response_json, list):
-            print(f"[WARNING] Retorno inesperado em formato de lista: {response_json}")
-            return {"agentes": response_json, "total": len(response_json)}
+    if isinstance(response_json, dict) and "data" in response_json:
+        data_section = response_json["data"]
+        if isinstance(data_section, dict) and "data" in data_section:
+            agentes = data_section["data"]
+            total = data_section.get("total", len(agentes))
+            logger.debug(f"{len(agentes)} agentes públicos encontrados. Total esperado: {total}")
+            return {"agentes": agentes, "total": total}
+        elif isinstance(data_section, list):
+            logger.debug(f"Dados retornados em formato de lista.")
+            return {"agentes": data_section, "total": len(data_section)}
         else:
-            print(f"[ERROR] Estrutura de resposta não esperada: {type(response_json)}")
+            logger.warning(f"Estrutura inesperada de 'data': {data_section}")
             return {"agentes": [], "total": 0}
-
-    except requests.exceptions.RequestException as e:
-        print(f"[ERROR] Falha na requisição: {e}")
-        logging.error(f"Falha na requisição: {e}")
-        return {"agentes": [], "total": 0}
-
-    except ValueError as e:
-        print(f"[ERROR] Erro ao decodificar JSON: {e}")
-        logging.error(f"Erro ao decodificar JSON: {e}")
-        return {"agentes": [], "total": 0}
-
-    except Exception as e:
-        print(f"[ERROR] Erro inesperado: {e}")
-        logging.error(f"Erro inesperado: {e}")
+    elif isinstance(response_json, list):
+        logger.warning(f"Retorno inesperado em formato de lista: {response_json}")
+        return {"agentes": response_json, "total": len(response_json)}
+    else:
+        logger.error(f"Estrutura de resposta não esperada: {type(response_json)}")
         return {"agentes": [], "total": 0}
 
 def get_licitacao(codigo_municipio, data_inicio="2023-01-01", data_fim="2025-03-30"):
@@ -175,29 +462,23 @@ def get_orcamentos(codigo_municipio, exercicio_orcamento):
         response = fetch_data(endpoint)
         return response.get("data", []) if response else []
     except Exception as e:
-        print(f"Erro na requisição para {endpoint}: {e}")
+        logger.error(f"Erro na requisição para {endpoint}: {e}")
         return []
 
 def get_balancete_despesa_extra_orcamentaria(codigo_municipio, exercicio_orcamento, data_referencia):
     """Obtém dados de balancetes de despesa extra orçamentária."""
-    url = f"https://api-dados-abertos.tce.ce.gov.br/balancete_despesa_extra_orcamentaria"
+    url = f"{API_BASE_URL}balancete_despesa_extra_orcamentaria"
     params = {
         "codigo_municipio": codigo_municipio,
         "exercicio_orcamento": exercicio_orcamento,
         "data_referencia": data_referencia
     }
-    try:
-        response = requests.get(url, params=params, verify=False)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("data", [])
-    except Exception as e:
-        print(f"[ERROR] Falha na requisição para {url}: {e}")
-        return []
+    response = fetch_data(url, params)
+    return response.get("data", []) if response else []
 
 def get_receita_extra_orcamentaria(codigo_municipio, exercicio_orcamento, data_referencia, quantidade=100, deslocamento=0):
     """Obtém dados de receita extra orçamentária."""
-    base_url = "https://api-dados-abertos.tce.ce.gov.br/balancete_receita_extra_orcamentaria"
+    base_url = f"{API_BASE_URL}balancete_receita_extra_orcamentaria"
     params = {
         "codigo_municipio": codigo_municipio,
         "exercicio_orcamento": exercicio_orcamento,
@@ -205,14 +486,8 @@ def get_receita_extra_orcamentaria(codigo_municipio, exercicio_orcamento, data_r
         "quantidade": quantidade,
         "deslocamento": deslocamento
     }
-    try:
-        response = requests.get(base_url, params=params, verify=False)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("data", [])
-    except requests.RequestException as e:
-        print(f"[ERROR] Falha ao buscar dados de receita extra orçamentária: {e}")
-        return []
+    response = fetch_data(base_url, params)
+    return response.get("data", []) if response else []
 
 # NOVOS
 
@@ -223,7 +498,7 @@ def get_orcamentos_receita(codigo_municipio, exercicio_orcamento):
         response = fetch_data(endpoint)
         return response.get("data", []) if response else []
     except Exception as e:
-        print(f"Erro na requisição para {endpoint}: {e}")
+        logger.error(f"Erro na requisição para {endpoint}: {e}")
         return []
 
 def get_despesa_elemento_projeto(codigo_municipio, exercicio_orcamento):
@@ -233,7 +508,7 @@ def get_despesa_elemento_projeto(codigo_municipio, exercicio_orcamento):
         response = fetch_data(endpoint)
         return response.get("data", []) if response else []
     except Exception as e:
-        print(f"Erro na requisição para {endpoint}: {e}")
+        logger.error(f"Erro na requisição para {endpoint}: {e}")
         return []
 
 def get_despesa_projeto_atividade(codigo_municipio, exercicio_orcamento):
@@ -243,7 +518,7 @@ def get_despesa_projeto_atividade(codigo_municipio, exercicio_orcamento):
         response = fetch_data(endpoint)
         return response.get("data", []) if response else []
     except Exception as e:
-        print(f"Erro na requisição para {endpoint}: {e}")
+        logger.error(f"Erro na requisição para {endpoint}: {e}")
         return []
 
 def get_despesa_categoria_economica(codigo_municipio, exercicio_orcamento):
@@ -253,7 +528,7 @@ def get_despesa_categoria_economica(codigo_municipio, exercicio_orcamento):
         response = fetch_data(endpoint)
         return response.get("data", []) if response else []
     except Exception as e:
-        print(f"Erro na requisição para {endpoint}: {e}")
+        logger.error(f"Erro na requisição para {endpoint}: {e}")
         return []
 
 def get_liquidacoes(codigo_municipio, exercicio_orcamento, quantidade, deslocamento):
@@ -263,7 +538,7 @@ def get_liquidacoes(codigo_municipio, exercicio_orcamento, quantidade, deslocame
         response = fetch_data(endpoint)
         return response.get("data", []) if response else []
     except Exception as e:
-        print(f"Erro na requisição para {endpoint}: {e}")
+        logger.error(f"Erro na requisição para {endpoint}: {e}")
         return []
 
 def get_notas_empenho(codigo_municipio, data_referencia_empenho, codigo_orgao, quantidade, deslocamento):
@@ -273,5 +548,5 @@ def get_notas_empenho(codigo_municipio, data_referencia_empenho, codigo_orgao, q
         response = fetch_data(endpoint)
         return response.get("data", []) if response else []
     except Exception as e:
-        print(f"Erro na requisição para {endpoint}: {e}")
+        logger.error(f"Erro na requisição para {endpoint}: {e}")
         return []
@@ -1,24 +1,180 @@
 
+import logging
 from sqlalchemy import text
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 from database.db_config import get_db_engine
-import requests
-from data_extraction.api_client import fetch_data, get_all_municipios, get_orgaos, get_agentes_publicos, get_licitacao, get_receitas, get_prestacao_contas, get_unidade_orcamentaria, get_orcamentos, get_orcamentos_receita, get_despesa_elemento_projeto, get_despesa_projeto_atividade, get_despesa_categoria_economica
-
-# Função genérica de controle incremental
+from database.bulk_writer import BulkWriter
+from database.controle_carga import ControleCarga
+from database.db_setup import CHAVES_NATURAIS
+from database.particoes import garantir_particao
+from database.resumo_mensal import atualizar_resumo
+from database.checkpoint_carga import ler_checkpoint, salvar_checkpoint, remover_checkpoint
+from functools import partial
+from config import API_BASE_URL, FETCH_CONFIG, PERIODO_CONFIG
+from data_extraction.normalizacao import Campo, NUMERO, LIMITE_NUMERIC_15_2, normalizar
+from data_extraction.api_client import FetchEngine, fetch_data, paginar, paginas, get_all_municipios, get_orgaos, get_licitacao, get_receitas, get_prestacao_contas, get_orcamentos, get_orcamentos_receita, get_despesa_elemento_projeto, get_despesa_projeto_atividade, get_despesa_categoria_economica
+
+logger = logging.getLogger(__name__)
+
+# Função genérica de controle incremental (índice em memória de controle_carga, por sessão)
 def ja_processado(session, tipo, codigo, ano, mes):
-    return session.execute(text("""
-        SELECT 1 FROM controle_carga
-        WHERE tipo_dado = :tipo AND codigo_municipio = :codigo AND ano = :ano AND mes = :mes
-    """), {"tipo": tipo, "codigo": codigo, "ano": ano, "mes": mes}).fetchone()
+    return ControleCarga.da_sessao(session).ja_processado(tipo, codigo, ano, mes)
 
 def registrar_processamento(session, tipo, codigo, ano, mes):
-    session.execute(text("""
-        INSERT INTO controle_carga (tipo_dado, codigo_municipio, ano, mes)
-        VALUES (:tipo, :codigo, :ano, :mes)
-        ON CONFLICT DO NOTHING
-    """), {"tipo": tipo, "codigo": codigo, "ano": ano, "mes": mes})
+    """Registra a partição; a gravação em controle_carga ocorre em lote no próximo commit da sessão."""
+    ControleCarga.da_sessao(session).registrar(tipo, codigo, ano, mes)
+
+def conteudo_inalterado(session, tipo, codigo, ano, mes, registros):
+    """Compara o hash do conteúdo recebido com o da última carga; se igual, a partição não precisa ser gravada."""
+    if ControleCarga.da_sessao(session).conteudo_inalterado(tipo, codigo, ano, mes, registros):
+        logger.debug(f"{tipo} {codigo}/{ano}/{mes} sem alterações desde a última carga.")
+        return True
+    return False
+
+_MUNICIPIO_ID = "municipio_id = (SELECT id FROM municipio WHERE codigo_municipio = :codigo)"
+
+# Linhas de cada partição de controle_carga, por tipo_dado (receita e despesa já substituem a partição na gravação)
+FILTROS_RECARGA = {
+    "orgao": ("orgao", f"{_MUNICIPIO_ID} AND exercicio_orcamento = :exercicio"),
+    "agente_publico": ("agentes_publicos", f"{_MUNICIPIO_ID} AND exercicio_orcamento = :exercicio"),
+    "licitacao": ("licitacao", _MUNICIPIO_ID),
+    "prestacao_contas": ("prestacao_contas", f"{_MUNICIPIO_ID} AND ano = :ano AND mes = :mes"),
+    "unidade_orcamentaria": ("unidade_orcamentaria", f"{_MUNICIPIO_ID} AND exercicio_orcamento = :exercicio"),
+    "orcamento": ("orcamentos", f"{_MUNICIPIO_ID} AND exercicio_orcamento = :exercicio"),
+    "balancete_despesa_extra": ("balancete_despesa_extra_orcamentaria", "codigo_municipio = :codigo AND data_referencia = :data_referencia"),
+    "receita_extra": ("receita_extra_orcamentaria", "codigo_municipio = :codigo AND data_referencia = :data_referencia"),
+    "orcamento_receita": ("orcamento_receita", "codigo_municipio = :codigo AND exercicio_orcamento = :exercicio"),
+    "despesa_elemento_projeto": ("despesa_elemento_projeto", "codigo_municipio = :codigo AND exercicio_orcamento = :exercicio"),
+    "despesa_projeto_atividade": ("despesa_projeto_atividade", "codigo_municipio = :codigo AND exercicio_orcamento = :exercicio"),
+    "despesa_categoria_economica": ("despesa_categoria_economica", "codigo_municipio = :codigo AND exercicio_orcamento = :exercicio"),
+    "liquidacoes": ("liquidacoes", "codigo_municipio = :codigo AND exercicio_orcamento = :exercicio"),
+    "notas_empenho": ("notas_empenho", "codigo_municipio = :codigo AND exercicio_orcamento = :exercicio AND data_referencia_empenho = :data_referencia"),
+}
+
+def remover_versao_anterior(session, tipo, codigo, ano, mes):
+    """Apaga as linhas de uma partição já registrada, antes de gravar a nova versão na mesma transação.
+
+    Na primeira carga não há o que apagar. Numa recarga (modo de atualização ou --forcar) a partição é
+    substituída no mesmo commit, como em BulkWriter.substituir, ou nada muda em caso de rollback.
+    """
+    if tipo not in FILTROS_RECARGA or not ControleCarga.da_sessao(session).ja_registrado(tipo, codigo, ano, mes):
+        return
+    tabela, filtro = FILTROS_RECARGA[tipo]
+    removidas = session.execute(text(f"DELETE FROM {tabela} WHERE {filtro}"), {
+        "codigo": codigo, "ano": ano, "mes": mes,
+        "exercicio": f"{ano}00", "data_referencia": f"{ano}{int(mes):02}",
+    }).rowcount
+    logger.info(f"Recarga {tipo} {codigo}/{ano}/{mes}: {removidas} linhas da versão anterior removidas.")
+
+# Códigos dos municípios cearenses percorridos pelos loaders (002 a 185)
+CODIGOS_MUNICIPIOS = [str(municipio_id).zfill(3) for municipio_id in range(2, 186)]
+
+def codigos_municipios(municipios=None):
+    """Retorna os códigos a processar: a lista informada ou todos os municípios."""
+    return list(municipios) if municipios else CODIGOS_MUNICIPIOS
+
+def selecionar_municipios(session, colunas, municipios=None):
+    """Lê os municípios da tabela municipio, opcionalmente restritos a uma lista de códigos."""
+    if not municipios:
+        return session.execute(text(f"SELECT {colunas} FROM municipio")).fetchall()
+    return session.execute(
+        text(f"SELECT {colunas} FROM municipio WHERE codigo_municipio = ANY(:codigos)"),
+        {"codigos": list(municipios)}
+    ).fetchall()
+
+# Períodos padrão dos loaders: exercícios fixos ou de 2023 até o ano corrente
+ANOS_PADRAO = [2023, 2024, 2025]
+
+def anos_ate_atual():
+    return range(2023, datetime.now().year + 1)
+
+def anos_carga(padrao):
+    """Anos a processar: os selecionados em PERIODO_CONFIG (--anos) ou o período padrão do loader."""
+    return list(PERIODO_CONFIG["anos"] or padrao)
+
+def meses_carga(ultimo=12):
+    """Meses a processar até `ultimo` (mês corrente no ano atual): os selecionados (--meses) ou todos."""
+    return [mes for mes in (PERIODO_CONFIG["meses"] or range(1, 13)) if mes <= ultimo]
+
+_municipio_ids = {}
+
+def municipio_id_por_codigo(session, codigo_municipio):
+    """Resolve (uma vez por processo) o id da tabela municipio a partir do código do TCE."""
+    if codigo_municipio not in _municipio_ids:
+        _municipio_ids[codigo_municipio] = session.execute(
+            text("SELECT id FROM municipio WHERE codigo_municipio = :codigo"),
+            {"codigo": codigo_municipio}
+        ).scalar()
+    return _municipio_ids[codigo_municipio]
+
+def processar_particoes(endpoint, particoes, buscar, inserir, concorrente=None):
+    """Busca e insere cada partição; no modo concorrente as buscas rodam no FetchEngine.
+
+    `buscar` pode devolver um iterável preguiçoso (ex.: paginar); no modo sequencial ele é
+    consumido pelo `inserir` à medida que as páginas chegam, no concorrente é materializado na thread de busca.
+    """
+    if concorrente is None:
+        concorrente = FETCH_CONFIG["concorrente"]
+
+    if concorrente:
+        logger.info(f"Buscando {len(particoes)} partições de {endpoint} em modo concorrente.")
+        FetchEngine().executar(endpoint, particoes, lambda particao: list(buscar(particao)), inserir)
+        return
+
+    for particao in particoes:
+        try:
+            dados = buscar(particao)
+        except Exception as e:
+            logger.error(f"Falha ao buscar {endpoint} {particao}: {e}")
+            continue
+        inserir(particao, dados)
+
+def carregar_paginado(session, tipo, chave, url, params, gravar_pagina, limpar, finalizar=None):
+    """Carga inicial de uma partição paginada, com checkpoint por página (tabela checkpoint_carga).
+
+    Cada página é gravada e o deslocamento seguinte é salvo no mesmo commit; uma execução interrompida
+    retoma do último deslocamento confirmado, sem buscar nem gravar de novo as páginas anteriores.
+    Sem checkpoint, `limpar()` apaga eventuais restos da partição antes da primeira página. Ao final a
+    partição é registrada e o checkpoint removido no mesmo commit (com `finalizar()`, se informado); o hash
+    do conteúdo só é guardado quando a partição foi lida inteira nesta execução. Retorna True se a
+    partição foi concluída.
+    """
+    codigo, ano, mes = chave
+    inicio, total_esperado = ler_checkpoint(session, tipo, codigo, ano, mes) or (0, None)
+    registros = [] if not inicio else None
+    try:
+        if inicio:
+            logger.info(f"Retomando {tipo} {codigo}/{ano}/{mes} a partir do deslocamento {inicio} (total esperado: {total_esperado}).")
+        else:
+            limpar()
+
+        for pagina, deslocamento, total in paginas(url, params, inicio=inicio):
+            if total_esperado is not None and total is not None and total != total_esperado:
+                logger.warning(f"Total de {tipo} {codigo}/{ano}/{mes} mudou de {total_esperado} para {total} durante a carga.")
+            total_esperado = total
+            gravar_pagina(pagina)
+            salvar_checkpoint(session, tipo, codigo, ano, mes, deslocamento, total)
+            session.commit()
+            if registros is not None:
+                registros.extend(pagina)
+
+        if registros is not None:
+            ControleCarga.da_sessao(session).guardar_hash(tipo, codigo, ano, mes, registros)
+        if finalizar:
+            finalizar()
+        remover_checkpoint(session, tipo, codigo, ano, mes)
+        registrar_processamento(session, tipo, codigo, ano, mes)
+        session.commit()
+        return True
+
+    except Exception as e:
+        logger.error(
+            f"Falha na carga paginada de {tipo} {codigo}/{ano}/{mes}: {e}",
+            extra={"campos": {"tipo": tipo, "municipio": codigo, "ano": ano, "mes": mes, "deslocamento": inicio}}
+        )
+        session.rollback()
+        return False
 
 def load_municipios():
     engine = get_db_engine()
@@ -28,7 +184,7 @@ def load_municipios():
     municipios = get_all_municipios()
 
     if isinstance(municipios, list) and municipios:
-        print(f"[INFO] Carregando {len(municipios)} municípios.")
+        logger.info(f"Carregando {len(municipios)} municípios.")
         for municipio in municipios:
             if isinstance(municipio, dict):
                 session.execute(
@@ -41,35 +197,34 @@ def load_municipios():
         session.commit()
 
         result = session.execute(text("SELECT COUNT(*) FROM municipio")).scalar()
-        print(f"[INFO] Total de municípios no banco: {result}")
+        logger.info(f"Total de municípios no banco: {result}")
     else:
-        print("[ERRO] Nenhum município encontrado.")
+        logger.error("Nenhum município encontrado.")
 
     session.close()
 
 # Função incremental: órgãos
 
-def load_orgaos():
+def load_orgaos(municipios=None):
     engine = get_db_engine()
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    for municipio_id in range(2, 186):
-        codigo_municipio = str(municipio_id).zfill(3)
-        start_year = 2023
-        end_year = datetime.now().year
-
-        for year in range(start_year, end_year + 1):
+    for codigo_municipio in codigos_municipios(municipios):
+        for year in anos_carga(anos_ate_atual()):
             if ja_processado(session, "orgao", codigo_municipio, year, 0):
-                print(f"[SKIP] Órgãos {codigo_municipio}/{year} já processados.")
+                logger.debug(f"Órgãos {codigo_municipio}/{year} já processados.")
                 continue
 
             exercicio_orcamento = f"{year}00"
             orgaos = get_orgaos(codigo_municipio, exercicio_orcamento)
 
             if not orgaos:
-                print(f"[INFO] Nenhum órgão encontrado para município {codigo_municipio}, exercício {exercicio_orcamento}.")
+                logger.info(f"Nenhum órgão encontrado para município {codigo_municipio}, exercício {exercicio_orcamento}.")
+                continue
+            if conteudo_inalterado(session, "orgao", codigo_municipio, year, 0, orgaos):
                 continue
+            remover_versao_anterior(session, "orgao", codigo_municipio, year, 0)
 
             for orgao in orgaos:
                 try:
@@ -94,279 +249,299 @@ def load_orgaos():
                         }
                     )
                 except Exception as e:
-                    print(f"[ERRO] Falha ao inserir órgão {orgao['codigo_orgao']} para município {codigo_municipio}: {e}")
+                    logger.error(f"Falha ao inserir órgão {orgao['codigo_orgao']} para município {codigo_municipio}: {e}")
                     session.rollback()
 
             registrar_processamento(session, "orgao", codigo_municipio, year, 0)
             session.commit()
-            print(f"[INFO] Dados de órgãos carregados para município {codigo_municipio}, exercício {exercicio_orcamento}.")
+            logger.info(f"Dados de órgãos carregados para município {codigo_municipio}, exercício {exercicio_orcamento}.")
 
     session.close()
-    print("[INFO] Processamento de órgãos concluído.")
+    logger.info("Processamento de órgãos concluído.")
+
+def _buscar_receitas(particao):
+    codigo_municipio, year, month = particao
+    exercicio_orcamento = f"{year}00"
+    data_referencia = f"{year}{str(month).zfill(2)}"
+    return get_receitas(codigo_municipio, exercicio_orcamento, data_referencia)
+
+COLUNAS_RECEITA = [
+    "municipio_id", "ano", "mes", "codigo_orgao", "codigo_unidade", "codigo_rubrica",
+    "tipo_balancete", "valor_previsto_orcamento", "valor_arrecadado_no_mes",
+    "valor_arrecadado_ate_mes", "valor_anulacoes_no_mes", "valor_anulacoes_ate_mes",
+    "tipo_fonte", "codigo_fonte"
+]
+
+# Campos do balancete de receita (os valores da API usam "arrecadacao" onde a tabela usa "arrecadado")
+ESQUEMA_RECEITA = [
+    Campo("codigo_orgao", limite=10),
+    Campo("codigo_unidade", limite=10),
+    Campo("codigo_rubrica", limite=50),
+    Campo("tipo_balancete", limite=50),
+    Campo("valor_previsto_orcamento", tipo=NUMERO, limite=LIMITE_NUMERIC_15_2),
+    Campo("valor_arrecadado_no_mes", "valor_arrecadacao_no_mes", NUMERO, limite=LIMITE_NUMERIC_15_2),
+    Campo("valor_arrecadado_ate_mes", "valor_arrecadacao_ate_mes", NUMERO, limite=LIMITE_NUMERIC_15_2),
+    Campo("valor_anulacoes_no_mes", tipo=NUMERO, limite=LIMITE_NUMERIC_15_2),
+    Campo("valor_anulacoes_ate_mes", tipo=NUMERO, limite=LIMITE_NUMERIC_15_2),
+    Campo("tipo_fonte", limite=10),
+    Campo("codigo_fonte", limite=10),
+]
+
+def _inserir_receitas(session, escritor, particao, receitas):
+    codigo_municipio, year, month = particao
+    try:
+        if conteudo_inalterado(session, "receita", codigo_municipio, year, month, receitas):
+            return
+        garantir_particao(session.get_bind(), "receita", year)
+        municipio_id = municipio_id_por_codigo(session, codigo_municipio)
+        linhas = normalizar(
+            receitas, ESQUEMA_RECEITA, {"municipio_id": municipio_id, "ano": year, "mes": month},
+            f"Receita {codigo_municipio}/{year}/{month}"
+        )
+        escritor.substituir(session, {"municipio_id": municipio_id, "ano": year, "mes": month}, linhas)
+        atualizar_resumo(session, "receita", municipio_id, year, month)
+
+        registrar_processamento(session, "receita", codigo_municipio, year, month)
+        session.commit()
+        logger.info(
+            f"Receita {codigo_municipio}/{year}/{month} carregada com sucesso ({len(linhas)} linhas).",
+            extra={"campos": {"tipo": "receita", "municipio": codigo_municipio, "ano": year, "mes": month, "linhas": len(linhas)}}
+        )
+
+    except Exception as e:
+        logger.error(f"Falha ao processar {codigo_municipio}/{year}/{month}: {e}")
+        session.rollback()
 
-def load_receitas():
+def load_receitas(municipios=None, concorrente=None):
     engine = get_db_engine()
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    for municipio_id in range(2, 186):
-        codigo_municipio = str(municipio_id).zfill(3)
-        start_year = 2023
+    particoes = []
+    for codigo_municipio in codigos_municipios(municipios):
         end_year = datetime.now().year
         end_month = datetime.now().month
 
-        for year in range(start_year, end_year + 1):
-            last_month = 12 if year < end_year else end_month
-            for month in range(1, last_month + 1):
+        for year in anos_carga(anos_ate_atual()):
+            for month in meses_carga(12 if year < end_year else end_month):
                 if ja_processado(session, "receita", codigo_municipio, year, month):
-                    print(f"[SKIP] Receita {codigo_municipio}/{year}/{month} já processada.")
+                    logger.debug(f"Receita {codigo_municipio}/{year}/{month} já processada.")
                     continue
+                particoes.append((codigo_municipio, year, month))
 
-                exercicio_orcamento = f"{year}00"
-                data_referencia = f"{year}{str(month).zfill(2)}"
-
-                try:
-                    receitas = get_receitas(codigo_municipio, exercicio_orcamento, data_referencia)
-                    for receita in receitas:
-                        session.execute(text("""
-                            INSERT INTO receita (
-                                municipio_id, ano, mes, codigo_orgao, codigo_unidade, codigo_rubrica,
-                                tipo_balancete, valor_previsto_orcamento, valor_arrecadado_no_mes,
-                                valor_arrecadado_ate_mes, valor_anulacoes_no_mes, valor_anulacoes_ate_mes,
-                                tipo_fonte, codigo_fonte
-                            ) VALUES (
-                                (SELECT id FROM municipio WHERE codigo_municipio = :codigo_municipio),
-                                :ano, :mes, :codigo_orgao, :codigo_unidade, :codigo_rubrica,
-                                :tipo_balancete, :valor_previsto_orcamento, :valor_arrecadado_no_mes,
-                                :valor_arrecadado_ate_mes, :valor_anulacoes_no_mes, :valor_anulacoes_ate_mes,
-                                :tipo_fonte, :codigo_fonte
-                            )
-                        """), {
-                            "codigo_municipio": codigo_municipio,
-                            "ano": year,
-                            "mes": month,
-                            "codigo_orgao": receita["codigo_orgao"],
-                            "codigo_unidade": receita["codigo_unidade"].strip(),
-                            "codigo_rubrica": receita["codigo_rubrica"],
-                            "tipo_balancete": receita["tipo_balancete"],
-                            "valor_previsto_orcamento": receita["valor_previsto_orcamento"],
-                            "valor_arrecadado_no_mes": receita["valor_arrecadacao_no_mes"],
-                            "valor_arrecadado_ate_mes": receita["valor_arrecadacao_ate_mes"],
-                            "valor_anulacoes_no_mes": receita["valor_anulacoes_no_mes"],
-                            "valor_anulacoes_ate_mes": receita["valor_anulacoes_ate_mes"],
-                            "tipo_fonte": receita["tipo_fonte"],
-                            "codigo_fonte": receita["codigo_fonte"]
-                        })
-
-                    registrar_processamento(session, "receita", codigo_municipio, year, month)
-                    session.commit()
-                    print(f"[INFO] Receita {codigo_municipio}/{year}/{month} carregada com sucesso.")
-
-                except requests.RequestException as e:
-                    print(f"[ERRO] Requisição falhou para {codigo_municipio}/{year}/{month}: {e}")
-                except Exception as e:
-                    print(f"[ERRO] Falha ao processar {codigo_municipio}/{year}/{month}: {e}")
-                    session.rollback()
+    escritor = BulkWriter("receita", COLUNAS_RECEITA, chave=CHAVES_NATURAIS["receita"]["colunas"])
+    processar_particoes(
+        "balancete_receita_orcamentaria", particoes, _buscar_receitas,
+        partial(_inserir_receitas, session, escritor), concorrente
+    )
+    logger.info(f"Vazão de escrita: {escritor.resumo()}")
 
     session.close()
 
-def load_despesas():
+def _params_despesas(particao):
+    codigo_municipio, year, month = particao
+    return {
+        "codigo_municipio": codigo_municipio,
+        "exercicio_orcamento": f"{year}00",
+        "data_referencia": f"{year}{str(month).zfill(2)}",
+    }
+
+def _buscar_despesas(particao):
+    return paginar(f"{API_BASE_URL}balancete_despesa_orcamentaria", _params_despesas(particao))
+
+COLUNAS_DESPESA = [
+    "municipio_id", "ano", "mes", "codigo_orgao", "codigo_unidade", "codigo_funcao",
+    "codigo_subfuncao", "codigo_programa", "codigo_projeto_atividade",
+    "numero_projeto_atividade", "numero_subprojeto_atividade", "codigo_elemento_despesa",
+    "tipo_balancete", "valor_fixado_orcamento_bal_despesa", "valor_supl_no_mes",
+    "valor_supl_ate_mes", "valor_anulacoes_dotacao_no_mes", "valor_empenhado_no_mes",
+    "valor_empenhado_ate_mes", "valor_saldo_dotacao", "valor_pago_no_mes",
+    "valor_pago_ate_mes", "valor_empenhado_pagar", "valor_anulacoes_dotacao_ate_mes",
+    "valor_anulacoes_empenhos_no_mes", "valor_anulacoes_empenhos_ate_mes",
+    "valor_liquidado_no_mes", "valor_liquidado_ate_mes",
+    "valor_estornos_liquidacao_no_mes", "valor_estornos_liquidacao_ate_mes",
+    "valor_estornos_pagos_no_mes", "valor_estornos_pagos_ate_mes",
+    "tipo_fonte", "codigo_fonte"
+]
+
+# Campos de texto da despesa (os demais valores são numéricos, com 0 como padrão)
+CAMPOS_TEXTO_DESPESA = {
+    "codigo_orgao", "codigo_funcao", "codigo_subfuncao", "codigo_programa", "codigo_projeto_atividade",
+    "numero_projeto_atividade", "numero_subprojeto_atividade", "codigo_elemento_despesa",
+    "tipo_balancete", "tipo_fonte", "codigo_fonte"
+}
+
+# Tamanho das colunas de texto da despesa que não são VARCHAR(10)
+TAMANHO_TEXTO_DESPESA = {"codigo_elemento_despesa": 20, "tipo_balancete": 50}
+
+ESQUEMA_DESPESA = [
+    Campo(coluna, limite=TAMANHO_TEXTO_DESPESA.get(coluna, 10)) if coluna in CAMPOS_TEXTO_DESPESA
+    else Campo(coluna, padrao="", limite=10) if coluna == "codigo_unidade"
+    else Campo(coluna, tipo=NUMERO, padrao=0, limite=LIMITE_NUMERIC_15_2)
+    for coluna in COLUNAS_DESPESA[3:]
+]
+
+def _lote_despesa(municipio_id, year, month, registros, codigo_municipio):
+    return normalizar(
+        registros, ESQUEMA_DESPESA, {"municipio_id": municipio_id, "ano": year, "mes": month},
+        f"Despesa {codigo_municipio}/{year}/{month}"
+    )
+
+def _inserir_despesas(session, escritor, particao, dados):
+    codigo_municipio, year, month = particao
+    try:
+        dados = list(dados)
+        if conteudo_inalterado(session, "despesa", codigo_municipio, year, month, dados):
+            return
+        garantir_particao(session.get_bind(), "despesa", year)
+        municipio_id = municipio_id_por_codigo(session, codigo_municipio)
+        linhas = _lote_despesa(municipio_id, year, month, dados, codigo_municipio)
+        escritor.substituir(session, {"municipio_id": municipio_id, "ano": year, "mes": month}, linhas)
+        atualizar_resumo(session, "despesa", municipio_id, year, month)
+
+        registrar_processamento(session, "despesa", codigo_municipio, year, month)
+        session.commit()
+        logger.info(
+            f"Despesa {codigo_municipio}/{year}/{month} carregada com sucesso ({len(linhas)} linhas).",
+            extra={"campos": {"tipo": "despesa", "municipio": codigo_municipio, "ano": year, "mes": month, "linhas": len(linhas)}}
+        )
+
+    except Exception as e:
+        logger.error(f"Falha ao processar despesa {codigo_municipio}/{year}/{month}: {e}")
+        session.rollback()
+
+def _carregar_despesas_paginado(session, escritor, particao):
+    """Primeira carga de uma partição de despesa, página a página com checkpoint (ver carregar_paginado)."""
+    codigo_municipio, year, month = particao
+    try:
+        garantir_particao(session.get_bind(), "despesa", year)
+        municipio_id = municipio_id_por_codigo(session, codigo_municipio)
+    except Exception as e:
+        logger.error(f"Falha ao preparar despesa {codigo_municipio}/{year}/{month}: {e}")
+        session.rollback()
+        return
+
+    filtro = {"municipio_id": municipio_id, "ano": year, "mes": month}
+    if carregar_paginado(
+        session, "despesa", particao, f"{API_BASE_URL}balancete_despesa_orcamentaria", _params_despesas(particao),
+        lambda pagina: escritor.gravar_ignorando_existentes(
+            session, _lote_despesa(municipio_id, year, month, pagina, codigo_municipio)
+        ),
+        lambda: escritor.substituir(session, filtro, []),
+        lambda: atualizar_resumo(session, "despesa", municipio_id, year, month),
+    ):
+        logger.info(f"Despesa {codigo_municipio}/{year}/{month} carregada com sucesso.")
+
+def load_despesas(municipios=None, concorrente=None):
     engine = get_db_engine()
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    for municipio_id in range(2, 186):
-        codigo_municipio = str(municipio_id).zfill(3)
-        start_year = 2023
+    particoes = []
+    for codigo_municipio in codigos_municipios(municipios):
         end_year = datetime.now().year
         end_month = datetime.now().month
 
-        for year in range(start_year, end_year + 1):
-            last_month = 12 if year < end_year else end_month
-            for month in range(1, last_month + 1):
+        for year in anos_carga(anos_ate_atual()):
+            for month in meses_carga(12 if year < end_year else end_month):
                 if ja_processado(session, "despesa", codigo_municipio, year, month):
-                    print(f"[SKIP] Despesa {codigo_municipio}/{year}/{month} já processada.")
+                    logger.debug(f"Despesa {codigo_municipio}/{year}/{month} já processada.")
                     continue
-
-                data_referencia = f"{year}{str(month).zfill(2)}"
-                exercicio_orcamento = f"{year}00"
-                deslocamento = 0
-
-                try:
-                    while True:
-                        response = fetch_data(
-                            f"https://api-dados-abertos.tce.ce.gov.br/balancete_despesa_orcamentaria?"
-                            f"codigo_municipio={codigo_municipio}&exercicio_orcamento={exercicio_orcamento}"
-                            f"&data_referencia={data_referencia}&quantidade=100&deslocamento={deslocamento}"
-                        )
-
-                        if not response or "data" not in response or not response["data"].get("data"):
-                            break
-
-                        dados = response["data"]["data"]
-
-                        for item in dados:
-                            session.execute(text("""
-                                INSERT INTO despesa (
-                                    municipio_id, ano, mes, codigo_orgao, codigo_unidade, codigo_funcao,
-                                    codigo_subfuncao, codigo_programa, codigo_projeto_atividade,
-                                    numero_projeto_atividade, numero_subprojeto_atividade, codigo_elemento_despesa,
-                                    tipo_balancete, valor_fixado_orcamento_bal_despesa, valor_supl_no_mes,
-                                    valor_supl_ate_mes, valor_anulacoes_dotacao_no_mes, valor_empenhado_no_mes,
-                                    valor_empenhado_ate_mes, valor_saldo_dotacao, valor_pago_no_mes,
-                                    valor_pago_ate_mes, valor_empenhado_pagar, valor_anulacoes_dotacao_ate_mes,
-                                    valor_anulacoes_empenhos_no_mes, valor_anulacoes_empenhos_ate_mes,
-                                    valor_liquidado_no_mes, valor_liquidado_ate_mes,
-                                    valor_estornos_liquidacao_no_mes, valor_estornos_liquidacao_ate_mes,
-                                    valor_estornos_pagos_no_mes, valor_estornos_pagos_ate_mes,
-                                    tipo_fonte, codigo_fonte
-                                ) VALUES (
-                                    (SELECT id FROM municipio WHERE codigo_municipio = :codigo_municipio),
-                                    :ano, :mes, :codigo_orgao, :codigo_unidade, :codigo_funcao,
-                                    :codigo_subfuncao, :codigo_programa, :codigo_projeto_atividade,
-                                    :numero_projeto_atividade, :numero_subprojeto_atividade, :codigo_elemento_despesa,
-                                    :tipo_balancete, :valor_fixado_orcamento_bal_despesa, :valor_supl_no_mes,
-                                    :valor_supl_ate_mes, :valor_anulacoes_dotacao_no_mes, :valor_empenhado_no_mes,
-                                    :valor_empenhado_ate_mes, :valor_saldo_dotacao, :valor_pago_no_mes,
-                                    :valor_pago_ate_mes, :valor_empenhado_pagar, :valor_anulacoes_dotacao_ate_mes,
-                                    :valor_anulacoes_empenhos_no_mes, :valor_anulacoes_empenhos_ate_mes,
-                                    :valor_liquidado_no_mes, :valor_liquidado_ate_mes,
-                                    :valor_estornos_liquidacao_no_mes, :valor_estornos_liquidacao_ate_mes,
-                                    :valor_estornos_pagos_no_mes, :valor_estornos_pagos_ate_mes,
-                                    :tipo_fonte, :codigo_fonte
-                                )
-                            """), {
-                                "codigo_municipio": codigo_municipio,
-                                "ano": year,
-                                "mes": month,
-                                "codigo_orgao": item.get("codigo_orgao"),
-                                "codigo_unidade": item.get("codigo_unidade", "").strip(),
-                                "codigo_funcao": item.get("codigo_funcao"),
-                                "codigo_subfuncao": item.get("codigo_subfuncao"),
-                                "codigo_programa": item.get("codigo_programa"),
-                                "codigo_projeto_atividade": item.get("codigo_projeto_atividade"),
-                                "numero_projeto_atividade": item.get("numero_projeto_atividade"),
-                                "numero_subprojeto_atividade": item.get("numero_subprojeto_atividade"),
-                                "codigo_elemento_despesa": item.get("codigo_elemento_despesa"),
-                                "tipo_balancete": item.get("tipo_balancete"),
-                                "valor_fixado_orcamento_bal_despesa": item.get("valor_fixado_orcamento_bal_despesa", 0),
-                                "valor_supl_no_mes": item.get("valor_supl_no_mes", 0),
-                                "valor_supl_ate_mes": item.get("valor_supl_ate_mes", 0),
-                                "valor_anulacoes_dotacao_no_mes": item.get("valor_anulacoes_dotacao_no_mes", 0),
-                                "valor_empenhado_no_mes": item.get("valor_empenhado_no_mes", 0),
-                                "valor_empenhado_ate_mes": item.get("valor_empenhado_ate_mes", 0),
-                                "valor_saldo_dotacao": item.get("valor_saldo_dotacao", 0),
-                                "valor_pago_no_mes": item.get("valor_pago_no_mes", 0),
-                                "valor_pago_ate_mes": item.get("valor_pago_ate_mes", 0),
-                                "valor_empenhado_pagar": item.get("valor_empenhado_pagar", 0),
-                                "valor_anulacoes_dotacao_ate_mes": item.get("valor_anulacoes_dotacao_ate_mes", 0),
-                                "valor_anulacoes_empenhos_no_mes": item.get("valor_anulacoes_empenhos_no_mes", 0),
-                                "valor_anulacoes_empenhos_ate_mes": item.get("valor_anulacoes_empenhos_ate_mes", 0),
-                                "valor_liquidado_no_mes": item.get("valor_liquidado_no_mes", 0),
-                                "valor_liquidado_ate_mes": item.get("valor_liquidado_ate_mes", 0),
-                                "valor_estornos_liquidacao_no_mes": item.get("valor_estornos_liquidacao_no_mes", 0),
-                                "valor_estornos_liquidacao_ate_mes": item.get("valor_estornos_liquidacao_ate_mes", 0),
-                                "valor_estornos_pagos_no_mes": item.get("valor_estornos_pagos_no_mes", 0),
-                                "valor_estornos_pagos_ate_mes": item.get("valor_estornos_pagos_ate_mes", 0),
-                                "tipo_fonte": item.get("tipo_fonte"),
-                                "codigo_fonte": item.get("codigo_fonte")
-                            })
-
-                        deslocamento += 100
-
-                    registrar_processamento(session, "despesa", codigo_municipio, year, month)
-                    session.commit()
-                    print(f"[INFO] Despesa {codigo_municipio}/{year}/{month} carregada com sucesso.")
-
-                except Exception as e:
-                    print(f"[ERRO] Falha ao processar despesa {codigo_municipio}/{year}/{month}: {e}")
-                    session.rollback()
+                particoes.append((codigo_municipio, year, month))
+
+    escritor = BulkWriter("despesa", COLUNAS_DESPESA, chave=CHAVES_NATURAIS["despesa"]["colunas"])
+    if concorrente is None:
+        concorrente = FETCH_CONFIG["concorrente"]
+    if not concorrente:
+        # Partições ainda não registradas: carga página a página, retomável pelo checkpoint
+        controle = ControleCarga.da_sessao(session)
+        recargas = []
+        for particao in particoes:
+            if controle.ja_registrado("despesa", *particao):
+                recargas.append(particao)
+            else:
+                _carregar_despesas_paginado(session, escritor, particao)
+        particoes = recargas
+
+    processar_particoes(
+        "balancete_despesa_orcamentaria", particoes, _buscar_despesas,
+        partial(_inserir_despesas, session, escritor), concorrente
+    )
+    logger.info(f"Vazão de escrita: {escritor.resumo()}")
 
     session.close()
 
 
-def load_agentes_publicos():
+def load_agentes_publicos(municipios=None):
     engine = get_db_engine()
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    for municipio_id in range(2, 186):
-        codigo_municipio = str(municipio_id).zfill(3)
-        start_year = 2023
-        end_year = datetime.now().year
-
-        for year in range(start_year, end_year + 1):
+    for codigo_municipio in codigos_municipios(municipios):
+        for year in anos_carga(anos_ate_atual()):
             if ja_processado(session, "agente_publico", codigo_municipio, year, 0):
-                print(f"[SKIP] Agentes públicos {codigo_municipio}/{year} já processados.")
+                logger.debug(f"Agentes públicos {codigo_municipio}/{year} já processados.")
                 continue
 
-            deslocamento = 0
-
             try:
-                while True:
-                    response = get_agentes_publicos(
-                        codigo_municipio=codigo_municipio,
-                        exercicio_orcamento=f"{year}00",
-                        deslocamento=deslocamento,
-                        quantidade=100
-                    )
-
-                    agentes = response.get("agentes", [])
-                    if not agentes:
-                        break
+                agentes = list(paginar(f"{API_BASE_URL}agentes_publicos", {
+                    "codigo_municipio": codigo_municipio,
+                    "exercicio_orcamento": f"{year}00",
+                }))
+                if conteudo_inalterado(session, "agente_publico", codigo_municipio, year, 0, agentes):
+                    continue
+                remover_versao_anterior(session, "agente_publico", codigo_municipio, year, 0)
 
-                    for agente in agentes:
-                        session.execute(text("""
-                            INSERT INTO agentes_publicos (
-                                municipio_id, exercicio_orcamento, codigo_orgao, codigo_unidade,
-                                cpf_servidor, codigo_ingresso, codigo_vinculo, codigo_expediente,
-                                situacao_funcional, codigo_regime_juridico, codigo_ocupacao_cbo,
-                                tipo_cargo, data_referencia_agente_publico, nome_servidor, nm_tipo_cargo
-                            ) VALUES (
-                                (SELECT id FROM municipio WHERE codigo_municipio = :codigo_municipio),
-                                :exercicio_orcamento, :codigo_orgao, :codigo_unidade, :cpf_servidor,
-                                :codigo_ingresso, :codigo_vinculo, :codigo_expediente, :situacao_funcional,
-                                :codigo_regime_juridico, :codigo_ocupacao_cbo, :tipo_cargo,
-                                :data_referencia_agente_publico, :nome_servidor, :nm_tipo_cargo
-                            ) ON CONFLICT DO NOTHING
-                        """), {
-                            "codigo_municipio": codigo_municipio,
-                            "exercicio_orcamento": f"{year}00",
-                            "codigo_orgao": agente.get("codigo_orgao"),
-                            "codigo_unidade": agente.get("codigo_unidade", "").strip(),
-                            "cpf_servidor": agente.get("cpf_servidor"),
-                            "codigo_ingresso": agente.get("codigo_ingresso"),
-                            "codigo_vinculo": agente.get("codigo_vinculo"),
-                            "codigo_expediente": agente.get("codigo_expediente"),
-                            "situacao_funcional": agente.get("situacao_funcional"),
-                            "codigo_regime_juridico": agente.get("codigo_regime_juridico"),
-                            "codigo_ocupacao_cbo": agente.get("codigo_ocupacao_cbo"),
-                            "tipo_cargo": agente.get("tipo_cargo"),
-                            "data_referencia_agente_publico": agente.get("data_referencia_agente_publico"),
-                            "nome_servidor": agente.get("nome_servidor", "").strip(),
-                            "nm_tipo_cargo": agente.get("nm_tipo_cargo", "").strip()
-                        })
-
-                    deslocamento += 100
+                for agente in agentes:
+                    session.execute(text("""
+                        INSERT INTO agentes_publicos (
+                            municipio_id, exercicio_orcamento, codigo_orgao, codigo_unidade,
+                            cpf_servidor, codigo_ingresso, codigo_vinculo, codigo_expediente,
+                            situacao_funcional, codigo_regime_juridico, codigo_ocupacao_cbo,
+                            tipo_cargo, data_referencia_agente_publico, nome_servidor, nm_tipo_cargo
+                        ) VALUES (
+                            (SELECT id FROM municipio WHERE codigo_municipio = :codigo_municipio),
+                            :exercicio_orcamento, :codigo_orgao, :codigo_unidade, :cpf_servidor,
+                            :codigo_ingresso, :codigo_vinculo, :codigo_expediente, :situacao_funcional,
+                            :codigo_regime_juridico, :codigo_ocupacao_cbo, :tipo_cargo,
+                            :data_referencia_agente_publico, :nome_servidor, :nm_tipo_cargo
+                        ) ON CONFLICT DO NOTHING
+                    """), {
+                        "codigo_municipio": codigo_municipio,
+                        "exercicio_orcamento": f"{year}00",
+                        "codigo_orgao": agente.get("codigo_orgao"),
+                        "codigo_unidade": agente.get("codigo_unidade", "").strip(),
+                        "cpf_servidor": agente.get("cpf_servidor"),
+                        "codigo_ingresso": agente.get("codigo_ingresso"),
+                        "codigo_vinculo": agente.get("codigo_vinculo"),
+                        "codigo_expediente": agente.get("codigo_expediente"),
+                        "situacao_funcional": agente.get("situacao_funcional"),
+                        "codigo_regime_juridico": agente.get("codigo_regime_juridico"),
+                        "codigo_ocupacao_cbo": agente.get("codigo_ocupacao_cbo"),
+                        "tipo_cargo": agente.get("tipo_cargo"),
+                        "data_referencia_agente_publico": agente.get("data_referencia_agente_publico"),
+                        "nome_servidor": agente.get("nome_servidor", "").strip(),
+                        "nm_tipo_cargo": agente.get("nm_tipo_cargo", "").strip()
+                    })
 
                 registrar_processamento(session, "agente_publico", codigo_municipio, year, 0)
                 session.commit()
-                print(f"[INFO] Agentes públicos {codigo_municipio}/{year} carregados com sucesso.")
+                logger.info(f"Agentes públicos {codigo_municipio}/{year} carregados com sucesso.")
 
             except Exception as e:
-                print(f"[ERRO] Falha ao processar agentes públicos {codigo_municipio}/{year}: {e}")
+                logger.error(f"Falha ao processar agentes públicos {codigo_municipio}/{year}: {e}")
                 session.rollback()
 
     session.close()
 
 # Função incremental: licitação
 
-def load_licitacao():
+def load_licitacao(municipios=None):
     engine = get_db_engine()
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    municipios = session.execute(text("SELECT id, codigo_municipio FROM municipio")).fetchall()
+    municipios = selecionar_municipios(session, "id, codigo_municipio", municipios)
 
     for municipio in municipios:
         municipio_id = municipio[0]
@@ -374,14 +549,17 @@ def load_licitacao():
         ano = 2023  # a API exige uma faixa, mas o controle local será por ano
 
         if ja_processado(session, "licitacao", codigo_municipio, ano, 0):
-            print(f"[SKIP] Licitações {codigo_municipio}/{ano} já processadas.")
+            logger.debug(f"Licitações {codigo_municipio}/{ano} já processadas.")
             continue
 
         try:
             licitacoes = get_licitacao(codigo_municipio)
             if not licitacoes:
-                print(f"[INFO] Sem dados de licitação para município {codigo_municipio}.")
+                logger.info(f"Sem dados de licitação para município {codigo_municipio}.")
+                continue
+            if conteudo_inalterado(session, "licitacao", codigo_municipio, ano, 0, licitacoes):
                 continue
+            remover_versao_anterior(session, "licitacao", codigo_municipio, ano, 0)
 
             for lic in licitacoes:
                 data_realizacao = lic.get("data_realizacao_licitacao")
@@ -413,21 +591,21 @@ def load_licitacao():
 
             registrar_processamento(session, "licitacao", codigo_municipio, ano, 0)
             session.commit()
-            print(f"[INFO] Licitações carregadas para município {codigo_municipio}.")
+            logger.info(f"Licitações carregadas para município {codigo_municipio}.")
 
         except Exception as e:
-            print(f"[ERRO] Falha ao carregar licitações para município {codigo_municipio}: {e}")
+            logger.error(f"Falha ao carregar licitações para município {codigo_municipio}: {e}")
             session.rollback()
 
     session.close()
 
 
-def load_prestacao_contas():
+def load_prestacao_contas(municipios=None):
     engine = get_db_engine()
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    municipios = session.execute(text("SELECT id, codigo_municipio FROM municipio")).fetchall()
+    municipios = selecionar_municipios(session, "id, codigo_municipio", municipios)
 
     for municipio in municipios:
         municipio_id = municipio[0]
@@ -436,7 +614,7 @@ def load_prestacao_contas():
         try:
             prestacoes = get_prestacao_contas(codigo_municipio)
             if not prestacoes:
-                print(f"[INFO] Sem dados de prestação de contas para município {codigo_municipio}.")
+                logger.info(f"Sem dados de prestação de contas para município {codigo_municipio}.")
                 continue
 
             for prestacao in prestacoes:
@@ -448,8 +626,11 @@ def load_prestacao_contas():
                     continue
 
                 if ja_processado(session, "prestacao_contas", codigo_municipio, ano, mes):
-                    print(f"[SKIP] Prestação de contas {codigo_municipio}/{ano}/{mes} já processada.")
+                    logger.debug(f"Prestação de contas {codigo_municipio}/{ano}/{mes} já processada.")
+                    continue
+                if conteudo_inalterado(session, "prestacao_contas", codigo_municipio, ano, mes, [prestacao]):
                     continue
+                remover_versao_anterior(session, "prestacao_contas", codigo_municipio, ano, mes)
 
                 session.execute(text("""
                     INSERT INTO prestacao_contas (
@@ -473,79 +654,76 @@ def load_prestacao_contas():
                 registrar_processamento(session, "prestacao_contas", codigo_municipio, ano, mes)
 
             session.commit()
-            print(f"[INFO] Prestação de contas carregadas para município {codigo_municipio}.")
+            logger.info(f"Prestação de contas carregadas para município {codigo_municipio}.")
 
         except Exception as e:
-            print(f"[ERRO] Falha ao carregar prestação de contas para município {codigo_municipio}: {e}")
+            logger.error(f"Falha ao carregar prestação de contas para município {codigo_municipio}: {e}")
             session.rollback()
 
     session.close()
 
 
-def load_unidade_orcamentaria():
+def load_unidade_orcamentaria(municipios=None):
     engine = get_db_engine()
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    anos = [2023, 2024, 2025]
+    anos = anos_carga(ANOS_PADRAO)
 
-    for municipio_id in range(2, 186):
-        codigo_municipio = str(municipio_id).zfill(3)
+    for codigo_municipio in codigos_municipios(municipios):
 
         for ano in anos:
             exercicio_orcamento = f"{ano}00"
             if ja_processado(session, "unidade_orcamentaria", codigo_municipio, ano, 0):
-                print(f"[SKIP] Unidade orçamentária {codigo_municipio}/{ano} já processada.")
+                logger.debug(f"Unidade orçamentária {codigo_municipio}/{ano} já processada.")
                 continue
 
-            deslocamento = 0
-
             try:
-                while True:
-                    unidades = get_unidade_orcamentaria(codigo_municipio, exercicio_orcamento, quantidade=100, deslocamento=deslocamento)
-
-                    if not unidades:
-                        break
-
-                    for unidade in unidades:
-                        session.execute(text("""
-                            INSERT INTO unidade_orcamentaria (
-                                municipio_id, exercicio_orcamento, codigo_orgao, codigo_unidade,
-                                codigo_tipo_unidade, nome_unidade, tipo_administracao_unidade
-                            ) VALUES (
-                                (SELECT id FROM municipio WHERE codigo_municipio = :codigo_municipio),
-                                :exercicio_orcamento, :codigo_orgao, :codigo_unidade,
-                                :codigo_tipo_unidade, :nome_unidade, :tipo_administracao_unidade
-                            ) ON CONFLICT DO NOTHING
-                        """), {
-                            "codigo_municipio": codigo_municipio,
-                            "exercicio_orcamento": unidade.get("exercicio_orcamento"),
-                            "codigo_orgao": unidade.get("codigo_orgao", "").strip(),
-                            "codigo_unidade": unidade.get("codigo_unidade", "").strip(),
-                            "codigo_tipo_unidade": unidade.get("codigo_tipo_unidade"),
-                            "nome_unidade": unidade.get("nome_unidade"),
-                            "tipo_administracao_unidade": unidade.get("tipo_administracao_unidade")
-                        })
+                unidades = list(paginar(f"{API_BASE_URL}unidades_orcamentarias", {
+                    "codigo_municipio": codigo_municipio,
+                    "exercicio_orcamento": exercicio_orcamento,
+                }))
+                if conteudo_inalterado(session, "unidade_orcamentaria", codigo_municipio, ano, 0, unidades):
+                    continue
+                remover_versao_anterior(session, "unidade_orcamentaria", codigo_municipio, ano, 0)
 
-                    deslocamento += 100
+                for unidade in unidades:
+                    session.execute(text("""
+                        INSERT INTO unidade_orcamentaria (
+                            municipio_id, exercicio_orcamento, codigo_orgao, codigo_unidade,
+                            codigo_tipo_unidade, nome_unidade, tipo_administracao_unidade
+                        ) VALUES (
+                            (SELECT id FROM municipio WHERE codigo_municipio = :codigo_municipio),
+                            :exercicio_orcamento, :codigo_orgao, :codigo_unidade,
+                            :codigo_tipo_unidade, :nome_unidade, :tipo_administracao_unidade
+                        ) ON CONFLICT DO NOTHING
+                    """), {
+                        "codigo_municipio": codigo_municipio,
+                        "exercicio_orcamento": unidade.get("exercicio_orcamento"),
+                        "codigo_orgao": unidade.get("codigo_orgao", "").strip(),
+                        "codigo_unidade": unidade.get("codigo_unidade", "").strip(),
+                        "codigo_tipo_unidade": unidade.get("codigo_tipo_unidade"),
+                        "nome_unidade": unidade.get("nome_unidade"),
+                        "tipo_administracao_unidade": unidade.get("tipo_administracao_unidade")
+                    })
 
                 registrar_processamento(session, "unidade_orcamentaria", codigo_municipio, ano, 0)
                 session.commit()
-                print(f"[INFO] Unidade orçamentária {codigo_municipio}/{ano} carregada com sucesso.")
+                logger.info(f"Unidade orçamentária {codigo_municipio}/{ano} carregada com sucesso.")
 
             except Exception as e:
-                print(f"[ERRO] Falha ao carregar unidade orçamentária {codigo_municipio}/{ano}: {e}")
+                logger.error(f"Falha ao carregar unidade orçamentária {codigo_municipio}/{ano}: {e}")
                 session.rollback()
 
     session.close()
 
-def load_orcamentos():
+def load_orcamentos(municipios=None):
     engine = get_db_engine()
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    municipios = session.execute(text("SELECT id, codigo_municipio FROM municipio")).fetchall()
-    anos = [2023, 2024, 2025]
+    municipios = selecionar_municipios(session, "id, codigo_municipio", municipios)
+    anos = anos_carga(ANOS_PADRAO)
 
     for municipio in municipios:
         municipio_id = municipio[0]
@@ -553,7 +731,7 @@ def load_orcamentos():
 
         for ano in anos:
             if ja_processado(session, "orcamento", codigo_municipio, ano, 0):
-                print(f"[SKIP] Orçamento {codigo_municipio}/{ano} já processado.")
+                logger.debug(f"Orçamento {codigo_municipio}/{ano} já processado.")
                 continue
 
             exercicio_orcamento = f"{ano}00"
@@ -561,8 +739,11 @@ def load_orcamentos():
             try:
                 orcamentos = get_orcamentos(codigo_municipio, exercicio_orcamento)
                 if not orcamentos:
-                    print(f"[INFO] Sem orçamentos para município {codigo_municipio}, ano {ano}.")
+                    logger.info(f"Sem orçamentos para município {codigo_municipio}, ano {ano}.")
+                    continue
+                if conteudo_inalterado(session, "orcamento", codigo_municipio, ano, 0, orcamentos):
                     continue
+                remover_versao_anterior(session, "orcamento", codigo_municipio, ano, 0)
 
                 for orc in orcamentos:
                     session.execute(text("""
@@ -589,34 +770,34 @@ def load_orcamentos():
 
                 registrar_processamento(session, "orcamento", codigo_municipio, ano, 0)
                 session.commit()
-                print(f"[INFO] Orçamentos carregados para município {codigo_municipio}/{ano}.")
+                logger.info(f"Orçamentos carregados para município {codigo_municipio}/{ano}.")
 
             except Exception as e:
-                print(f"[ERRO] Falha ao carregar orçamento para município {codigo_municipio}/{ano}: {e}")
+                logger.error(f"Falha ao carregar orçamento para município {codigo_municipio}/{ano}: {e}")
                 session.rollback()
 
     session.close()
 
-def load_balancete_despesa_extra_orcamentaria():
+def load_balancete_despesa_extra_orcamentaria(municipios=None):
     engine = get_db_engine()
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    municipios = session.execute(text("SELECT id, codigo_municipio FROM municipio")).fetchall()
-    anos = [2023, 2024, 2025]
+    municipios = selecionar_municipios(session, "id, codigo_municipio", municipios)
+    anos = anos_carga(ANOS_PADRAO)
 
     for municipio in municipios:
         municipio_id, codigo_municipio = municipio
 
         for ano in anos:
-            for mes in range(1, 13):
+            for mes in meses_carga():
                 if ja_processado(session, "balancete_despesa_extra", codigo_municipio, ano, mes):
-                    print(f"[SKIP] Balancete extra {codigo_municipio}/{ano}/{mes} já processado.")
+                    logger.debug(f"Balancete extra {codigo_municipio}/{ano}/{mes} já processado.")
                     continue
 
                 exercicio_orcamento = f"{ano}00"
                 data_referencia = f"{ano}{mes:02}"
-                print(f"[INFO] Buscando balancete extra para {codigo_municipio} - {data_referencia}")
+                logger.debug(f"Buscando balancete extra para {codigo_municipio} - {data_referencia}")
 
                 try:
                     balancetes = fetch_data(
@@ -625,8 +806,11 @@ def load_balancete_despesa_extra_orcamentaria():
                     )
 
                     if not balancetes or "data" not in balancetes or not balancetes["data"]:
-                        print(f"[INFO] Sem dados de balancete extra para {codigo_municipio}/{ano}/{mes}.")
+                        logger.info(f"Sem dados de balancete extra para {codigo_municipio}/{ano}/{mes}.")
+                        continue
+                    if conteudo_inalterado(session, "balancete_despesa_extra", codigo_municipio, ano, mes, balancetes["data"]):
                         continue
+                    remover_versao_anterior(session, "balancete_despesa_extra", codigo_municipio, ano, mes)
 
                     for b in balancetes["data"]:
                         session.execute(text("""
@@ -643,99 +827,98 @@ def load_balancete_despesa_extra_orcamentaria():
 
                     registrar_processamento(session, "balancete_despesa_extra", codigo_municipio, ano, mes)
                     session.commit()
-                    print(f"[INFO] Balancete extra carregado para {codigo_municipio}/{ano}/{mes}.")
+                    logger.info(f"Balancete extra carregado para {codigo_municipio}/{ano}/{mes}.")
 
                 except Exception as e:
-                    print(f"[ERRO] Erro ao carregar balancete extra {codigo_municipio}/{ano}/{mes}: {e}")
+                    logger.error(f"Erro ao carregar balancete extra {codigo_municipio}/{ano}/{mes}: {e}")
                     session.rollback()
 
     session.close()
 
-def load_receita_extra_orcamentaria():
+def load_receita_extra_orcamentaria(municipios=None):
     engine = get_db_engine()
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    municipios = session.execute(text("SELECT id, codigo_municipio FROM municipio")).fetchall()
-    anos = [2023, 2024, 2025]
+    municipios = selecionar_municipios(session, "id, codigo_municipio", municipios)
+    anos = anos_carga(ANOS_PADRAO)
 
     for municipio in municipios:
         municipio_id, codigo_municipio = municipio
 
         for ano in anos:
-            for mes in range(1, 13):
+            for mes in meses_carga():
                 if ja_processado(session, "receita_extra", codigo_municipio, ano, mes):
-                    print(f"[SKIP] Receita extra {codigo_municipio}/{ano}/{mes} já processada.")
+                    logger.debug(f"Receita extra {codigo_municipio}/{ano}/{mes} já processada.")
                     continue
 
                 exercicio_orcamento = f"{ano}00"
                 data_referencia = f"{ano}{mes:02}"
 
-                print(f"[INFO] Buscando receita extra para {codigo_municipio} - {data_referencia}")
+                logger.debug(f"Buscando receita extra para {codigo_municipio} - {data_referencia}")
 
                 try:
-                    deslocamento = 0
-                    while True:
-                        response = fetch_data(
-                            f"https://api-dados-abertos.tce.ce.gov.br/balancete_receita_extra_orcamentaria?"
-                            f"codigo_municipio={codigo_municipio}&exercicio_orcamento={exercicio_orcamento}&data_referencia={data_referencia}"
-                            f"&quantidade=100&deslocamento={deslocamento}"
-                        )
-
-                        if not response or "data" not in response or not response["data"]:
-                            break
-
-                        for receita in response["data"]:
-                            session.execute(text("""
-                                INSERT INTO receita_extra_orcamentaria (
-                                    codigo_municipio, exercicio_orcamento, codigo_orgao, codigo_unidade,
-                                    codigo_conta_extraorcamentaria, data_referencia, tipo_balancete,
-                                    valor_anulacoes_empenhos_no_mes, valor_nulacoes_dotacao_ate_mes,
-                                    valor_arrecadacao_empenhos_no_mes, valor_arrecadacao_dotacao_ate_mes
-                                ) VALUES (
-                                    :codigo_municipio, :exercicio_orcamento, :codigo_orgao, :codigo_unidade,
-                                    :codigo_conta_extraorcamentaria, :data_referencia, :tipo_balancete,
-                                    :valor_anulacoes_empenhos_no_mes, :valor_nulacoes_dotacao_ate_mes,
-                                    :valor_arrecadacao_empenhos_no_mes, :valor_arrecadacao_dotacao_ate_mes
-                                ) ON CONFLICT DO NOTHING
-                            """), receita)
-
-                        deslocamento += 100
+                    receitas = list(paginar(f"{API_BASE_URL}balancete_receita_extra_orcamentaria", {
+                        "codigo_municipio": codigo_municipio,
+                        "exercicio_orcamento": exercicio_orcamento,
+                        "data_referencia": data_referencia,
+                    }))
+                    if conteudo_inalterado(session, "receita_extra", codigo_municipio, ano, mes, receitas):
+                        continue
+                    remover_versao_anterior(session, "receita_extra", codigo_municipio, ano, mes)
+
+                    for receita in receitas:
+                        session.execute(text("""
+                            INSERT INTO receita_extra_orcamentaria (
+                                codigo_municipio, exercicio_orcamento, codigo_orgao, codigo_unidade,
+                                codigo_conta_extraorcamentaria, data_referencia, tipo_balancete,
+                                valor_anulacoes_empenhos_no_mes, valor_nulacoes_dotacao_ate_mes,
+                                valor_arrecadacao_empenhos_no_mes, valor_arrecadacao_dotacao_ate_mes
+                            ) VALUES (
+                                :codigo_municipio, :exercicio_orcamento, :codigo_orgao, :codigo_unidade,
+                                :codigo_conta_extraorcamentaria, :data_referencia, :tipo_balancete,
+                                :valor_anulacoes_empenhos_no_mes, :valor_nulacoes_dotacao_ate_mes,
+                                :valor_arrecadacao_empenhos_no_mes, :valor_arrecadacao_dotacao_ate_mes
+                            ) ON CONFLICT DO NOTHING
+                        """), receita)
 
                     registrar_processamento(session, "receita_extra", codigo_municipio, ano, mes)
                     session.commit()
-                    print(f"[INFO] Receita extra carregada para {codigo_municipio}/{ano}/{mes}.")
+                    logger.info(f"Receita extra carregada para {codigo_municipio}/{ano}/{mes}.")
 
                 except Exception as e:
-                    print(f"[ERRO] Falha ao carregar receita extra {codigo_municipio}/{ano}/{mes}: {e}")
+                    logger.error(f"Falha ao carregar receita extra {codigo_municipio}/{ano}/{mes}: {e}")
                     session.rollback()
 
     session.close()
 
-def load_orcamentos_receita():
+def load_orcamentos_receita(municipios=None):
     engine = get_db_engine()
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    municipios = session.execute(text("SELECT codigo_municipio FROM municipio")).fetchall()
-    anos = [2023, 2024, 2025]
+    municipios = selecionar_municipios(session, "codigo_municipio", municipios)
+    anos = anos_carga(ANOS_PADRAO)
 
     for municipio in municipios:
         codigo_municipio = municipio[0]
 
         for ano in anos:
             if ja_processado(session, "orcamento_receita", codigo_municipio, ano, 0):
-                print(f"[SKIP] Orçamento Receita {codigo_municipio}/{ano} já processado.")
+                logger.debug(f"Orçamento Receita {codigo_municipio}/{ano} já processado.")
                 continue
 
             exercicio_orcamento = f"{ano}00"
-            print(f"[INFO] Buscando orçamento receita para {codigo_municipio}/{ano}...")
+            logger.debug(f"Buscando orçamento receita para {codigo_municipio}/{ano}...")
 
             try:
                 receitas = get_orcamentos_receita(codigo_municipio, exercicio_orcamento)
                 if not receitas:
-                    print(f"[INFO] Nenhum dado retornado para {codigo_municipio}/{ano}.")
+                    logger.info(f"Nenhum dado retornado para {codigo_municipio}/{ano}.")
+                    continue
+                if conteudo_inalterado(session, "orcamento_receita", codigo_municipio, ano, 0, receitas):
                     continue
+                remover_versao_anterior(session, "orcamento_receita", codigo_municipio, ano, 0)
 
                 for receita in receitas:
                     session.execute(text("""
@@ -752,38 +935,41 @@ def load_orcamentos_receita():
 
                 registrar_processamento(session, "orcamento_receita", codigo_municipio, ano, 0)
                 session.commit()
-                print(f"[INFO] Orçamento Receita carregado para {codigo_municipio}/{ano}.")
+                logger.info(f"Orçamento Receita carregado para {codigo_municipio}/{ano}.")
 
             except Exception as e:
-                print(f"[ERRO] Falha ao carregar orçamento receita {codigo_municipio}/{ano}: {e}")
+                logger.error(f"Falha ao carregar orçamento receita {codigo_municipio}/{ano}: {e}")
                 session.rollback()
 
     session.close()
 
-def load_despesa_elemento_projeto():
+def load_despesa_elemento_projeto(municipios=None):
     engine = get_db_engine()
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    municipios = session.execute(text("SELECT codigo_municipio FROM municipio")).fetchall()
-    anos = [2023, 2024, 2025]
+    municipios = selecionar_municipios(session, "codigo_municipio", municipios)
+    anos = anos_carga(ANOS_PADRAO)
 
     for municipio in municipios:
         codigo_municipio = municipio[0]
 
         for ano in anos:
             if ja_processado(session, "despesa_elemento_projeto", codigo_municipio, ano, 0):
-                print(f"[SKIP] Despesa Elemento Projeto {codigo_municipio}/{ano} já processado.")
+                logger.debug(f"Despesa Elemento Projeto {codigo_municipio}/{ano} já processado.")
                 continue
 
             exercicio_orcamento = f"{ano}00"
-            print(f"[INFO] Buscando despesa elemento projeto para {codigo_municipio}/{ano}...")
+            logger.debug(f"Buscando despesa elemento projeto para {codigo_municipio}/{ano}...")
 
             try:
                 dados = get_despesa_elemento_projeto(codigo_municipio, exercicio_orcamento)
                 if not dados:
-                    print(f"[INFO] Nenhum dado retornado para {codigo_municipio}/{ano}.")
+                    logger.info(f"Nenhum dado retornado para {codigo_municipio}/{ano}.")
+                    continue
+                if conteudo_inalterado(session, "despesa_elemento_projeto", codigo_municipio, ano, 0, dados):
                     continue
+                remover_versao_anterior(session, "despesa_elemento_projeto", codigo_municipio, ano, 0)
 
                 for item in dados:
                     session.execute(text("""
@@ -804,39 +990,42 @@ def load_despesa_elemento_projeto():
 
                 registrar_processamento(session, "despesa_elemento_projeto", codigo_municipio, ano, 0)
                 session.commit()
-                print(f"[INFO] Despesa Elemento Projeto carregado para {codigo_municipio}/{ano}.")
+                logger.info(f"Despesa Elemento Projeto carregado para {codigo_municipio}/{ano}.")
 
             except Exception as e:
-                print(f"[ERRO] Falha ao carregar despesa elemento projeto {codigo_municipio}/{ano}: {e}")
+                logger.error(f"Falha ao carregar despesa elemento projeto {codigo_municipio}/{ano}: {e}")
                 session.rollback()
 
     session.close()
 
 
-def load_despesa_projeto_atividade():
+def load_despesa_projeto_atividade(municipios=None):
     engine = get_db_engine()
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    municipios = session.execute(text("SELECT codigo_municipio FROM municipio")).fetchall()
-    anos = [2023, 2024, 2025]
+    municipios = selecionar_municipios(session, "codigo_municipio", municipios)
+    anos = anos_carga(ANOS_PADRAO)
 
     for municipio in municipios:
         codigo_municipio = municipio[0]
 
         for ano in anos:
             if ja_processado(session, "despesa_projeto_atividade", codigo_municipio, ano, 0):
-                print(f"[SKIP] Despesa Projeto Atividade {codigo_municipio}/{ano} já processada.")
+                logger.debug(f"Despesa Projeto Atividade {codigo_municipio}/{ano} já processada.")
                 continue
 
             exercicio_orcamento = f"{ano}00"
-            print(f"[INFO] Buscando despesa projeto atividade para {codigo_municipio}/{ano}...")
+            logger.debug(f"Buscando despesa projeto atividade para {codigo_municipio}/{ano}...")
 
             try:
                 dados = get_despesa_projeto_atividade(codigo_municipio, exercicio_orcamento)
                 if not dados:
-                    print(f"[INFO] Nenhum dado retornado para {codigo_municipio}/{ano}.")
+                    logger.info(f"Nenhum dado retornado para {codigo_municipio}/{ano}.")
                     continue
+                if conteudo_inalterado(session, "despesa_projeto_atividade", codigo_municipio, ano, 0, dados):
+                    continue
+                remover_versao_anterior(session, "despesa_projeto_atividade", codigo_municipio, ano, 0)
 
                 for item in dados:
                     session.execute(text("""
@@ -855,39 +1044,42 @@ def load_despesa_projeto_atividade():
 
                 registrar_processamento(session, "despesa_projeto_atividade", codigo_municipio, ano, 0)
                 session.commit()
-                print(f"[INFO] Despesa Projeto Atividade carregada para {codigo_municipio}/{ano}.")
+                logger.info(f"Despesa Projeto Atividade carregada para {codigo_municipio}/{ano}.")
 
             except Exception as e:
-                print(f"[ERRO] Falha ao carregar despesa projeto atividade {codigo_municipio}/{ano}: {e}")
+                logger.error(f"Falha ao carregar despesa projeto atividade {codigo_municipio}/{ano}: {e}")
                 session.rollback()
 
     session.close()
 
 
-def load_despesa_categoria_economica():
+def load_despesa_categoria_economica(municipios=None):
     engine = get_db_engine()
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    municipios = session.execute(text("SELECT codigo_municipio FROM municipio")).fetchall()
-    anos = [2023, 2024, 2025]
+    municipios = selecionar_municipios(session, "codigo_municipio", municipios)
+    anos = anos_carga(ANOS_PADRAO)
 
     for municipio in municipios:
         codigo_municipio = municipio[0]
 
         for ano in anos:
             if ja_processado(session, "despesa_categoria_economica", codigo_municipio, ano, 0):
-                print(f"[SKIP] Despesa Categoria Econômica {codigo_municipio}/{ano} já processada.")
+                logger.debug(f"Despesa Categoria Econômica {codigo_municipio}/{ano} já processada.")
                 continue
 
             exercicio_orcamento = f"{ano}00"
-            print(f"[INFO] Buscando despesa categoria econômica para {codigo_municipio}/{ano}...")
+            logger.debug(f"Buscando despesa categoria econômica para {codigo_municipio}/{ano}...")
 
             try:
                 dados = get_despesa_categoria_economica(codigo_municipio, exercicio_orcamento)
                 if not dados:
-                    print(f"[INFO] Nenhum dado retornado para {codigo_municipio}/{ano}.")
+                    logger.info(f"Nenhum dado retornado para {codigo_municipio}/{ano}.")
+                    continue
+                if conteudo_inalterado(session, "despesa_categoria_economica", codigo_municipio, ano, 0, dados):
                     continue
+                remover_versao_anterior(session, "despesa_categoria_economica", codigo_municipio, ano, 0)
 
                 for item in dados:
                     session.execute(text("""
@@ -904,142 +1096,200 @@ def load_despesa_categoria_economica():
 
                 registrar_processamento(session, "despesa_categoria_economica", codigo_municipio, ano, 0)
                 session.commit()
-                print(f"[INFO] Despesa Categoria Econômica carregada para {codigo_municipio}/{ano}.")
+                logger.info(f"Despesa Categoria Econômica carregada para {codigo_municipio}/{ano}.")
 
             except Exception as e:
-                print(f"[ERRO] Falha ao carregar despesa categoria econômica {codigo_municipio}/{ano}: {e}")
+                logger.error(f"Falha ao carregar despesa categoria econômica {codigo_municipio}/{ano}: {e}")
                 session.rollback()
 
     session.close()
 
-def load_liquidacoes():
+INSERIR_LIQUIDACAO = text("""
+    INSERT INTO liquidacoes (
+        codigo_municipio, exercicio_orcamento, codigo_orgao, codigo_unidade,
+        data_emissao_empenho, numero_empenho, data_liquidacao, data_referencia_liquidacao,
+        nome_responsavel_liquidacao, numero_sub_empenho_liquidacao, valor_liquidado,
+        estado_de_estorno, estado_folha
+    ) VALUES (
+        :codigo_municipio, :exercicio_orcamento, :codigo_orgao, :codigo_unidade,
+        :data_emissao_empenho, :numero_empenho, :data_liquidacao, :data_referencia_liquidacao,
+        :nome_responsavel_liquidacao, :numero_sub_empenho_liquidacao, :valor_liquidado,
+        :estado_de_estorno, :estado_folha
+    ) ON CONFLICT DO NOTHING
+""")
+
+def load_liquidacoes(municipios=None):
     engine = get_db_engine()
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    municipios = session.execute(text("SELECT codigo_municipio FROM municipio")).fetchall()
-    anos = [2023, 2024, 2025]
+    municipios = selecionar_municipios(session, "codigo_municipio", municipios)
+    anos = anos_carga(ANOS_PADRAO)
 
     for municipio in municipios:
         codigo_municipio = municipio[0]
 
         for ano in anos:
             if ja_processado(session, "liquidacoes", codigo_municipio, ano, 0):
-                print(f"[SKIP] Liquidações {codigo_municipio}/{ano} já processadas.")
+                logger.debug(f"Liquidações {codigo_municipio}/{ano} já processadas.")
                 continue
 
             exercicio_orcamento = f"{ano}00"
-            deslocamento = 0
-            print(f"[INFO] Buscando liquidações para {codigo_municipio}/{ano}...")
+            logger.debug(f"Buscando liquidações para {codigo_municipio}/{ano}...")
 
+            url = f"{API_BASE_URL}liquidacoes"
+            params = {"codigo_municipio": codigo_municipio, "exercicio_orcamento": exercicio_orcamento}
             try:
-                while True:
-                    liquidacoes = get_liquidacoes(codigo_municipio, exercicio_orcamento, 100, deslocamento)
-                    if not liquidacoes:
-                        break
+                garantir_particao(session.get_bind(), "liquidacoes", ano)
+                if not ControleCarga.da_sessao(session).ja_registrado("liquidacoes", codigo_municipio, ano, 0):
+                    # Primeira carga: página a página, retomável pelo checkpoint
+                    if carregar_paginado(
+                        session, "liquidacoes", (codigo_municipio, ano, 0), url, params,
+                        lambda pagina: session.execute(INSERIR_LIQUIDACAO, pagina),
+                        lambda: session.execute(text(
+                            "DELETE FROM liquidacoes WHERE codigo_municipio = :codigo AND exercicio_orcamento = :exercicio"
+                        ), {"codigo": codigo_municipio, "exercicio": exercicio_orcamento}),
+                    ):
+                        logger.info(f"Liquidações carregadas para {codigo_municipio}/{ano}.")
+                    continue
 
-                    for liquidacao in liquidacoes:
-                        session.execute(text("""
-                            INSERT INTO liquidacoes (
-                                codigo_municipio, exercicio_orcamento, codigo_orgao, codigo_unidade,
-                                data_emissao_empenho, numero_empenho, data_liquidacao, data_referencia_liquidacao,
-                                nome_responsavel_liquidacao, numero_sub_empenho_liquidacao, valor_liquidado,
-                                estado_de_estorno, estado_folha
-                            ) VALUES (
-                                :codigo_municipio, :exercicio_orcamento, :codigo_orgao, :codigo_unidade,
-                                :data_emissao_empenho, :numero_empenho, :data_liquidacao, :data_referencia_liquidacao,
-                                :nome_responsavel_liquidacao, :numero_sub_empenho_liquidacao, :valor_liquidado,
-                                :estado_de_estorno, :estado_folha
-                            ) ON CONFLICT DO NOTHING
-                        """), liquidacao)
-                    
-                    deslocamento += 100
+                liquidacoes = list(paginar(url, params))
+                if conteudo_inalterado(session, "liquidacoes", codigo_municipio, ano, 0, liquidacoes):
+                    continue
+                remover_versao_anterior(session, "liquidacoes", codigo_municipio, ano, 0)
+
+                for liquidacao in liquidacoes:
+                    session.execute(INSERIR_LIQUIDACAO, liquidacao)
 
                 registrar_processamento(session, "liquidacoes", codigo_municipio, ano, 0)
                 session.commit()
-                print(f"[INFO] Liquidações carregadas para {codigo_municipio}/{ano}.")
+                logger.info(f"Liquidações carregadas para {codigo_municipio}/{ano}.")
 
             except Exception as e:
-                print(f"[ERRO] Falha ao carregar liquidações {codigo_municipio}/{ano}: {e}")
+                logger.error(f"Falha ao carregar liquidações {codigo_municipio}/{ano}: {e}")
                 session.rollback()
 
     session.close()
 
-def load_notas_empenho():
+def _buscar_notas_empenho(stream):
+    """Pagina as notas de um (município, mês, órgão); a falha é devolvida para o mês não ser registrado."""
+    codigo_municipio, ano, mes, codigo_orgao = stream
+    try:
+        return None, list(paginar(f"{API_BASE_URL}notas_empenhos", {
+            "codigo_municipio": codigo_municipio,
+            "data_referencia_empenho": f"{ano}{mes:02}",
+            "codigo_orgao": codigo_orgao,
+        }))
+    except Exception as e:
+        return e, None
+
+def _inserir_notas_empenho(session, particao, notas_empenho):
+    codigo_municipio, ano, mes = particao
+    data_referencia_empenho = f"{ano}{mes:02}"
+    try:
+        if conteudo_inalterado(session, "notas_empenho", codigo_municipio, ano, mes, notas_empenho):
+            return
+        garantir_particao(session.get_bind(), "notas_empenho", ano)
+        remover_versao_anterior(session, "notas_empenho", codigo_municipio, ano, mes)
+        for nota in notas_empenho:
+            session.execute(text("""
+                INSERT INTO notas_empenho (
+                    codigo_municipio, exercicio_orcamento, codigo_orgao, codigo_unidade,
+                    data_emissao_empenho, numero_empenho, data_referencia_empenho,
+                    codigo_funcao, codigo_subfuncao, codigo_programa, codigo_projeto_atividade,
+                    numero_projeto_atividade, numero_subprojeto_atividade, codigo_elemento_despesa,
+                    modalidade_empenho, descricao_empenho, valor_anterior_saldo_dotacao,
+                    valor_empenhado, valor_atual_saldo_dotacao, tipo_processo_licitatorio,
+                    numero_documento_negociante, estado_empenho, numero_nota_anulacao,
+                    data_emissao_empenho_substituto, numero_empenho_substituto, cd_cpf_gestor,
+                    cpf_gestor_contrato, codigo_tipo_negociante, nome_negociante,
+                    endereco_negociante, fone_negociante, cep_negociante,
+                    nome_municipio_negociante, codigo_uf, tipo_fonte, codigo_fonte,
+                    codigo_contrato, data_contrato, numero_licitacao
+                ) VALUES (
+                    :codigo_municipio, :exercicio_orcamento, :codigo_orgao, :codigo_unidade,
+                    :data_emissao_empenho, :numero_empenho, :data_referencia_empenho,
+                    :codigo_funcao, :codigo_subfuncao, :codigo_programa, :codigo_projeto_atividade,
+                    :numero_projeto_atividade, :numero_subprojeto_atividade, :codigo_elemento_despesa,
+                    :modalidade_empenho, :descricao_empenho, :valor_anterior_saldo_dotacao,
+                    :valor_empenhado, :valor_atual_saldo_dotacao, :tipo_processo_licitatorio,
+                    :numero_documento_negociante, :estado_empenho, :numero_nota_anulacao,
+                    :data_emissao_empenho_substituto, :numero_empenho_substituto, :cd_cpf_gestor,
+                    :cpf_gestor_contrato, :codigo_tipo_negociante, :nome_negociante,
+                    :endereco_negociante, :fone_negociante, :cep_negociante,
+                    :nome_municipio_negociante, :codigo_uf, :tipo_fonte, :codigo_fonte,
+                    :codigo_contrato, :data_contrato, :numero_licitacao
+                ) ON CONFLICT DO NOTHING
+            """), nota)
+
+        registrar_processamento(session, "notas_empenho", codigo_municipio, ano, mes)
+        session.commit()
+        logger.info(f"Notas de empenho carregadas para {codigo_municipio}/{data_referencia_empenho}.")
+
+    except Exception as e:
+        logger.error(f"Falha ao carregar notas de empenho {codigo_municipio}/{data_referencia_empenho}: {e}")
+        session.rollback()
+
+def load_notas_empenho(municipios=None, concorrente=True):
+    """Carrega as notas de empenho com um fluxo paginado independente por (município, mês, órgão).
+
+    Os fluxos rodam em paralelo no FetchEngine (limite por endpoint de FETCH_CONFIG); cada mês é
+    gravado e registrado quando todos os seus órgãos terminam, e não é registrado se algum falhar.
+    """
     engine = get_db_engine()
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    municipios = session.execute(text("SELECT codigo_municipio FROM municipio")).fetchall()
-    anos = [2023, 2024, 2025]
+    municipios = selecionar_municipios(session, "codigo_municipio", municipios)
+    anos = anos_carga(ANOS_PADRAO)
 
+    streams = []
+    meses = {}
     for municipio in municipios:
         codigo_municipio = municipio[0]
 
         for ano in anos:
-            for mes in range(1, 13):
+            orgaos = None
+            for mes in meses_carga():
                 if ja_processado(session, "notas_empenho", codigo_municipio, ano, mes):
-                    print(f"[SKIP] Notas de empenho {codigo_municipio}/{ano}/{mes} já processadas.")
+                    logger.debug(f"Notas de empenho {codigo_municipio}/{ano}/{mes} já processadas.")
                     continue
 
-                data_referencia_empenho = f"{ano}{mes:02}"
-                deslocamento = 0
-                print(f"[INFO] Buscando notas de empenho para {codigo_municipio}/{data_referencia_empenho}...")
-
-                try:
-                    while True:
-                        # A API de notas de empenho parece precisar de um código de órgão.
-                        # Vou iterar sobre os órgãos do município para o exercício.
-                        orgaos = session.execute(text("SELECT codigo_orgao FROM orgao WHERE municipio_id = (SELECT id FROM municipio WHERE codigo_municipio = :codigo_municipio) AND exercicio_orcamento = :exercicio_orcamento"), {"codigo_municipio": codigo_municipio, "exercicio_orcamento": f"{ano}00"}).fetchall()
-                        
-                        for orgao in orgaos:
-                            codigo_orgao = orgao[0]
-                            notas_empenho = get_notas_empenho(codigo_municipio, data_referencia_empenho, codigo_orgao, 100, deslocamento)
-                            
-                            if not notas_empenho:
-                                continue
-
-                            for nota in notas_empenho:
-                                session.execute(text("""
-                                    INSERT INTO notas_empenho (
-                                        codigo_municipio, exercicio_orcamento, codigo_orgao, codigo_unidade,
-                                        data_emissao_empenho, numero_empenho, data_referencia_empenho,
-                                        codigo_funcao, codigo_subfuncao, codigo_programa, codigo_projeto_atividade,
-                                        numero_projeto_atividade, numero_subprojeto_atividade, codigo_elemento_despesa,
-                                        modalidade_empenho, descricao_empenho, valor_anterior_saldo_dotacao,
-                                        valor_empenhado, valor_atual_saldo_dotacao, tipo_processo_licitatorio,
-                                        numero_documento_negociante, estado_empenho, numero_nota_anulacao,
-                                        data_emissao_empenho_substituto, numero_empenho_substituto, cd_cpf_gestor,
-                                        cpf_gestor_contrato, codigo_tipo_negociante, nome_negociante,
-                                        endereco_negociante, fone_negociante, cep_negociante,
-                                        nome_municipio_negociante, codigo_uf, tipo_fonte, codigo_fonte,
-                                        codigo_contrato, data_contrato, numero_licitacao
-                                    ) VALUES (
-                                        :codigo_municipio, :exercicio_orcamento, :codigo_orgao, :codigo_unidade,
-                                        :data_emissao_empenho, :numero_empenho, :data_referencia_empenho,
-                                        :codigo_funcao, :codigo_subfuncao, :codigo_programa, :codigo_projeto_atividade,
-                                        :numero_projeto_atividade, :numero_subprojeto_atividade, :codigo_elemento_despesa,
-                                        :modalidade_empenho, :descricao_empenho, :valor_anterior_saldo_dotacao,
-                                        :valor_empenhado, :valor_atual_saldo_dotacao, :tipo_processo_licitatorio,
-                                        :numero_documento_negociante, :estado_empenho, :numero_nota_anulacao,
-                                        :data_emissao_empenho_substituto, :numero_empenho_substituto, :cd_cpf_gestor,
-                                        :cpf_gestor_contrato, :codigo_tipo_negociante, :nome_negociante,
-                                        :endereco_negociante, :fone_negociante, :cep_negociante,
-                                        :nome_municipio_negociante, :codigo_uf, :tipo_fonte, :codigo_fonte,
-                                        :codigo_contrato, :data_contrato, :numero_licitacao
-                                    ) ON CONFLICT DO NOTHING
-                                """), nota)
-                        
-                        deslocamento += 100
-                        if len(notas_empenho) < 100:
-                            break
-
-                    registrar_processamento(session, "notas_empenho", codigo_municipio, ano, mes)
-                    session.commit()
-                    print(f"[INFO] Notas de empenho carregadas para {codigo_municipio}/{data_referencia_empenho}.")
-
-                except Exception as e:
-                    print(f"[ERRO] Falha ao carregar notas de empenho {codigo_municipio}/{data_referencia_empenho}: {e}")
-                    session.rollback()
+                # Lista de órgãos lida uma vez por município/exercício
+                if orgaos is None:
+                    orgaos = [row[0] for row in session.execute(text("SELECT codigo_orgao FROM orgao WHERE municipio_id = (SELECT id FROM municipio WHERE codigo_municipio = :codigo_municipio) AND exercicio_orcamento = :exercicio_orcamento"), {"codigo_municipio": codigo_municipio, "exercicio_orcamento": f"{ano}00"}).fetchall()]
+
+                # Sem órgãos carregados os meses do exercício não são registrados: ficam para depois da carga de órgãos
+                if not orgaos:
+                    logger.warning(f"Sem órgãos para {codigo_municipio}/{ano}; notas de empenho do exercício não carregadas (execute load_orgaos antes).")
+                    break
+
+                meses[(codigo_municipio, ano, mes)] = {"restantes": len(orgaos), "notas": [], "falhas": []}
+                streams.extend((codigo_municipio, ano, mes, codigo_orgao) for codigo_orgao in orgaos)
+
+    def consumir(stream, resultado):
+        codigo_municipio, ano, mes, codigo_orgao = stream
+        erro, notas = resultado
+        estado = meses[(codigo_municipio, ano, mes)]
+        estado["restantes"] -= 1
+        if erro is not None:
+            logger.error(f"Falha ao buscar notas de empenho {codigo_municipio}/{ano}{mes:02} do órgão {codigo_orgao}: {erro}")
+            estado["falhas"].append(codigo_orgao)
+        else:
+            estado["notas"].extend(notas)
+
+        if estado["restantes"] == 0:
+            del meses[(codigo_municipio, ano, mes)]
+            if estado["falhas"]:
+                logger.error(f"Notas de empenho {codigo_municipio}/{ano}{mes:02} não registradas (órgãos com falha: {', '.join(estado['falhas'])}).")
+            else:
+                _inserir_notas_empenho(session, (codigo_municipio, ano, mes), estado["notas"])
+
+    logger.info(f"Buscando notas de empenho em {len(streams)} fluxos (município, mês, órgão).")
+    if concorrente:
+        FetchEngine().executar("notas_empenhos", streams, _buscar_notas_empenho, consumir)
+    else:
+        for stream in streams:
+            consumir(stream, _buscar_notas_empenho(stream))
 
     session.close()
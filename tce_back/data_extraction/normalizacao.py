@@ -0,0 +1,101 @@
+# normalizacao.py
+import logging
+from collections import namedtuple
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Tipos de campo
+TEXTO = "texto"
+NUMERO = "numero"
+INTEIRO = "inteiro"
+DATA = "data"
+
+# Maior valor aceito por NUMERIC(15, 2)
+LIMITE_NUMERIC_15_2 = 10 ** 13
+
+# Coluna da tabela, campo de origem no JSON da API (padrão: o mesmo nome), tipo, valor padrão
+# para campos ausentes ou nulos e tamanho máximo (VARCHAR) ou limite absoluto (NUMERIC)
+Campo = namedtuple("Campo", ["coluna", "origem", "tipo", "padrao", "limite"], defaults=(None, TEXTO, None, None))
+
+def _serie(bruto, campo):
+    origem = campo.origem or campo.coluna
+    if origem in bruto:
+        return bruto[origem]
+    return pd.Series(None, index=bruto.index, dtype=object)
+
+def normalizar(registros, esquema, constantes=None, descricao=""):
+    """Converte uma página ou partição de registros da API num lote colunar tipado (DataFrame).
+
+    As colunas saem na ordem de `constantes` (valores fixos da partição, como municipio_id/ano/mes)
+    seguida do `esquema`. Texto é aparado; números e datas são validados de uma vez por coluna e os
+    ausentes recebem o padrão do campo. Números são arredondados em 2 casas (escala de NUMERIC(15, 2)),
+    o que elimina o ruído de float64 no COPY. Nenhuma linha é descartada: valores que não convertem
+    (inclusive booleanos e inteiros fracionários), números fora do limite viram NULL e texto maior que a
+    coluna é truncado, com aviso, em vez de abortar a transação no banco.
+    """
+    # dtype=object preserva os valores do JSON: sem inferência, um código inteiro com nulos na página
+    # não vira float64 (5 -> "5.0") antes de ser convertido para texto
+    bruto = pd.DataFrame(list(registros), dtype=object)
+    lote = pd.DataFrame(index=bruto.index)
+    for coluna, valor in (constantes or {}).items():
+        lote[coluna] = valor
+
+    for campo in esquema:
+        serie = _serie(bruto, campo)
+        if campo.tipo == TEXTO:
+            valores = serie.astype("string").str.strip()
+            if campo.padrao is not None:
+                valores = valores.fillna(campo.padrao)
+            if campo.limite:
+                longos = valores.str.len().gt(campo.limite).fillna(False)
+                if longos.any():
+                    logger.warning(
+                        f"{descricao}: {int(longos.sum())} valores de {campo.coluna} truncados em {campo.limite} caracteres "
+                        f"(ex.: {valores[longos].iloc[0]!r})."
+                    )
+                    valores = valores.str.slice(0, campo.limite)
+        elif campo.tipo in (NUMERO, INTEIRO):
+            # Booleanos do JSON virariam 1/0 no to_numeric
+            booleanos = serie.map(type).eq(bool)
+            numeros = pd.to_numeric(serie.mask(booleanos), errors="coerce")
+            invalidos = (numeros.isna() | numeros.isin([float("inf"), float("-inf")])) & serie.notna()
+            if invalidos.any():
+                logger.warning(
+                    f"{descricao}: {int(invalidos.sum())} valores não numéricos em {campo.coluna} gravados como NULL "
+                    f"(ex.: {serie[invalidos].iloc[0]!r})."
+                )
+            if campo.limite:
+                fora = numeros.abs().ge(campo.limite).fillna(False) & ~invalidos
+                if fora.any():
+                    logger.warning(
+                        f"{descricao}: {int(fora.sum())} valores de {campo.coluna} fora do limite da coluna gravados como NULL "
+                        f"(ex.: {serie[fora].iloc[0]!r})."
+                    )
+                    invalidos |= fora
+            if campo.tipo == INTEIRO:
+                fracionarios = numeros.mod(1).ne(0) & numeros.notna() & ~invalidos
+                if fracionarios.any():
+                    logger.warning(
+                        f"{descricao}: {int(fracionarios.sum())} valores fracionários em {campo.coluna} gravados como NULL "
+                        f"(ex.: {serie[fracionarios].iloc[0]!r})."
+                    )
+                    invalidos |= fracionarios
+            numeros = numeros.mask(invalidos)
+            if campo.padrao is not None:
+                numeros = numeros.where(serie.notna(), campo.padrao)
+            valores = numeros.astype("Int64") if campo.tipo == INTEIRO else numeros.round(2)
+        elif campo.tipo == DATA:
+            valores = pd.to_datetime(serie, errors="coerce")
+            invalidos = valores.isna() & serie.notna()
+            if invalidos.any():
+                logger.warning(
+                    f"{descricao}: {int(invalidos.sum())} datas inválidas em {campo.coluna} gravadas como NULL "
+                    f"(ex.: {serie[invalidos].iloc[0]!r})."
+                )
+            valores = valores.dt.date.astype(object).where(valores.notna(), None)
+        else:
+            raise ValueError(f"Tipo de campo inválido: {campo.tipo}")
+        lote[campo.coluna] = valores
+
+    return lote
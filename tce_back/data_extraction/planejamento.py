@@ -0,0 +1,176 @@
+# planejamento.py
+import logging
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from database.db_config import get_db_engine
+from database.controle_carga import ControleCarga
+from data_extraction.data_loader import ANOS_PADRAO, CODIGOS_MUNICIPIOS, anos_ate_atual, anos_carga, meses_carga
+
+logger = logging.getLogger(__name__)
+
+# Tamanho de página usado por `paginar`
+REGISTROS_POR_PAGINA = 100
+
+# Intervalos entre registros consecutivos de um tipo acima deste limite separam execuções diferentes
+INTERVALO_MAXIMO_SEGUNDOS = 600
+
+def _meses_ate_atual(ano):
+    agora = datetime.now()
+    return meses_carga(12 if ano < agora.year else agora.month)
+
+# Partições percorridas por loader (espelha os laços de data_loader): tipo_dado em controle_carga,
+# anos, meses (None = partição anual, mes 0), se o endpoint é paginado (várias chamadas por partição)
+# e se cada partição é buscada em um fluxo por órgão (tabela orgao do município/exercício)
+PLANO_LOADERS = {
+    "load_orgaos": {"tipo": "orgao", "anos": lambda: anos_carga(anos_ate_atual()), "meses": None, "paginado": False},
+    "load_receitas": {"tipo": "receita", "anos": lambda: anos_carga(anos_ate_atual()), "meses": _meses_ate_atual, "paginado": False},
+    "load_despesas": {"tipo": "despesa", "anos": lambda: anos_carga(anos_ate_atual()), "meses": _meses_ate_atual, "paginado": True},
+    "load_agentes_publicos": {"tipo": "agente_publico", "anos": lambda: anos_carga(anos_ate_atual()), "meses": None, "paginado": True},
+    "load_licitacao": {"tipo": "licitacao", "anos": lambda: [2023], "meses": None, "paginado": False},
+    # Uma chamada por município sempre; as partições (ano/mês) só são conhecidas após a busca
+    "load_prestacao_contas": {"tipo": "prestacao_contas", "anos": None, "meses": None, "paginado": False},
+    "load_unidade_orcamentaria": {"tipo": "unidade_orcamentaria", "anos": lambda: anos_carga(ANOS_PADRAO), "meses": None, "paginado": True},
+    "load_orcamentos": {"tipo": "orcamento", "anos": lambda: anos_carga(ANOS_PADRAO), "meses": None, "paginado": False},
+    "load_balancete_despesa_extra_orcamentaria": {"tipo": "balancete_despesa_extra", "anos": lambda: anos_carga(ANOS_PADRAO), "meses": lambda ano: meses_carga(), "paginado": False},
+    "load_receita_extra_orcamentaria": {"tipo": "receita_extra", "anos": lambda: anos_carga(ANOS_PADRAO), "meses": lambda ano: meses_carga(), "paginado": True},
+    "load_orcamentos_receita": {"tipo": "orcamento_receita", "anos": lambda: anos_carga(ANOS_PADRAO), "meses": None, "paginado": False},
+    "load_despesa_elemento_projeto": {"tipo": "despesa_elemento_projeto", "anos": lambda: anos_carga(ANOS_PADRAO), "meses": None, "paginado": False},
+    "load_despesa_projeto_atividade": {"tipo": "despesa_projeto_atividade", "anos": lambda: anos_carga(ANOS_PADRAO), "meses": None, "paginado": False},
+    "load_despesa_categoria_economica": {"tipo": "despesa_categoria_economica", "anos": lambda: anos_carga(ANOS_PADRAO), "meses": None, "paginado": False},
+    "load_liquidacoes": {"tipo": "liquidacoes", "anos": lambda: anos_carga(ANOS_PADRAO), "meses": None, "paginado": True},
+    "load_notas_empenho": {"tipo": "notas_empenho", "anos": lambda: anos_carga(ANOS_PADRAO), "meses": lambda ano: meses_carga(), "paginado": True, "por_orgao": True},
+}
+
+def _particoes(plano, codigos):
+    for codigo in codigos:
+        for ano in plano["anos"]():
+            for mes in (plano["meses"](ano) if plano["meses"] else [0]):
+                yield codigo, ano, mes
+
+def orgaos_por_exercicio(session):
+    """Quantidade de órgãos por (codigo_municipio, ano), como load_notas_empenho os lê da tabela orgao."""
+    linhas = session.execute(text("""
+        SELECT m.codigo_municipio, o.exercicio_orcamento, COUNT(*)
+        FROM orgao o
+        JOIN municipio m ON m.id = o.municipio_id
+        GROUP BY m.codigo_municipio, o.exercicio_orcamento
+    """)).fetchall()
+    return {(codigo, exercicio): total for codigo, exercicio, total in linhas}
+
+def _chamadas_por_orgao(particoes, orgaos, paginas):
+    """Chamadas de partições buscadas em um fluxo paginado por órgão.
+
+    Cada fluxo custa ao menos uma chamada e as páginas medidas (registros da partição inteira) se
+    dividem entre eles. Sem órgãos, o loader pula o exercício e não chama a API.
+    """
+    chamadas = 0
+    for codigo, ano, _ in particoes:
+        fluxos = orgaos.get((str(codigo), f"{ano}00"), 0)
+        if fluxos:
+            chamadas += max(fluxos, paginas)
+    return round(chamadas)
+
+def historico_por_tipo(session):
+    """Por tipo_dado: média de registros e de páginas por partição e segundos por partição.
+
+    O tempo é a mediana dos intervalos entre registros consecutivos do tipo em controle_carga
+    (intervalos longos separam execuções e são descartados); reflete a vazão medida, inclusive o
+    paralelismo das execuções anteriores. As páginas são estimadas pela quantidade de registros.
+    """
+    linhas = session.execute(text("""
+        SELECT
+            tipo_dado,
+            AVG(registros),
+            AVG(GREATEST(CEIL(registros / :por_pagina), 1)) FILTER (WHERE registros IS NOT NULL),
+            percentile_cont(0.5) WITHIN GROUP (ORDER BY intervalo) FILTER (WHERE intervalo <= :intervalo_maximo)
+        FROM (
+            SELECT tipo_dado, registros,
+                   EXTRACT(EPOCH FROM processado_em - LAG(processado_em) OVER (PARTITION BY tipo_dado ORDER BY processado_em)) AS intervalo
+            FROM controle_carga
+        ) t
+        GROUP BY tipo_dado
+    """), {"por_pagina": float(REGISTROS_POR_PAGINA), "intervalo_maximo": INTERVALO_MAXIMO_SEGUNDOS}).fetchall()
+    return {
+        tipo: {
+            "registros": float(registros) if registros is not None else None,
+            "paginas": float(paginas) if paginas is not None else None,
+            "segundos": float(segundos) if segundos is not None else None,
+        }
+        for tipo, registros, paginas, segundos in linhas
+    }
+
+def planejar(loaders, municipios=None):
+    """Estima o custo de uma carga sem chamar a API e sem gravar no banco.
+
+    Para cada loader conta as partições pendentes (mesma regra de controle_carga dos loaders, incluindo
+    os modos de atualização e recarga forçada) e estima chamadas à API, registros e tempo a partir do
+    histórico de controle_carga. Retorna uma lista de dicionários, um por loader.
+    """
+    session = sessionmaker(bind=get_db_engine())()
+    try:
+        if not municipios:
+            municipios = session.execute(
+                text("SELECT codigo_municipio FROM municipio ORDER BY codigo_municipio")
+            ).scalars().all() or CODIGOS_MUNICIPIOS
+        controle = ControleCarga.da_sessao(session)
+        historico = historico_por_tipo(session)
+        orgaos = None
+
+        plano = []
+        for nome in loaders:
+            loader = PLANO_LOADERS[nome]
+            tipo = loader["tipo"]
+            medido = historico.get(tipo, {})
+            if loader["anos"] is None:
+                pendentes = None
+                chamadas = len(municipios)
+                particoes = len(municipios)
+            else:
+                particoes_pendentes = [
+                    particao for particao in _particoes(loader, municipios) if not controle.ja_processado(tipo, *particao)
+                ]
+                pendentes = len(particoes_pendentes)
+                paginas = (medido.get("paginas") if loader["paginado"] else 1) or 1
+                if loader.get("por_orgao"):
+                    if orgaos is None:
+                        orgaos = orgaos_por_exercicio(session)
+                    chamadas = _chamadas_por_orgao(particoes_pendentes, orgaos, paginas)
+                else:
+                    chamadas = round(pendentes * paginas)
+                particoes = pendentes
+            registros = medido.get("registros")
+            segundos = medido.get("segundos")
+            plano.append({
+                "loader": nome,
+                "tipo_dado": tipo,
+                "pendentes": pendentes,
+                "chamadas": chamadas,
+                "registros": round(particoes * registros) if registros is not None else None,
+                "segundos": particoes * segundos if segundos is not None else None,
+            })
+        return plano
+    finally:
+        session.rollback()
+        session.close()
+
+def _duracao(segundos):
+    if segundos is None:
+        return "sem histórico"
+    horas, resto = divmod(int(segundos), 3600)
+    return f"{horas}h{resto // 60:02d}m{resto % 60:02d}s"
+
+def imprimir_plano(plano):
+    logger.info("Plano de carga (simulação: nenhuma chamada à API nem escrita no banco):")
+    for item in plano:
+        pendentes = "n/d" if item["pendentes"] is None else item["pendentes"]
+        registros = "n/d" if item["registros"] is None else item["registros"]
+        logger.info(
+            f"  {item['loader']} ({item['tipo_dado']}): {pendentes} partições pendentes, "
+            f"~{item['chamadas']} chamadas, ~{registros} registros, tempo estimado {_duracao(item['segundos'])}"
+        )
+    total = sum(item["segundos"] or 0 for item in plano)
+    logger.info(
+        f"Total: ~{sum(item['chamadas'] for item in plano)} chamadas à API, "
+        f"tempo estimado {_duracao(total)} (loaders sem histórico não entram no tempo)."
+    )
@@ -0,0 +1,96 @@
+# response_store.py
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+MODOS = ("off", "gravar", "cache", "replay")
+
+class ResponseStore:
+    """Armazena as respostas brutas da API em disco (JSON gzip), endereçadas pelo hash da URL normalizada.
+
+    Modos:
+      off    - não usa o armazenamento;
+      gravar - sempre consulta a API e grava cada resposta;
+      cache  - usa a resposta gravada enquanto estiver dentro da retenção, senão consulta e grava;
+      replay - lê somente do armazenamento, sem acessar a rede (ausências viram falha de requisição).
+    """
+
+    def __init__(self, diretorio, modo="off", retencao_dias=30):
+        if modo not in MODOS:
+            raise ValueError(f"Modo de armazenamento inválido: {modo} (use um de {', '.join(MODOS)})")
+        self.diretorio = diretorio
+        self.modo = modo
+        self.retencao_segundos = retencao_dias * 86400 if retencao_dias else None
+
+    @property
+    def ativo(self):
+        return self.modo != "off"
+
+    @staticmethod
+    def normalizar(url, params=None):
+        """URL canônica: esquema/host em minúsculas, sem barra final e parâmetros (da URL + params) ordenados."""
+        partes = urlsplit(url)
+        query = parse_qsl(partes.query, keep_blank_values=True)
+        query += [(chave, str(valor)) for chave, valor in (params or {}).items() if valor is not None]
+        caminho = partes.path.rstrip("/") or "/"
+        return f"{partes.scheme.lower()}://{partes.netloc.lower()}{caminho}?{urlencode(sorted(query))}"
+
+    def chave(self, url, params=None):
+        return hashlib.sha256(self.normalizar(url, params).encode("utf-8")).hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave[:2], f"{chave}.json.gz")
+
+    def _expirado(self, caminho):
+        if self.retencao_segundos is None:
+            return False
+        return time.time() - os.path.getmtime(caminho) > self.retencao_segundos
+
+    def ler(self, url, params=None):
+        """Retorna (encontrado, dados). No modo replay a retenção é ignorada."""
+        caminho = self._caminho(self.chave(url, params))
+        if not os.path.exists(caminho):
+            return False, None
+        if self.modo != "replay" and self._expirado(caminho):
+            return False, None
+        try:
+            with gzip.open(caminho, "rt", encoding="utf-8") as arquivo:
+                return True, json.load(arquivo)["dados"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Resposta armazenada ilegível ({caminho}): {e}")
+            return False, None
+
+    def gravar(self, url, params, dados):
+        """Grava a resposta de forma atômica (arquivo temporário + rename), segura entre processos."""
+        caminho = self._caminho(self.chave(url, params))
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        registro = {"url": self.normalizar(url, params), "salvo_em": time.time(), "dados": dados}
+        descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix=".tmp")
+        try:
+            with os.fdopen(descritor, "wb") as bruto, gzip.GzipFile(fileobj=bruto, mode="wb") as arquivo:
+                arquivo.write(json.dumps(registro, ensure_ascii=False).encode("utf-8"))
+            os.replace(temporario, caminho)
+        except Exception:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+    def limpar(self):
+        """Remove respostas além da retenção configurada. Retorna quantos arquivos foram apagados."""
+        if self.retencao_segundos is None or not os.path.isdir(self.diretorio):
+            return 0
+        removidos = 0
+        for raiz, _, arquivos in os.walk(self.diretorio):
+            for nome in arquivos:
+                caminho = os.path.join(raiz, nome)
+                if self._expirado(caminho):
+                    os.remove(caminho)
+                    removidos += 1
+        return removidos
@@ -0,0 +1,176 @@
+# bulk_writer.py
+import csv
+import io
+import logging
+import time
+import pandas as pd
+import psycopg2
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from config import BULK_CONFIG
+
+logger = logging.getLogger(__name__)
+
+METODOS = ("copy", "values", "linha")
+
+# Marcador de NULL no CSV do COPY (distingue NULL de string vazia)
+NULO_COPY = "\\N"
+
+class BulkWriter:
+    """Grava lotes de linhas de uma tabela e acumula a vazão (linhas/s).
+
+    Métodos:
+      copy   - COPY ... FROM STDIN (psycopg2); cai para `values` se o driver não suportar;
+      values - INSERT com VALUES de várias linhas, em lotes;
+      linha  - um INSERT por linha (caminho antigo, mantido para comparação).
+
+    As linhas podem ser sequências na ordem de `colunas` ou um lote colunar (DataFrame, ver
+    data_extraction.normalizacao); no COPY o lote é serializado de uma vez, sem laço por linha.
+
+    Com `chave` (colunas da chave natural), linhas repetidas no mesmo lote são descartadas (fica a última).
+    """
+
+    def __init__(self, tabela, colunas, metodo=None, tamanho_lote=None, chave=None):
+        self.tabela = tabela
+        self.colunas = list(colunas)
+        self.chave = [self.colunas.index(coluna) for coluna in chave] if chave else None
+        self.metodo = metodo or BULK_CONFIG["metodo"]
+        if self.metodo not in METODOS:
+            raise ValueError(f"Método de escrita inválido: {self.metodo} (use um de {', '.join(METODOS)})")
+        self.tamanho_lote = tamanho_lote or BULK_CONFIG["tamanho_lote"]
+        self.linhas = 0
+        self.segundos = 0.0
+
+    def gravar(self, session, linhas):
+        """Grava as linhas (sequências na ordem de `colunas`) na transação da sessão. Retorna o total gravado."""
+        linhas = self._deduplicar(linhas if isinstance(linhas, pd.DataFrame) else list(linhas))
+        if not len(linhas):
+            return 0
+
+        inicio = time.perf_counter()
+        if self.metodo == "copy":
+            self._copy(session, linhas)
+        elif self.metodo == "values":
+            self._values(session, linhas)
+        else:
+            self._linha(session, linhas)
+        self.segundos += time.perf_counter() - inicio
+        self.linhas += len(linhas)
+        return len(linhas)
+
+    def substituir(self, session, filtro, linhas):
+        """Substitui uma partição: apaga as linhas que casam com `filtro` (coluna -> valor) e grava as novas.
+
+        Executado na transação da sessão, o que torna a recarga de uma partição idempotente.
+        """
+        condicoes = " AND ".join(f"{coluna} = :{coluna}" for coluna in filtro)
+        session.execute(text(f"DELETE FROM {self.tabela} WHERE {condicoes}"), filtro)
+        return self.gravar(session, linhas)
+
+    def gravar_ignorando_existentes(self, session, linhas):
+        """Como `gravar`, mas linhas cuja chave já está na tabela substituem as já gravadas (fica a última).
+
+        Usado na carga página a página, em que uma chave pode reaparecer numa página já confirmada.
+        O método configurado é tentado num savepoint; se violar a chave, o lote é regravado com
+        INSERT ... ON CONFLICT (chave) DO UPDATE, a mesma regra de `_deduplicar` dentro do lote. O COPY
+        roda direto no cursor do psycopg2, cuja violação de chave não passa pelo SQLAlchemy, por isso as
+        duas exceções são tratadas.
+        """
+        linhas = self._deduplicar(linhas if isinstance(linhas, pd.DataFrame) else list(linhas))
+        try:
+            with session.begin_nested():
+                return self.gravar(session, linhas)
+        except (IntegrityError, psycopg2.IntegrityError):
+            linhas = self._linhas(linhas)
+            chave = [self.colunas[i] for i in self.chave]
+            atualizacoes = ", ".join(f"{coluna} = EXCLUDED.{coluna}" for coluna in self.colunas if coluna not in chave)
+            # xmax <> 0 identifica as linhas que substituíram uma já gravada
+            sufixo = f" ON CONFLICT ({', '.join(chave)}) DO UPDATE SET {atualizacoes} RETURNING (xmax <> 0)"
+            inicio = time.perf_counter()
+            resultados = self._values(session, linhas, sufixo=sufixo)
+            self.segundos += time.perf_counter() - inicio
+            self.linhas += len(linhas)
+            substituidas = sum(bool(atualizada) for resultado in resultados for (atualizada,) in resultado)
+            logger.warning(f"{substituidas} linhas de {self.tabela} com chave já gravada substituídas pela versão mais recente.")
+            return len(linhas)
+
+    def _deduplicar(self, linhas):
+        if not self.chave:
+            return linhas
+        if isinstance(linhas, pd.DataFrame):
+            unicas = linhas.drop_duplicates(subset=[self.colunas[i] for i in self.chave], keep="last")
+            if len(unicas) < len(linhas):
+                logger.warning(f"{len(linhas) - len(unicas)} linhas repetidas descartadas em {self.tabela}.")
+            return unicas
+        unicas = {tuple(linha[i] for i in self.chave): linha for linha in linhas}
+        if len(unicas) < len(linhas):
+            logger.warning(f"{len(linhas) - len(unicas)} linhas repetidas descartadas em {self.tabela}.")
+        return list(unicas.values())
+
+    def _linhas(self, linhas):
+        """Sequências de valores Python (NULL como None) a partir de um lote colunar."""
+        if not isinstance(linhas, pd.DataFrame):
+            return linhas
+        lote = linhas[self.colunas].astype(object)
+        return lote.where(lote.notna(), None).to_dict("split")["data"]
+
+    def _copy(self, session, linhas):
+        cursor = session.connection().connection.cursor()
+        if not hasattr(cursor, "copy_expert"):
+            cursor.close()
+            self.metodo = "values"
+            self._values(session, linhas)
+            return
+
+        buffer = io.StringIO()
+        if isinstance(linhas, pd.DataFrame):
+            linhas[self.colunas].to_csv(buffer, header=False, index=False, na_rep=NULO_COPY)
+        else:
+            escritor = csv.writer(buffer)
+            for linha in linhas:
+                escritor.writerow([NULO_COPY if valor is None else valor for valor in linha])
+        buffer.seek(0)
+        try:
+            cursor.copy_expert(
+                f"COPY {self.tabela} ({', '.join(self.colunas)}) FROM STDIN WITH (FORMAT csv, NULL '{NULO_COPY}')",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+    def _values(self, session, linhas, sufixo=""):
+        linhas = self._linhas(linhas)
+        resultados = []
+        for inicio in range(0, len(linhas), self.tamanho_lote):
+            lote = linhas[inicio:inicio + self.tamanho_lote]
+            marcadores = []
+            params = {}
+            for i, linha in enumerate(lote):
+                nomes = []
+                for j, valor in enumerate(linha):
+                    nome = f"p{i}_{j}"
+                    params[nome] = valor
+                    nomes.append(f":{nome}")
+                marcadores.append(f"({', '.join(nomes)})")
+            resultados.append(session.execute(
+                text(f"INSERT INTO {self.tabela} ({', '.join(self.colunas)}) VALUES {', '.join(marcadores)}{sufixo}"),
+                params
+            ))
+        return resultados
+
+    def _linha(self, session, linhas):
+        sql = text(
+            f"INSERT INTO {self.tabela} ({', '.join(self.colunas)}) "
+            f"VALUES ({', '.join(':' + coluna for coluna in self.colunas)})"
+        )
+        for linha in self._linhas(linhas):
+            session.execute(sql, dict(zip(self.colunas, linha)))
+
+    def taxa(self):
+        return self.linhas / self.segundos if self.segundos else 0.0
+
+    def resumo(self):
+        return (
+            f"{self.tabela}: {self.linhas} linhas em {self.segundos:.1f}s "
+            f"({self.taxa():.0f} linhas/s, método {self.metodo})"
+        )
@@ -0,0 +1,31 @@
+# checkpoint_carga.py
+from sqlalchemy import text
+
+def ler_checkpoint(session, tipo, codigo, ano, mes):
+    """Retorna (deslocamento, total) da última página confirmada da partição, ou None se não há carga em andamento."""
+    linha = session.execute(text("""
+        SELECT deslocamento, total FROM checkpoint_carga
+        WHERE tipo_dado = :tipo AND codigo_municipio = :codigo AND ano = :ano AND mes = :mes
+    """), {"tipo": tipo, "codigo": codigo, "ano": ano, "mes": mes}).fetchone()
+    return (linha[0], linha[1]) if linha else None
+
+def salvar_checkpoint(session, tipo, codigo, ano, mes, deslocamento, total):
+    """Grava o deslocamento já confirmado; deve ser executado na mesma transação das linhas da página."""
+    session.execute(text("""
+        INSERT INTO checkpoint_carga (tipo_dado, codigo_municipio, ano, mes, deslocamento, total, atualizado_em)
+        VALUES (:tipo, :codigo, :ano, :mes, :deslocamento, :total, NOW())
+        ON CONFLICT (tipo_dado, codigo_municipio, ano, mes) DO UPDATE SET
+            deslocamento = EXCLUDED.deslocamento,
+            total = EXCLUDED.total,
+            atualizado_em = EXCLUDED.atualizado_em
+    """), {
+        "tipo": tipo, "codigo": codigo, "ano": ano, "mes": mes,
+        "deslocamento": deslocamento, "total": total,
+    })
+
+def remover_checkpoint(session, tipo, codigo, ano, mes):
+    """Remove o checkpoint da partição concluída (no mesmo commit do registro em controle_carga)."""
+    session.execute(text("""
+        DELETE FROM checkpoint_carga
+        WHERE tipo_dado = :tipo AND codigo_municipio = :codigo AND ano = :ano AND mes = :mes
+    """), {"tipo": tipo, "codigo": codigo, "ano": ano, "mes": mes})
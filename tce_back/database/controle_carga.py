@@ -0,0 +1,143 @@
+# controle_carga.py
+import hashlib
+import json
+from datetime import date
+from sqlalchemy import event, text
+from config import REFRESH_CONFIG
+from metricas import get_metricas
+
+class ControleCarga:
+    """Índice em memória da tabela controle_carga, associado a uma sessão.
+
+    As chaves já processadas de um tipo_dado são lidas uma única vez (no primeiro uso do tipo) e os
+    registros novos ficam em um buffer gravado com um único INSERT de várias linhas antes do commit
+    da sessão, na mesma transação dos dados. Em caso de rollback o buffer é descartado.
+
+    No modo de atualização (REFRESH_CONFIG), as partições dos últimos N meses de cada tipo são
+    tratadas como não processadas, para serem buscadas de novo e substituídas (com `forcar`, todas).
+
+    Cada partição guarda o hash do conteúdo recebido da API (hash_conteudo); numa nova busca, conteúdo
+    com o mesmo hash dispensa qualquer escrita no banco. A quantidade de registros recebida também é
+    guardada (registros), base das estimativas do planejamento de carga.
+    """
+
+    def __init__(self, session, refresh=None, hoje=None):
+        self.session = session
+        self.refresh = REFRESH_CONFIG["ativo"] if refresh is None else refresh
+        hoje = hoje or date.today()
+        self._mes_atual = hoje.year * 12 + hoje.month - 1
+        self.processados = {}
+        self.pendentes = {}
+        self.hashes = {}
+        self.registros = {}
+        event.listen(session, "before_commit", self._gravar_pendentes)
+        event.listen(session, "after_commit", self._confirmar_pendentes)
+        event.listen(session, "after_rollback", self._descartar_pendentes)
+
+    @classmethod
+    def da_sessao(cls, session):
+        """Retorna o índice da sessão, criando-o no primeiro uso."""
+        if "controle_carga" not in session.info:
+            session.info["controle_carga"] = cls(session)
+        return session.info["controle_carga"]
+
+    def _carregar(self, tipo):
+        """Chaves (codigo, ano, mes) -> hash_conteudo das partições já registradas do tipo."""
+        if tipo not in self.processados:
+            linhas = self.session.execute(
+                text("SELECT codigo_municipio, ano, mes, hash_conteudo FROM controle_carga WHERE tipo_dado = :tipo"),
+                {"tipo": tipo}
+            ).fetchall()
+            self.processados[tipo] = {(codigo, ano, mes): hash_ for codigo, ano, mes, hash_ in linhas}
+        return self.processados[tipo]
+
+    def janela_refresh(self, tipo):
+        """Quantidade de meses recentes recarregados para o tipo no modo de atualização."""
+        return REFRESH_CONFIG["janelas"].get(tipo, REFRESH_CONFIG["meses_padrao"])
+
+    def em_janela(self, tipo, ano, mes):
+        """Indica se a partição cai nos últimos N meses do tipo (mes 0 = partição anual)."""
+        meses = self.janela_refresh(tipo)
+        if not meses:
+            return False
+        inicio = self._mes_atual - meses + 1
+        if mes == 0:
+            return int(ano) >= inicio // 12
+        return int(ano) * 12 + int(mes) - 1 >= inicio
+
+    def ja_registrado(self, tipo, codigo, ano, mes):
+        """Partição já gravada em controle_carga (independente do modo de atualização)."""
+        return (codigo, ano, mes) in self._carregar(tipo)
+
+    def ja_processado(self, tipo, codigo, ano, mes):
+        chave = (codigo, ano, mes)
+        if (tipo, *chave) in self.pendentes:
+            return True
+        if chave not in self._carregar(tipo):
+            return False
+        if REFRESH_CONFIG["forcar"]:
+            return False
+        return not (self.refresh and self.em_janela(tipo, ano, mes))
+
+    def conteudo_inalterado(self, tipo, codigo, ano, mes, registros):
+        """Calcula o hash do conteúdo da partição e indica se é igual ao da última carga registrada.
+
+        O hash calculado fica guardado e é gravado em controle_carga no registro da partição.
+        """
+        self.guardar_hash(tipo, codigo, ano, mes, registros)
+        return self._carregar(tipo).get((codigo, ano, mes)) == self.hashes[(tipo, codigo, ano, mes)]
+
+    def guardar_hash(self, tipo, codigo, ano, mes, registros):
+        """Guarda o hash e a quantidade de registros para gravar no registro da partição, sem comparar."""
+        registros = list(registros)
+        self.hashes[(tipo, codigo, ano, mes)] = hash_conteudo(registros)
+        self.registros[(tipo, codigo, ano, mes)] = len(registros)
+
+    def registrar(self, tipo, codigo, ano, mes):
+        chave = (tipo, codigo, ano, mes)
+        self.pendentes[chave] = (self.hashes.pop(chave, None), self.registros.pop(chave, None))
+
+    def _gravar_pendentes(self, session):
+        if not self.pendentes:
+            return
+        marcadores = []
+        params = {}
+        for i, ((tipo, codigo, ano, mes), (hash_, registros)) in enumerate(self.pendentes.items()):
+            marcadores.append(f"(:tipo{i}, :codigo{i}, :ano{i}, :mes{i}, :hash{i}, :registros{i}, NOW())")
+            params.update({
+                f"tipo{i}": tipo, f"codigo{i}": codigo, f"ano{i}": ano, f"mes{i}": mes,
+                f"hash{i}": hash_, f"registros{i}": registros
+            })
+        session.execute(text(f"""
+            INSERT INTO controle_carga (tipo_dado, codigo_municipio, ano, mes, hash_conteudo, registros, processado_em)
+            VALUES {', '.join(marcadores)}
+            ON CONFLICT (tipo_dado, codigo_municipio, ano, mes) DO UPDATE SET
+                hash_conteudo = COALESCE(EXCLUDED.hash_conteudo, controle_carga.hash_conteudo),
+                registros = COALESCE(EXCLUDED.registros, controle_carga.registros),
+                processado_em = EXCLUDED.processado_em
+        """), params)
+
+    def _confirmar_pendentes(self, session):
+        get_metricas().somar_linhas(sum(registros or 0 for _, registros in self.pendentes.values()))
+        # Tipos ainda não carregados serão lidos do banco (já com estes registros) no primeiro uso
+        for (tipo, codigo, ano, mes), (hash_, _) in self.pendentes.items():
+            if tipo in self.processados:
+                anterior = self.processados[tipo].get((codigo, ano, mes))
+                self.processados[tipo][(codigo, ano, mes)] = hash_ or anterior
+        self.pendentes = {}
+
+    def _descartar_pendentes(self, session):
+        self.pendentes = {}
+        self.hashes = {}
+        self.registros = {}
+
+def hash_conteudo(registros):
+    """SHA-256 do conteúdo normalizado: cada registro em JSON canônico (chaves ordenadas), em ordem estável."""
+    normalizados = sorted(
+        json.dumps(registro, sort_keys=True, ensure_ascii=False, default=str) for registro in registros
+    )
+    digest = hashlib.sha256()
+    for registro in normalizados:
+        digest.update(registro.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
@@ -1,6 +1,74 @@
-from sqlalchemy import create_engine
-from config import DB_CONFIG
+import logging
+import os
+import threading
+from sqlalchemy import create_engine, event
+from config import DB_CONFIG, DB_POOL_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_engine = None
+_engine_pid = None
+_engine_lock = threading.Lock()
+
+class _MetricasPool:
+    """Contadores de uso do pool (checkouts, conexões abertas, pico de conexões em uso)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.conexoes_abertas = 0
+        self.em_uso = 0
+        self.pico_em_uso = 0
+
+    def registrar(self, engine):
+        event.listen(engine, "connect", self._connect)
+        event.listen(engine, "checkout", self._checkout)
+        event.listen(engine, "checkin", self._checkin)
+
+    def _connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.conexoes_abertas += 1
+
+    def _checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self.em_uso += 1
+            self.pico_em_uso = max(self.pico_em_uso, self.em_uso)
+
+    def _checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.em_uso = max(self.em_uso - 1, 0)
+
+def get_db_url():
+    return f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
 
 def get_db_engine():
-    db_url = f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
-    return create_engine(db_url)
\ No newline at end of file
+    """Retorna o engine compartilhado do processo (recriado após fork), com o pool de DB_POOL_CONFIG."""
+    global _engine, _engine_pid
+    with _engine_lock:
+        if _engine is None or _engine_pid != os.getpid():
+            _engine = create_engine(get_db_url(), **DB_POOL_CONFIG)
+            _engine.metricas = _MetricasPool()
+            _engine.metricas.registrar(_engine)
+            _engine_pid = os.getpid()
+        return _engine
+
+def estatisticas_pool():
+    """Métricas do pool do engine compartilhado, para dimensionar pool_size/max_overflow."""
+    engine = get_db_engine()
+    metricas = engine.metricas
+    return {
+        "checkouts": metricas.checkouts,
+        "conexoes_abertas": metricas.conexoes_abertas,
+        "em_uso": metricas.em_uso,
+        "pico_em_uso": metricas.pico_em_uso,
+        "capacidade": DB_POOL_CONFIG["pool_size"] + DB_POOL_CONFIG["max_overflow"],
+        "status": engine.pool.status(),
+    }
+
+def log_estatisticas_pool():
+    stats = estatisticas_pool()
+    logger.info(
+        f"Pool do banco: {stats['checkouts']} checkouts, {stats['conexoes_abertas']} conexões abertas, "
+        f"pico de {stats['pico_em_uso']} em uso (capacidade {stats['capacidade']})."
+    )
@@ -5,9 +5,87 @@ CREATE TABLE IF NOT EXISTS controle_carga (
     codigo_municipio VARCHAR(10) NOT NULL,
     ano INTEGER NOT NULL,
     mes INTEGER NOT NULL,
+    hash_conteudo VARCHAR(64),
+    registros INTEGER,
+    processado_em TIMESTAMP DEFAULT NOW(),
     UNIQUE(tipo_dado, codigo_municipio, ano, mes)
 );
 
+-- Colunas adicionadas depois da criação (bancos existentes)
+ALTER TABLE controle_carga ADD COLUMN IF NOT EXISTS hash_conteudo VARCHAR(64);
+ALTER TABLE controle_carga ADD COLUMN IF NOT EXISTS processado_em TIMESTAMP DEFAULT NOW();
+ALTER TABLE controle_carga ADD COLUMN IF NOT EXISTS registros INTEGER;
+
+-- Checkpoint da paginação de cargas longas: último deslocamento confirmado de cada partição em andamento
+CREATE TABLE IF NOT EXISTS checkpoint_carga (
+    id SERIAL PRIMARY KEY,
+    tipo_dado VARCHAR(50) NOT NULL,
+    codigo_municipio VARCHAR(10) NOT NULL,
+    ano INTEGER NOT NULL,
+    mes INTEGER NOT NULL,
+    deslocamento INTEGER NOT NULL,
+    total INTEGER,
+    atualizado_em TIMESTAMP DEFAULT NOW(),
+    UNIQUE(tipo_dado, codigo_municipio, ano, mes)
+);
+
+-- Fila de trabalho distribuída: um job por (loader, município, parâmetros), reservado pelos workers com SKIP LOCKED
+CREATE TABLE IF NOT EXISTS fila_carga (
+    id SERIAL PRIMARY KEY,
+    loader VARCHAR(100) NOT NULL,
+    codigo_municipio VARCHAR(10) NOT NULL,
+    ordem INTEGER NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pendente',
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    worker VARCHAR(100),
+    lease_ate TIMESTAMP,
+    heartbeat_em TIMESTAMP,
+    erro TEXT,
+    criado_em TIMESTAMP DEFAULT NOW(),
+    concluido_em TIMESTAMP,
+    anos VARCHAR(200) NOT NULL DEFAULT '',
+    meses VARCHAR(100) NOT NULL DEFAULT '',
+    forcar BOOLEAN NOT NULL DEFAULT FALSE,
+    refresh BOOLEAN NOT NULL DEFAULT FALSE
+);
+
+-- Parâmetros da carga gravados no job (--anos, --meses, --forcar, --refresh; bancos existentes): fazem parte
+-- da chave, de modo que cargas com parâmetros diferentes não se fundem num mesmo job
+ALTER TABLE fila_carga ADD COLUMN IF NOT EXISTS anos VARCHAR(200) NOT NULL DEFAULT '';
+ALTER TABLE fila_carga ADD COLUMN IF NOT EXISTS meses VARCHAR(100) NOT NULL DEFAULT '';
+ALTER TABLE fila_carga ADD COLUMN IF NOT EXISTS forcar BOOLEAN NOT NULL DEFAULT FALSE;
+ALTER TABLE fila_carga ADD COLUMN IF NOT EXISTS refresh BOOLEAN NOT NULL DEFAULT FALSE;
+ALTER TABLE fila_carga DROP CONSTRAINT IF EXISTS fila_carga_loader_codigo_municipio_key;
+CREATE UNIQUE INDEX IF NOT EXISTS fila_carga_job ON fila_carga (loader, codigo_municipio, anos, meses, forcar, refresh);
+
+CREATE INDEX IF NOT EXISTS fila_carga_disponiveis ON fila_carga (ordem, codigo_municipio)
+    WHERE status IN ('pendente', 'executando');
+
+-- Métricas do ETL por execução e processo (formato Prometheus: métrica, rótulos e valor acumulado)
+CREATE TABLE IF NOT EXISTS etl_metrics (
+    id SERIAL PRIMARY KEY,
+    execucao VARCHAR(40) NOT NULL,
+    processo VARCHAR(100) NOT NULL,
+    coletado_em TIMESTAMP DEFAULT NOW(),
+    metrica VARCHAR(100) NOT NULL,
+    rotulos TEXT NOT NULL DEFAULT '',
+    valor DOUBLE PRECISION NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS etl_metrics_execucao ON etl_metrics (execucao, coletado_em);
+
+-- Exportação Parquet: versão (maior processado_em de controle_carga) de cada arquivo (tabela, município, ano) exportado
+CREATE TABLE IF NOT EXISTS exportacao_parquet (
+    id SERIAL PRIMARY KEY,
+    tabela VARCHAR(50) NOT NULL,
+    codigo_municipio VARCHAR(10) NOT NULL,
+    ano INTEGER NOT NULL,
+    versao TIMESTAMP NOT NULL,
+    linhas INTEGER NOT NULL,
+    exportado_em TIMESTAMP DEFAULT NOW(),
+    UNIQUE(tabela, codigo_municipio, ano)
+);
+
 -- Tabela de Municípios
 CREATE TABLE IF NOT EXISTS municipio (
     id SERIAL PRIMARY KEY,
@@ -26,9 +104,9 @@ CREATE TABLE IF NOT EXISTS orgao (
     cgc_orgao VARCHAR(20)
 );
 
--- Tabela de Receitas
+-- Tabela de Receitas (particionada por ano)
 CREATE TABLE IF NOT EXISTS receita (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     municipio_id INTEGER REFERENCES municipio(id),
     ano INTEGER,
     mes INTEGER,
@@ -42,12 +120,22 @@ CREATE TABLE IF NOT EXISTS receita (
     valor_anulacoes_no_mes NUMERIC(15, 2),
     valor_anulacoes_ate_mes NUMERIC(15, 2),
     tipo_fonte VARCHAR(10),
-    codigo_fonte VARCHAR(10)
-);
+    codigo_fonte VARCHAR(10),
+    PRIMARY KEY (id, ano)
+) PARTITION BY RANGE (ano);
 
--- Tabela de Despesas
+-- Partição padrão (valores fora das partições anuais criadas pelos loaders)
+CREATE TABLE IF NOT EXISTS receita_padrao PARTITION OF receita DEFAULT;
+
+-- Chave natural da receita (uma linha por rubrica/fonte em cada mês)
+CREATE UNIQUE INDEX IF NOT EXISTS receita_chave_natural ON receita (
+    municipio_id, ano, mes, codigo_orgao, codigo_unidade, codigo_rubrica,
+    tipo_balancete, tipo_fonte, codigo_fonte
+) NULLS NOT DISTINCT;
+
+-- Tabela de Despesas (particionada por ano)
 CREATE TABLE IF NOT EXISTS despesa (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     municipio_id INTEGER REFERENCES municipio(id),
     ano INTEGER,
     mes INTEGER,
@@ -81,8 +169,19 @@ CREATE TABLE IF NOT EXISTS despesa (
     valor_estornos_pagos_no_mes NUMERIC(15, 2),
     valor_estornos_pagos_ate_mes NUMERIC(15, 2),
     tipo_fonte VARCHAR(10),
-    codigo_fonte VARCHAR(10)
-);
+    codigo_fonte VARCHAR(10),
+    PRIMARY KEY (id, ano)
+) PARTITION BY RANGE (ano);
+
+-- Partição padrão (valores fora das partições anuais criadas pelos loaders)
+CREATE TABLE IF NOT EXISTS despesa_padrao PARTITION OF despesa DEFAULT;
+
+-- Chave natural da despesa (uma linha por classificação programática/elemento/fonte em cada mês)
+CREATE UNIQUE INDEX IF NOT EXISTS despesa_chave_natural ON despesa (
+    municipio_id, ano, mes, codigo_orgao, codigo_unidade, codigo_funcao, codigo_subfuncao,
+    codigo_programa, codigo_projeto_atividade, numero_projeto_atividade,
+    numero_subprojeto_atividade, codigo_elemento_despesa, tipo_balancete, tipo_fonte, codigo_fonte
+) NULLS NOT DISTINCT;
 
 -- Tabela de Agentes Públicos
 CREATE TABLE IF NOT EXISTS agentes_publicos (
@@ -256,9 +355,9 @@ CREATE TABLE IF NOT EXISTS despesa_categoria_economica (
     valor_total_fixado NUMERIC(15, 2)
 );
 
--- Tabela de Liquidações
+-- Tabela de Liquidações (particionada por exercício, AAAA00)
 CREATE TABLE IF NOT EXISTS liquidacoes (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     codigo_municipio VARCHAR(10),
     exercicio_orcamento INTEGER,
     codigo_orgao VARCHAR(10),
@@ -271,12 +370,16 @@ CREATE TABLE IF NOT EXISTS liquidacoes (
     numero_sub_empenho_liquidacao VARCHAR(50),
     valor_liquidado NUMERIC(15, 2),
     estado_de_estorno INTEGER,
-    estado_folha INTEGER
-);
+    estado_folha INTEGER,
+    PRIMARY KEY (id, exercicio_orcamento)
+) PARTITION BY RANGE (exercicio_orcamento);
+
+-- Partição padrão (valores fora das partições anuais criadas pelos loaders)
+CREATE TABLE IF NOT EXISTS liquidacoes_padrao PARTITION OF liquidacoes DEFAULT;
 
--- Tabela de Notas de Empenho
+-- Tabela de Notas de Empenho (particionada por exercício, AAAA00)
 CREATE TABLE IF NOT EXISTS notas_empenho (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     codigo_municipio INTEGER,
     exercicio_orcamento INTEGER,
     codigo_orgao VARCHAR(10),
@@ -315,5 +418,49 @@ CREATE TABLE IF NOT EXISTS notas_empenho (
     codigo_fonte VARCHAR(10),
     codigo_contrato VARCHAR(50),
     data_contrato TIMESTAMP,
-    numero_licitacao VARCHAR(50)
-);
\ No newline at end of file
+    numero_licitacao VARCHAR(50),
+    PRIMARY KEY (id, exercicio_orcamento)
+) PARTITION BY RANGE (exercicio_orcamento);
+
+-- Partição padrão (valores fora das partições anuais criadas pelos loaders)
+CREATE TABLE IF NOT EXISTS notas_empenho_padrao PARTITION OF notas_empenho DEFAULT;
+
+-- Resumos mensais de receita e despesa por município/ano/mês e categoria, mantidos pelos loaders na mesma
+-- transação que grava cada partição (database/resumo_mensal.py). Valores somados das linhas do mês.
+CREATE TABLE IF NOT EXISTS resumo_receita_mensal (
+    municipio_id INTEGER,
+    ano INTEGER NOT NULL,
+    mes INTEGER NOT NULL,
+    origem VARCHAR(50),
+    subcategoria VARCHAR(50),
+    valor_previsto NUMERIC(18, 2),
+    valor_arrecadado NUMERIC(18, 2)
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS resumo_receita_mensal_chave
+    ON resumo_receita_mensal (municipio_id, ano, mes, origem, subcategoria) NULLS NOT DISTINCT;
+
+CREATE TABLE IF NOT EXISTS resumo_despesa_mensal (
+    municipio_id INTEGER,
+    ano INTEGER NOT NULL,
+    mes INTEGER NOT NULL,
+    codigo_funcao VARCHAR(10),
+    valor_fixado NUMERIC(18, 2),
+    valor_empenhado NUMERIC(18, 2),
+    valor_liquidado NUMERIC(18, 2),
+    valor_pago NUMERIC(18, 2)
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS resumo_despesa_mensal_chave
+    ON resumo_despesa_mensal (municipio_id, ano, mes, codigo_funcao) NULLS NOT DISTINCT;
+CREATE INDEX IF NOT EXISTS resumo_despesa_mensal_ano ON resumo_despesa_mensal (ano, mes);
+
+-- Valor estimado das licitações por município, status e modalidade (despesas.py), atualizado pelo main.py ao fim
+-- do loader de licitações (database/views.py, REFRESH CONCURRENTLY, que exige o índice único)
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_licitacao_totais AS
+SELECT municipio_id, status, modalidade, SUM(valor_estimado) AS valor_estimado
+FROM licitacao
+GROUP BY municipio_id, status, modalidade;
+
+CREATE UNIQUE INDEX IF NOT EXISTS mv_licitacao_totais_chave
+    ON mv_licitacao_totais (municipio_id, status, modalidade) NULLS NOT DISTINCT;
@@ -1,18 +1,66 @@
 # db_setup.py
 
-from sqlalchemy import create_engine, text
-from config import DB_CONFIG
+import logging
+from sqlalchemy import text
+from database.db_config import get_db_engine
+from database.particoes import migrar_tabelas_legadas, copiar_tabelas_legadas
+from database.indices import aplicar_indices
+from database.resumo_mensal import preencher_resumos
+
+logger = logging.getLogger(__name__)
+
+# Chaves naturais das tabelas fato (índices únicos definidos em db_schema.sql)
+CHAVES_NATURAIS = {
+    "receita": {
+        "indice": "receita_chave_natural",
+        "colunas": [
+            "municipio_id", "ano", "mes", "codigo_orgao", "codigo_unidade", "codigo_rubrica",
+            "tipo_balancete", "tipo_fonte", "codigo_fonte"
+        ],
+    },
+    "despesa": {
+        "indice": "despesa_chave_natural",
+        "colunas": [
+            "municipio_id", "ano", "mes", "codigo_orgao", "codigo_unidade", "codigo_funcao",
+            "codigo_subfuncao", "codigo_programa", "codigo_projeto_atividade", "numero_projeto_atividade",
+            "numero_subprojeto_atividade", "codigo_elemento_despesa", "tipo_balancete", "tipo_fonte", "codigo_fonte"
+        ],
+    },
+}
+
+def remover_duplicados(conn):
+    """Antes de criar os índices de chave natural, remove as linhas repetidas de cargas antigas (mantém a mais recente)."""
+    for tabela, chave in CHAVES_NATURAIS.items():
+        existe_tabela, existe_indice = conn.execute(
+            text("SELECT to_regclass(:tabela) IS NOT NULL, to_regclass(:indice) IS NOT NULL"),
+            {"tabela": tabela, "indice": chave["indice"]}
+        ).fetchone()
+        if not existe_tabela or existe_indice:
+            continue
+        removidas = conn.execute(text(f"""
+            DELETE FROM {tabela} WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (PARTITION BY {', '.join(chave['colunas'])} ORDER BY id DESC) AS ordem
+                    FROM {tabela}
+                ) repetidas
+                WHERE ordem > 1
+            )
+        """)).rowcount
+        logger.info(f"{removidas} linhas duplicadas removidas de {tabela}.")
 
 def setup_database():
-    # Conectando ao banco de dados usando SQLAlchemy
-    engine = create_engine(
-        f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
-    )
+    # Conectando ao banco de dados usando o engine compartilhado
+    engine = get_db_engine()
 
     
     with engine.connect() as conn:
         # Inicia uma transação
         with conn.begin():
+            # Serializa o setup entre execuções/workers simultâneos (DDL concorrente pode falhar)
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('setup_database'))"))
+            remover_duplicados(conn)
+            legadas = migrar_tabelas_legadas(conn)
+
             # Abre o arquivo SQL e lê cada instrução separadamente
             with open("tce_back/database/db_schema.sql", "r") as schema_file:
                 sql_commands = schema_file.read().split(";")  # Divide em comandos individuais
@@ -21,4 +69,13 @@ def setup_database():
                 for command in sql_commands:
                     if command.strip():  # Ignora linhas vazias
                         conn.execute(text(command))
+
+            # Dados das tabelas fato anteriores ao particionamento por ano
+            copiar_tabelas_legadas(conn, legadas)
+
+            # Índices secundários das consultas do dashboard
+            aplicar_indices(conn)
+
+            # Resumos mensais de receita/despesa de bancos carregados antes deles
+            preencher_resumos(conn)
         # A transação é confirmada automaticamente ao sair do bloco 'with conn.begin()'
\ No newline at end of file
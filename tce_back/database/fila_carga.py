@@ -0,0 +1,207 @@
+# fila_carga.py
+import logging
+import os
+import socket
+import threading
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from config import FILA_CONFIG, PERIODO_CONFIG, REFRESH_CONFIG, faixa_inteiros
+
+logger = logging.getLogger(__name__)
+
+# Situações de um job da fila
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+ERRO = "erro"
+
+def nome_worker():
+    """Identificação do worker nos jobs reservados (host:pid)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def parametros_atuais():
+    """Parâmetros da carga deste processo (--anos, --meses, --forcar, --refresh), no formato gravado nos jobs."""
+    return {
+        "anos": ",".join(map(str, sorted(PERIODO_CONFIG["anos"]))),
+        "meses": ",".join(map(str, sorted(PERIODO_CONFIG["meses"]))),
+        "forcar": bool(REFRESH_CONFIG["forcar"]),
+        "refresh": bool(REFRESH_CONFIG["ativo"]),
+    }
+
+def aplicar_parametros(job):
+    """Aplica no processo os parâmetros gravados no job, qualquer que seja o ambiente em que o worker foi iniciado."""
+    PERIODO_CONFIG["anos"] = faixa_inteiros(job.anos)
+    PERIODO_CONFIG["meses"] = faixa_inteiros(job.meses)
+    REFRESH_CONFIG["forcar"] = job.forcar
+    REFRESH_CONFIG["ativo"] = job.refresh
+
+def enfileirar(engine, loaders, codigos, parametros=None):
+    """Cria um job por (loader, município) com os parâmetros da carga (padrão: os deste processo).
+
+    `loaders` traz pares (ordem, loader), em que `ordem` é a posição do loader na ordem de dependência da
+    carga completa (main.ETAPAS), e não na seleção: assim um job de um loader isolado continua esperando
+    as etapas anteriores do município enfileiradas por outra execução. Os parâmetros fazem parte da chave do
+    job: cargas com período ou modo diferentes geram jobs distintos. Jobs já concluídos ou com erro voltam
+    para pendente (nova rodada); jobs pendentes ou em execução por outro worker não são alterados, o que
+    torna seguro enfileirar a partir de execuções sobrepostas.
+    """
+    marcadores = []
+    params = dict(parametros or parametros_atuais())
+    for i, (ordem, loader, codigo) in enumerate(
+        (ordem, loader, codigo) for ordem, loader in loaders for codigo in codigos
+    ):
+        marcadores.append(f"(:loader{i}, :codigo{i}, :ordem{i}, :anos, :meses, :forcar, :refresh)")
+        params.update({f"loader{i}": loader, f"codigo{i}": codigo, f"ordem{i}": ordem})
+    if not marcadores:
+        return 0
+
+    with engine.begin() as conn:
+        return conn.execute(text(f"""
+            INSERT INTO fila_carga (loader, codigo_municipio, ordem, anos, meses, forcar, refresh)
+            VALUES {', '.join(marcadores)}
+            ON CONFLICT (loader, codigo_municipio, anos, meses, forcar, refresh) DO UPDATE SET
+                ordem = EXCLUDED.ordem,
+                status = '{PENDENTE}',
+                tentativas = 0,
+                worker = NULL,
+                lease_ate = NULL,
+                erro = NULL,
+                criado_em = NOW(),
+                concluido_em = NULL
+            WHERE fila_carga.status IN ('{CONCLUIDO}', '{ERRO}')
+        """), params).rowcount
+
+def reservar(engine, worker, lease=None, max_tentativas=None):
+    """Reserva o próximo job disponível com FOR UPDATE SKIP LOCKED e retorna a linha do job ou None.
+
+    A linha traz id, loader, codigo_municipio e os parâmetros da carga (ver `aplicar_parametros`).
+
+    Disponível: pendente ou com lease expirado (worker parado), abaixo do limite de tentativas, e sem
+    etapas anteriores do mesmo município ainda pendentes ou em execução.
+    """
+    lease = lease or FILA_CONFIG["lease_segundos"]
+    max_tentativas = max_tentativas or FILA_CONFIG["max_tentativas"]
+    with engine.begin() as conn:
+        # Leases expirados que já esgotaram as tentativas não voltam mais para a fila
+        conn.execute(text(f"""
+            UPDATE fila_carga SET status = '{ERRO}', erro = 'lease expirado sem heartbeat', lease_ate = NULL
+            WHERE status = '{EXECUTANDO}' AND lease_ate < NOW() AND tentativas >= :max_tentativas
+        """), {"max_tentativas": max_tentativas})
+
+        return conn.execute(text(f"""
+            UPDATE fila_carga SET
+                status = '{EXECUTANDO}',
+                worker = :worker,
+                tentativas = tentativas + 1,
+                lease_ate = NOW() + make_interval(secs => :lease),
+                heartbeat_em = NOW()
+            WHERE id = (
+                SELECT f.id FROM fila_carga f
+                WHERE (f.status = '{PENDENTE}' OR (f.status = '{EXECUTANDO}' AND f.lease_ate < NOW()))
+                  AND f.tentativas < :max_tentativas
+                  AND NOT EXISTS (
+                      SELECT 1 FROM fila_carga d
+                      WHERE d.codigo_municipio = f.codigo_municipio AND d.ordem < f.ordem
+                        AND d.status IN ('{PENDENTE}', '{EXECUTANDO}')
+                  )
+                ORDER BY f.ordem, f.codigo_municipio
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, loader, codigo_municipio, anos, meses, forcar, refresh
+        """), {"worker": worker, "lease": lease, "max_tentativas": max_tentativas}).fetchone()
+
+def renovar(engine, job_id, worker, lease=None):
+    """Heartbeat: estende o lease do job. Retorna False se o job não pertence mais a este worker."""
+    lease = lease or FILA_CONFIG["lease_segundos"]
+    with engine.begin() as conn:
+        return conn.execute(text(f"""
+            UPDATE fila_carga SET lease_ate = NOW() + make_interval(secs => :lease), heartbeat_em = NOW()
+            WHERE id = :id AND worker = :worker AND status = '{EXECUTANDO}'
+        """), {"id": job_id, "worker": worker, "lease": lease}).rowcount > 0
+
+def concluir(engine, job_id, worker):
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            UPDATE fila_carga SET status = '{CONCLUIDO}', lease_ate = NULL, erro = NULL, concluido_em = NOW()
+            WHERE id = :id AND worker = :worker
+        """), {"id": job_id, "worker": worker})
+
+def falhar(engine, job_id, worker, erro, max_tentativas=None):
+    """Devolve o job à fila (nova tentativa por outro worker) ou marca erro se esgotou as tentativas."""
+    max_tentativas = max_tentativas or FILA_CONFIG["max_tentativas"]
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            UPDATE fila_carga SET
+                status = CASE WHEN tentativas >= :max_tentativas THEN '{ERRO}' ELSE '{PENDENTE}' END,
+                lease_ate = NULL,
+                erro = :erro
+            WHERE id = :id AND worker = :worker
+        """), {"id": job_id, "worker": worker, "erro": erro[:1000], "max_tentativas": max_tentativas})
+
+def fila_ativa(engine):
+    """Indica se ainda há jobs pendentes ou em execução (um worker ocioso deve esperar, não encerrar)."""
+    with engine.connect() as conn:
+        return conn.execute(text(f"""
+            SELECT EXISTS (SELECT 1 FROM fila_carga WHERE status IN ('{PENDENTE}', '{EXECUTANDO}'))
+        """)).scalar()
+
+def resumo_fila(engine):
+    """Quantidade de jobs por loader e situação."""
+    with engine.connect() as conn:
+        linhas = conn.execute(text("""
+            SELECT loader, status, COUNT(*) FROM fila_carga GROUP BY loader, status ORDER BY MIN(ordem), status
+        """)).fetchall()
+    resumo = {}
+    for loader, status, total in linhas:
+        resumo.setdefault(loader, {})[status] = total
+    return resumo
+
+class LeasePerdido(BaseException):
+    """O lease do job foi perdido durante o loader (o job pode já estar com outro worker).
+
+    Deriva de BaseException, como KeyboardInterrupt, para não ser absorvida pelos `except Exception` com
+    que os loaders isolam a falha de cada partição: o loader é encerrado e o worker descarta o job.
+    """
+
+class Heartbeat:
+    """Renova o lease de um job em segundo plano enquanto o loader executa.
+
+    Se o lease for perdido, `perdido` é marcado e o próximo commit de qualquer sessão do processo levanta
+    LeasePerdido antes de gravar: o loader para sem confirmar mais partições e o worker deve descartar o
+    job, sem concluí-lo nem devolvê-lo à fila. A interrupção só acontece dentro do loader, nunca depois
+    que o bloco `with` termina.
+    """
+
+    def __init__(self, engine, job_id, worker, intervalo=None):
+        self.engine = engine
+        self.job_id = job_id
+        self.worker = worker
+        self.intervalo = intervalo or FILA_CONFIG["heartbeat_segundos"]
+        self.perdido = threading.Event()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+
+    def __enter__(self):
+        event.listen(Session, "before_commit", self._verificar_lease)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._thread.join()
+        event.remove(Session, "before_commit", self._verificar_lease)
+
+    def _verificar_lease(self, session):
+        if self.perdido.is_set():
+            raise LeasePerdido(f"Lease do job {self.job_id} perdido por {self.worker}")
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                if not renovar(self.engine, self.job_id, self.worker):
+                    logger.warning(f"Job {self.job_id} não pertence mais a {self.worker} (lease perdido); o loader para no próximo commit.")
+                    self.perdido.set()
+                    return
+            except Exception as e:
+                logger.error(f"Falha no heartbeat do job {self.job_id}: {e}")
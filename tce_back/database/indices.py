@@ -0,0 +1,144 @@
+# indices.py
+import logging
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Índices secundários gerenciados pelo setup (prefixo idx_): caminhos de acesso das páginas do dashboard.
+# As chaves naturais de receita/despesa (db_schema.sql) já começam por (municipio_id, ano, mes) e atendem
+# os filtros por município/ano/mês dessas tabelas.
+INDICES = {
+    # receitas2.py: codigo_rubrica LIKE '1.1%' / '1.7%' por município
+    "idx_receita_municipio_rubrica": "receita (municipio_id, codigo_rubrica text_pattern_ops)",
+    # despesas.py: despesa mensal de todos os municípios em um exercício
+    "idx_despesa_ano_mes": "despesa (ano, mes)",
+    # home.py / comparacao.py: orçamento do município no exercício
+    "idx_orcamentos_municipio_exercicio": "orcamentos (municipio_id, exercicio_orcamento)",
+    # despesas.py: licitações por município (status e modalidade)
+    "idx_licitacao_municipio": "licitacao (municipio_id)",
+    # pessoal.py: agentes por município e junção com orgao por (municipio_id, codigo_orgao)
+    "idx_agentes_publicos_municipio_orgao": "agentes_publicos (municipio_id, codigo_orgao)",
+    "idx_orgao_municipio_orgao": "orgao (municipio_id, codigo_orgao)",
+    # notas de empenho e liquidações por município/exercício (recargas e consultas por órgão)
+    "idx_notas_empenho_municipio_exercicio": "notas_empenho (codigo_municipio, exercicio_orcamento)",
+    "idx_liquidacoes_municipio_exercicio": "liquidacoes (codigo_municipio, exercicio_orcamento)",
+}
+
+# Consultas representativas das páginas do dashboard (com parâmetros de exemplo) para a verificação de uso
+CONSULTAS_DASHBOARD = {
+    "home: receita do ano": (
+        "SELECT MAX(valor_arrecadado_ate_mes) FROM receita WHERE municipio_id = :municipio AND ano = :ano",
+        {"municipio": 1, "ano": 2024},
+    ),
+    "home: despesa do ano": (
+        "SELECT MAX(valor_empenhado_ate_mes) FROM despesa WHERE municipio_id = :municipio AND ano = :ano",
+        {"municipio": 1, "ano": 2024},
+    ),
+    "home: orçamento": (
+        "SELECT valor_total_supl_orcamento FROM orcamentos WHERE municipio_id = :municipio AND exercicio_orcamento = :exercicio",
+        {"municipio": 1, "exercicio": "202400"},
+    ),
+    "receitas: transferências": (
+        "SELECT SUM(valor_arrecadado_no_mes) FROM receita WHERE municipio_id = :municipio AND codigo_rubrica LIKE '1.7%'",
+        {"municipio": 1},
+    ),
+    "receitas: por mês": (
+        "SELECT ano, mes, SUM(valor_arrecadado_no_mes) FROM receita WHERE municipio_id = :municipio GROUP BY ano, mes",
+        {"municipio": 1},
+    ),
+    "despesas: mensal do município": (
+        "SELECT mes, SUM(valor_liquidado_no_mes) FROM despesa WHERE municipio_id = :municipio AND ano = :ano GROUP BY mes",
+        {"municipio": 1, "ano": 2024},
+    ),
+    "despesas: mensal por exercício": (
+        "SELECT mes, SUM(valor_liquidado_no_mes) FROM despesa WHERE ano = :ano GROUP BY mes",
+        {"ano": 2024},
+    ),
+    "despesas: licitações": (
+        "SELECT status, SUM(valor_estimado) FROM licitacao WHERE municipio_id = :municipio AND status IS NOT NULL GROUP BY status",
+        {"municipio": 1},
+    ),
+    "pessoal: agentes por órgão": (
+        """
+        SELECT ap.exercicio_orcamento, o.nome_orgao, ap.codigo_vinculo, COUNT(*)
+        FROM agentes_publicos ap
+        LEFT JOIN orgao o ON ap.codigo_orgao = o.codigo_orgao AND ap.municipio_id = o.municipio_id
+        WHERE ap.municipio_id = :municipio
+        GROUP BY ap.exercicio_orcamento, o.nome_orgao, ap.codigo_vinculo
+        """,
+        {"municipio": 1},
+    ),
+}
+
+# Comentário que identifica os índices criados por este módulo: só eles são removidos quando saem de INDICES
+# (índices idx_ criados à mão por um DBA não são tocados)
+MARCADOR_INDICE = "gerenciado por tce_back/database/indices.py"
+
+def aplicar_indices(conn):
+    """Cria os índices gerenciados ausentes e remove os gerenciados que saíram da lista."""
+    existentes = dict(conn.execute(text("""
+        SELECT i.relname, obj_description(i.oid, 'pg_class') FROM pg_class i
+        JOIN pg_namespace n ON n.oid = i.relnamespace
+        WHERE i.relkind IN ('i', 'I') AND n.nspname = current_schema() AND i.relname LIKE 'idx\\_%'
+          AND NOT i.relispartition
+    """)).all())
+
+    for nome, definicao in INDICES.items():
+        if nome not in existentes:
+            logger.info(f"Criando índice {nome}...")
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {nome} ON {definicao}"))
+        if existentes.get(nome) != MARCADOR_INDICE:
+            # Também marca os índices da lista criados antes do marcador
+            conn.execute(text(f"COMMENT ON INDEX {nome} IS '{MARCADOR_INDICE}'"))
+
+    for nome, comentario in sorted(existentes.items()):
+        if nome not in INDICES and comentario == MARCADOR_INDICE:
+            logger.info(f"Removendo índice obsoleto {nome}...")
+            conn.execute(text(f"DROP INDEX IF EXISTS {nome}"))
+
+def _indices_do_plano(no):
+    """Percorre o plano do EXPLAIN (JSON) e retorna os índices usados."""
+    usados = set()
+    if "Index Name" in no:
+        usados.add(no["Index Name"])
+    for filho in no.get("Plans", []):
+        usados |= _indices_do_plano(filho)
+    return usados
+
+def _indice_raiz(conn, indice):
+    """Nas tabelas particionadas o plano cita o índice de cada partição; resolve para o índice da tabela-mãe."""
+    return conn.execute(
+        text("SELECT COALESCE(pg_partition_root(to_regclass(:indice)), to_regclass(:indice))::text"),
+        {"indice": indice}
+    ).scalar() or indice
+
+def verificar_uso_indices(engine):
+    """Executa EXPLAIN das consultas do dashboard e lista os índices usados por cada uma.
+
+    Também retorna o contador de varreduras (pg_stat_user_indexes) dos índices gerenciados e das chaves
+    naturais, que mostra o uso real acumulado pelo dashboard desde o último reset das estatísticas.
+    """
+    planos = {}
+    with engine.connect() as conn:
+        for nome, (consulta, params) in CONSULTAS_DASHBOARD.items():
+            plano = conn.execute(text(f"EXPLAIN (FORMAT JSON) {consulta}"), params).scalar()
+            planos[nome] = sorted({_indice_raiz(conn, indice) for indice in _indices_do_plano(plano[0]["Plan"])})
+
+        estatisticas = {
+            nome: varreduras
+            for nome, varreduras in conn.execute(text("""
+                SELECT COALESCE(pg_partition_root(indexrelid), indexrelid)::regclass::text AS indice, SUM(idx_scan)
+                FROM pg_stat_user_indexes
+                GROUP BY 1
+            """))
+            if nome in INDICES or nome.endswith("_chave_natural")
+        }
+
+    for nome, usados in planos.items():
+        logger.info(f"{nome}: {', '.join(usados) if usados else 'nenhum índice (varredura sequencial)'}")
+    for nome in INDICES:
+        if not any(nome in usados for usados in planos.values()):
+            logger.warning(f"Índice {nome} não aparece nos planos das consultas do dashboard.")
+    for nome, varreduras in sorted(estatisticas.items()):
+        logger.info(f"{nome}: {varreduras} varreduras registradas")
+    return planos, estatisticas
@@ -0,0 +1,125 @@
+# particoes.py
+import logging
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Tabelas fato particionadas por faixa de ano (db_schema.sql).
+# `escala` converte o ano no valor da coluna: 2024 -> 2024 (ano) ou 202400 (exercicio_orcamento).
+TABELAS_PARTICIONADAS = {
+    "receita": {"coluna": "ano", "escala": 1},
+    "despesa": {"coluna": "ano", "escala": 1},
+    "notas_empenho": {"coluna": "exercicio_orcamento", "escala": 100},
+    "liquidacoes": {"coluna": "exercicio_orcamento", "escala": 100},
+}
+
+# Partições já garantidas neste processo (evita DDL repetido a cada partição de carga)
+_particoes_criadas = set()
+
+def nome_particao(tabela, ano):
+    return f"{tabela}_{ano}"
+
+def _criar_particao(conn, tabela, ano):
+    """Cria a partição anual; linhas do ano já gravadas na partição DEFAULT (<tabela>_padrao) são movidas para ela.
+
+    O PostgreSQL recusa CREATE ... PARTITION OF se a DEFAULT tiver linhas da nova faixa, por isso, nesse
+    caso, a DEFAULT é desanexada, a partição criada, as linhas do ano movidas e a DEFAULT reanexada.
+    """
+    coluna = TABELAS_PARTICIONADAS[tabela]["coluna"]
+    escala = TABELAS_PARTICIONADAS[tabela]["escala"]
+    particao = nome_particao(tabela, ano)
+    padrao = f"{tabela}_padrao"
+    inicio, fim = ano * escala, (ano + 1) * escala
+    # Serializa a criação entre processos (por tabela, pois a DEFAULT pode ser desanexada)
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:tabela))"), {"tabela": tabela})
+    if conn.execute(text("SELECT to_regclass(:particao) IS NOT NULL"), {"particao": particao}).scalar():
+        return
+
+    com_padrao = conn.execute(text("SELECT to_regclass(:padrao) IS NOT NULL"), {"padrao": padrao}).scalar()
+    if not com_padrao or not conn.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {padrao} WHERE {coluna} >= {inicio} AND {coluna} < {fim})"
+    )).scalar():
+        conn.execute(text(f"CREATE TABLE {particao} PARTITION OF {tabela} FOR VALUES FROM ({inicio}) TO ({fim})"))
+        return
+
+    conn.execute(text(f"ALTER TABLE {tabela} DETACH PARTITION {padrao}"))
+    conn.execute(text(f"CREATE TABLE {particao} PARTITION OF {tabela} FOR VALUES FROM ({inicio}) TO ({fim})"))
+    movidas = conn.execute(text(f"""
+        WITH movidas AS (
+            DELETE FROM {padrao} WHERE {coluna} >= {inicio} AND {coluna} < {fim} RETURNING *
+        )
+        INSERT INTO {particao} SELECT * FROM movidas
+    """)).rowcount
+    conn.execute(text(f"ALTER TABLE {tabela} ATTACH PARTITION {padrao} DEFAULT"))
+    logger.info(f"{movidas} linhas de {ano} movidas de {padrao} para {particao}.")
+
+def garantir_particao(engine, tabela, ano):
+    """Cria (uma vez por processo) a partição anual da tabela, em transação própria.
+
+    Deve ser chamada antes de gravar o ano pela primeira vez: a sessão da carga não pode ter
+    escrito na tabela na transação corrente, pois a criação bloqueia a tabela particionada.
+    """
+    ano = int(ano)
+    if (tabela, ano) in _particoes_criadas:
+        return
+    with engine.begin() as conn:
+        _criar_particao(conn, tabela, ano)
+    _particoes_criadas.add((tabela, ano))
+
+def migrar_tabelas_legadas(conn):
+    """Renomeia as tabelas fato criadas antes do particionamento para <tabela>_legado.
+
+    Deve rodar antes do db_schema.sql (que recria as tabelas particionadas); os dados são copiados
+    depois por `copiar_tabelas_legadas`. Retorna as tabelas renomeadas.
+    """
+    renomeadas = []
+    for tabela in TABELAS_PARTICIONADAS:
+        tipo = conn.execute(
+            text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:tabela)"), {"tabela": tabela}
+        ).scalar()
+        if tipo != "r":  # inexistente ou já particionada ('p')
+            continue
+        legado = f"{tabela}_legado"
+        logger.info(f"Migrando {tabela} para tabela particionada (dados antigos em {legado})...")
+        conn.execute(text(f"ALTER TABLE {tabela} RENAME TO {legado}"))
+        # Libera os nomes de constraint, índice e sequência usados pela nova tabela
+        conn.execute(text(f"ALTER TABLE {legado} RENAME CONSTRAINT {tabela}_pkey TO {legado}_pkey"))
+        conn.execute(text(f"ALTER INDEX IF EXISTS {tabela}_chave_natural RENAME TO {legado}_chave_natural"))
+        conn.execute(text(f"ALTER SEQUENCE IF EXISTS {tabela}_id_seq RENAME TO {legado}_id_seq"))
+        renomeadas.append(tabela)
+    return renomeadas
+
+def copiar_tabelas_legadas(conn, tabelas):
+    """Copia os dados das tabelas <tabela>_legado para as particionadas, criando as partições anuais.
+
+    Linhas sem ano (fora de qualquer partição válida) ficam na tabela legada, que só é removida se
+    tudo foi copiado.
+    """
+    for tabela in tabelas:
+        legado = f"{tabela}_legado"
+        coluna = TABELAS_PARTICIONADAS[tabela]["coluna"]
+        escala = TABELAS_PARTICIONADAS[tabela]["escala"]
+
+        anos = conn.execute(text(
+            f"SELECT DISTINCT {coluna} / {escala} FROM {legado} WHERE {coluna} IS NOT NULL"
+        )).scalars().all()
+        for ano in anos:
+            _criar_particao(conn, tabela, ano)
+
+        colunas = ", ".join(
+            conn.execute(text("""
+                SELECT column_name FROM information_schema.columns
+                WHERE table_name = :tabela ORDER BY ordinal_position
+            """), {"tabela": legado}).scalars().all()
+        )
+        copiadas = conn.execute(text(
+            f"INSERT INTO {tabela} ({colunas}) SELECT {colunas} FROM {legado} WHERE {coluna} IS NOT NULL"
+        )).rowcount
+        conn.execute(text(f"SELECT setval('{tabela}_id_seq', GREATEST((SELECT MAX(id) FROM {tabela}), 1))"))
+
+        restantes = conn.execute(text(f"SELECT COUNT(*) FROM {legado} WHERE {coluna} IS NULL")).scalar()
+        if restantes:
+            logger.warning(f"{restantes} linhas de {legado} sem {coluna} não foram migradas; tabela mantida.")
+        else:
+            conn.execute(text(f"DROP TABLE {legado}"))
+        logger.info(f"{copiadas} linhas migradas para {tabela}.")
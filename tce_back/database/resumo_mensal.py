@@ -0,0 +1,94 @@
+# resumo_mensal.py
+import logging
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Classificação da rubrica de receita usada pelo dashboard: origem e, para transferências (1.7) e receitas
+# tributárias (1.1), a subcategoria
+ORIGEM_RECEITA = """
+    CASE
+        WHEN codigo_rubrica IS NULL THEN NULL
+        WHEN codigo_rubrica LIKE '1.1%' THEN 'Receitas Tributárias'
+        WHEN codigo_rubrica LIKE '1.2%' THEN 'Receitas de Contribuições'
+        WHEN codigo_rubrica LIKE '1.3%' THEN 'Receita Patrimonial'
+        WHEN codigo_rubrica LIKE '1.7%' THEN 'Transferências Correntes'
+        ELSE 'Outras Receitas'
+    END
+"""
+
+SUBCATEGORIA_RECEITA = """
+    CASE
+        WHEN codigo_rubrica LIKE '1.7.1%' THEN 'Transferências da União'
+        WHEN codigo_rubrica LIKE '1.7.2%' THEN 'Transferências dos Estados'
+        WHEN codigo_rubrica LIKE '1.7.3%' THEN 'Transferências dos Municípios'
+        WHEN codigo_rubrica LIKE '1.7.4%' THEN 'Transferências Multigovernamentais'
+        WHEN codigo_rubrica LIKE '1.7.5%' THEN 'Transferências de Consórcios Públicos'
+        WHEN codigo_rubrica LIKE '1.7.6%' THEN 'Transferências do Exterior'
+        WHEN codigo_rubrica LIKE '1.7.7%' THEN 'Transferências de Pessoas'
+        WHEN codigo_rubrica LIKE '1.7.8%' THEN 'Transferências de Convênios'
+        WHEN codigo_rubrica LIKE '1.7%' THEN 'Outras Transferências'
+        WHEN codigo_rubrica LIKE '1.1.1%' THEN 'Impostos'
+        WHEN codigo_rubrica LIKE '1.1.2%' THEN 'Taxas'
+        WHEN codigo_rubrica LIKE '1.1.3%' THEN 'Contribuição de Melhoria'
+        WHEN codigo_rubrica LIKE '1.1%' THEN 'Outras Receitas Tributárias'
+    END
+"""
+
+# Resumo mensal de cada tabela de fatos: tabela do resumo, colunas, SELECT agregado sobre a tabela de
+# fatos e as colunas de agrupamento (município, ano, mês e categoria)
+RESUMOS = {
+    "receita": {
+        "resumo": "resumo_receita_mensal",
+        "colunas": "municipio_id, ano, mes, origem, subcategoria, valor_previsto, valor_arrecadado",
+        "select": f"""
+            SELECT municipio_id, ano, mes, {ORIGEM_RECEITA}, {SUBCATEGORIA_RECEITA},
+                   SUM(valor_previsto_orcamento), SUM(valor_arrecadado_no_mes)
+            FROM receita
+        """,
+        "grupos": "1, 2, 3, 4, 5",
+    },
+    "despesa": {
+        "resumo": "resumo_despesa_mensal",
+        "colunas": "municipio_id, ano, mes, codigo_funcao, valor_fixado, valor_empenhado, valor_liquidado, valor_pago",
+        "select": """
+            SELECT municipio_id, ano, mes, codigo_funcao,
+                   SUM(valor_fixado_orcamento_bal_despesa), SUM(valor_empenhado_no_mes),
+                   SUM(valor_liquidado_no_mes), SUM(valor_pago_no_mes)
+            FROM despesa
+        """,
+        "grupos": "1, 2, 3, 4",
+    },
+}
+
+def atualizar_resumo(session, tabela, municipio_id, ano, mes):
+    """Substitui a contribuição de um mês (partição recém-gravada) no resumo mensal da tabela.
+
+    Deve ser chamada na transação que grava a partição: as linhas antigas do mês saem do resumo e as
+    novas são agregadas a partir da partição, de modo que o resumo acompanha cada commit dos loaders
+    e o custo é proporcional ao mês carregado, não ao histórico.
+    """
+    resumo = RESUMOS[tabela]
+    params = {"municipio_id": municipio_id, "ano": ano, "mes": mes}
+    session.execute(text(f"""
+        DELETE FROM {resumo['resumo']} WHERE municipio_id = :municipio_id AND ano = :ano AND mes = :mes
+    """), params)
+    session.execute(text(f"""
+        INSERT INTO {resumo['resumo']} ({resumo['colunas']})
+        {resumo['select']}
+        WHERE municipio_id = :municipio_id AND ano = :ano AND mes = :mes
+        GROUP BY {resumo['grupos']}
+    """), params)
+
+def preencher_resumos(conn):
+    """Carga inicial dos resumos vazios a partir das tabelas de fatos (bancos anteriores ao resumo mensal)."""
+    for tabela, resumo in RESUMOS.items():
+        if conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {resumo['resumo']})")).scalar():
+            continue
+        inseridas = conn.execute(text(f"""
+            INSERT INTO {resumo['resumo']} ({resumo['colunas']})
+            {resumo['select']}
+            GROUP BY {resumo['grupos']}
+        """)).rowcount
+        if inseridas:
+            logger.info(f"Resumo mensal {resumo['resumo']} preenchido com {inseridas} linhas de {tabela}.")
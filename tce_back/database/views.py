@@ -0,0 +1,42 @@
+# views.py
+import logging
+import time
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Views materializadas do dashboard (db_schema.sql) que dependem das tabelas gravadas por cada loader
+# (receita e despesa não têm views: os loaders mantêm os resumos mensais, ver resumo_mensal.py)
+VIEWS_POR_LOADER = {
+    "load_licitacao": ["mv_licitacao_totais"],
+}
+
+def views_dos_loaders(loaders):
+    """Views afetadas pelos loaders, sem repetição e na ordem de VIEWS_POR_LOADER."""
+    return [view for loader, views in VIEWS_POR_LOADER.items() if loader in loaders for view in views]
+
+def atualizar_views(engine, loaders):
+    """Atualiza as views materializadas que dependem dos loaders executados.
+
+    Usa REFRESH ... CONCURRENTLY, que não bloqueia as leituras do dashboard durante a atualização; uma
+    view ainda não populada (WITH NO DATA) é atualizada sem CONCURRENTLY, que exige dados. Cada view
+    é atualizada na sua própria transação: a falha de uma não impede as demais. Retorna as atualizadas.
+    """
+    atualizadas = []
+    for view in views_dos_loaders(loaders):
+        inicio = time.time()
+        try:
+            with engine.begin() as conn:
+                populada = conn.execute(
+                    text("SELECT ispopulated FROM pg_matviews WHERE matviewname = :view"), {"view": view}
+                ).scalar()
+                if populada is None:
+                    logger.warning(f"View materializada {view} não existe (execute o setup do banco).")
+                    continue
+                conn.execute(text(f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if populada else ''}{view}"))
+        except Exception as e:
+            logger.error(f"Falha ao atualizar a view {view}: {e}")
+            continue
+        logger.info(f"View {view} atualizada em {time.time() - inicio:.1f}s.")
+        atualizadas.append(view)
+    return atualizadas
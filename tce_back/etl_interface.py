@@ -1,10 +1,11 @@
-from sqlalchemy import create_engine, text
-from config import DB_CONFIG, API_BASE_URL
+from sqlalchemy import text
+from config import API_BASE_URL
+from database.db_config import get_db_engine, estatisticas_pool
 import requests
 
 def get_engine():
-    url = f"postgresql+psycopg2://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
-    return create_engine(url)
+    """Engine compartilhado do processo (o Streamlit reaproveita o pool entre as reexecuções)."""
+    return get_db_engine()
 
 def get_progresso_por_tipo():
     engine = get_engine()
@@ -30,13 +31,23 @@ def get_municipios_pendentes(tipo, ano, mes):
         return [row[0] for row in todos if row[0] not in codigos_carregados]
 
 def get_funcoes_etl_disponiveis():
+    """Loaders aceitos por `main.py <loader>`, na ordem de dependência da carga completa."""
     return [
         "load_municipios",
         "load_orgaos",
         "load_receitas",
         "load_despesas",
+        "load_agentes_publicos",
         "load_licitacao",
         "load_prestacao_contas",
+        "load_unidade_orcamentaria",
+        "load_orcamentos",
+        "load_balancete_despesa_extra_orcamentaria",
+        "load_receita_extra_orcamentaria",
+        "load_orcamentos_receita",
+        "load_despesa_elemento_projeto",
+        "load_despesa_projeto_atividade",
+        "load_despesa_categoria_economica",
         "load_liquidacoes",
         "load_notas_empenho"
     ]
@@ -88,6 +99,11 @@ def ping_db() -> bool:
         return False
 
 
+def get_estatisticas_pool():
+    """Métricas do pool de conexões do painel (checkouts, conexões abertas, pico em uso)."""
+    return estatisticas_pool()
+
+
 def ping_api(timeout: float = 3.0) -> bool:
     try:
         resp = requests.get(API_BASE_URL, timeout=timeout)
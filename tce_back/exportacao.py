@@ -0,0 +1,160 @@
+# exportacao.py
+import logging
+import os
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text
+from config import EXPORTACAO_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_MUNICIPIO_ID = "municipio_id = (SELECT id FROM municipio WHERE codigo_municipio = :codigo)"
+
+# Tabelas exportadas: tipo_dado em controle_carga, filtro das linhas de um (município, ano) e, para tabelas
+# sem `id`, a ordenação das linhas no arquivo. Os resumos mensais (database/resumo_mensal.py) acompanham as
+# partições da tabela de origem e são exportados para o DuckDB do dashboard lê-los sem reagregar
+TABELAS_EXPORTACAO = {
+    "receita": {"tipo": "receita", "filtro": f"{_MUNICIPIO_ID} AND ano = :ano"},
+    "despesa": {"tipo": "despesa", "filtro": f"{_MUNICIPIO_ID} AND ano = :ano"},
+    "resumo_receita_mensal": {"tipo": "receita", "filtro": f"{_MUNICIPIO_ID} AND ano = :ano", "ordem": "mes"},
+    "resumo_despesa_mensal": {"tipo": "despesa", "filtro": f"{_MUNICIPIO_ID} AND ano = :ano", "ordem": "mes"},
+    "notas_empenho": {"tipo": "notas_empenho", "filtro": "codigo_municipio = :codigo AND exercicio_orcamento = :exercicio"},
+    "liquidacoes": {"tipo": "liquidacoes", "filtro": "codigo_municipio = :codigo AND exercicio_orcamento = :exercicio"},
+    "agentes_publicos": {"tipo": "agente_publico", "filtro": f"{_MUNICIPIO_ID} AND exercicio_orcamento = :exercicio"},
+}
+
+# Tipos do Postgres (information_schema) -> tipos do Arrow; os demais são exportados como texto
+TIPOS_ARROW = {
+    "smallint": pa.int16(),
+    "integer": pa.int32(),
+    "bigint": pa.int64(),
+    "double precision": pa.float64(),
+    "real": pa.float32(),
+    "boolean": pa.bool_(),
+    "date": pa.date32(),
+    "timestamp without time zone": pa.timestamp("us"),
+}
+
+def esquema_arrow(conn, tabela):
+    """Esquema Arrow fixo da tabela (NUMERIC(p, s) vira decimal128(p, s)), igual em todos os arquivos."""
+    campos = []
+    for coluna, tipo, precisao, escala in conn.execute(text("""
+        SELECT column_name, data_type, numeric_precision, numeric_scale
+        FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = :tabela
+        ORDER BY ordinal_position
+    """), {"tabela": tabela}):
+        if tipo == "numeric":
+            tipo_arrow = pa.decimal128(precisao or 38, escala or 0)
+        else:
+            tipo_arrow = TIPOS_ARROW.get(tipo, pa.string())
+        campos.append(pa.field(coluna, tipo_arrow))
+    return pa.schema(campos)
+
+def particoes_alteradas(conn, tabela, municipios=None):
+    """(município, ano, versão) com partições em controle_carga mais recentes que a última exportação.
+
+    A versão é o maior processado_em do (município, ano); guardada em exportacao_parquet, faz com que
+    a próxima execução só regrave os arquivos cujas partições foram carregadas de novo.
+    """
+    return conn.execute(text("""
+        SELECT c.codigo_municipio, c.ano, MAX(c.processado_em) AS versao
+        FROM controle_carga c
+        LEFT JOIN exportacao_parquet e
+          ON e.tabela = :tabela AND e.codigo_municipio = c.codigo_municipio AND e.ano = c.ano
+        WHERE c.tipo_dado = :tipo
+          AND (CAST(:municipios AS TEXT[]) IS NULL OR c.codigo_municipio = ANY(CAST(:municipios AS TEXT[])))
+        GROUP BY c.codigo_municipio, c.ano, e.versao
+        HAVING e.versao IS NULL OR MAX(c.processado_em) > e.versao
+        ORDER BY c.ano, c.codigo_municipio
+    """), {
+        "tabela": tabela, "tipo": TABELAS_EXPORTACAO[tabela]["tipo"],
+        "municipios": list(municipios) if municipios else None,
+    }).fetchall()
+
+def caminho_arquivo(tabela, codigo, ano, diretorio=None):
+    """Layout particionado (estilo Hive): <diretorio>/<tabela>/ano=<ano>/municipio=<código>/dados.parquet."""
+    return os.path.join(diretorio or EXPORTACAO_CONFIG["diretorio"], tabela, f"ano={ano}", f"municipio={codigo}", "dados.parquet")
+
+def exportar_particao(engine, tabela, esquema, codigo, ano, diretorio=None):
+    """Regrava o arquivo Parquet de um (município, ano) lendo a tabela por cursor do lado do servidor.
+
+    As linhas chegam em lotes de EXPORTACAO_CONFIG["linhas_por_lote"] e cada lote vira um row group, de
+    modo que a memória não cresce com o tamanho da partição. O arquivo é escrito num temporário e
+    renomeado ao final; partições sem linhas removem o arquivo anterior. Retorna o total de linhas.
+    """
+    caminho = caminho_arquivo(tabela, codigo, ano, diretorio)
+    temporario = f"{caminho}.tmp"
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    colunas = ", ".join(esquema.names)
+    linhas = 0
+    escritor = None
+    try:
+        with engine.connect() as conn:
+            resultado = conn.execution_options(
+                stream_results=True, max_row_buffer=EXPORTACAO_CONFIG["linhas_por_lote"]
+            ).execute(
+                text(
+                    f"SELECT {colunas} FROM {tabela} WHERE {TABELAS_EXPORTACAO[tabela]['filtro']} "
+                    f"ORDER BY {TABELAS_EXPORTACAO[tabela].get('ordem', 'id')}"
+                ),
+                {"codigo": codigo, "ano": ano, "exercicio": f"{ano}00"}
+            )
+            for lote in resultado.partitions(EXPORTACAO_CONFIG["linhas_por_lote"]):
+                if escritor is None:
+                    escritor = pq.ParquetWriter(
+                        temporario, esquema, compression=EXPORTACAO_CONFIG["compressao"], write_statistics=True
+                    )
+                colunas_lote = list(zip(*lote))
+                escritor.write_batch(pa.record_batch(
+                    [pa.array(valores, type=campo.type) for valores, campo in zip(colunas_lote, esquema)], schema=esquema
+                ))
+                linhas += len(lote)
+        if escritor is not None:
+            escritor.close()
+            escritor = None
+            os.replace(temporario, caminho)
+        elif os.path.exists(caminho):
+            os.remove(caminho)
+        return linhas
+    finally:
+        if escritor is not None:
+            escritor.close()
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+def registrar_exportacao(engine, tabela, codigo, ano, versao, linhas):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO exportacao_parquet (tabela, codigo_municipio, ano, versao, linhas, exportado_em)
+            VALUES (:tabela, :codigo, :ano, :versao, :linhas, NOW())
+            ON CONFLICT (tabela, codigo_municipio, ano) DO UPDATE SET
+                versao = EXCLUDED.versao,
+                linhas = EXCLUDED.linhas,
+                exportado_em = EXCLUDED.exportado_em
+        """), {"tabela": tabela, "codigo": codigo, "ano": ano, "versao": versao, "linhas": linhas})
+
+def exportar_parquet(engine, tabelas=None, municipios=None, diretorio=None):
+    """Exporta as tabelas de fatos e os resumos mensais para Parquet, regravando só os (município, ano) alterados desde a última exportação.
+
+    Retorna {tabela: (arquivos regravados, linhas exportadas)}.
+    """
+    resumo = {}
+    for tabela in tabelas or TABELAS_EXPORTACAO:
+        with engine.connect() as conn:
+            esquema = esquema_arrow(conn, tabela)
+            alteradas = particoes_alteradas(conn, tabela, municipios)
+        arquivos = total = 0
+        for codigo, ano, versao in alteradas:
+            try:
+                linhas = exportar_particao(engine, tabela, esquema, codigo, ano, diretorio)
+            except Exception as e:
+                logger.error(f"Falha ao exportar {tabela} {codigo}/{ano}: {e}")
+                continue
+            registrar_exportacao(engine, tabela, codigo, ano, versao, linhas)
+            arquivos += 1
+            total += linhas
+            logger.debug(f"{tabela} {codigo}/{ano} exportado ({linhas} linhas).")
+        logger.info(f"Exportação Parquet de {tabela}: {arquivos} arquivos regravados, {total} linhas.")
+        resumo[tabela] = (arquivos, total)
+    return resumo
@@ -0,0 +1,67 @@
+# logs.py
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from config import LOG_CONFIG
+
+class FormatoTexto(logging.Formatter):
+    """Linha legível: data, nível, módulo e mensagem, seguidos dos campos estruturados (chave=valor)."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s [%(levelname)s] %(name)s: %(message)s", "%Y-%m-%d %H:%M:%S")
+
+    def format(self, record):
+        linha = super().format(record)
+        campos = getattr(record, "campos", None)
+        if campos:
+            linha += " " + " ".join(f"{chave}={valor}" for chave, valor in campos.items())
+        return linha
+
+class FormatoJson(logging.Formatter):
+    """Um objeto JSON por linha, com os campos estruturados no primeiro nível."""
+
+    def format(self, record):
+        evento = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "mensagem": record.getMessage(),
+        }
+        evento.update(getattr(record, "campos", None) or {})
+        if record.exc_info:
+            evento["excecao"] = self.formatException(record.exc_info)
+        return json.dumps(evento, ensure_ascii=False, default=str)
+
+_configurado_pid = None
+
+def configurar_logging(nivel=None, formato=None):
+    """Configura o logging do processo (uma vez por processo, inclusive nos workers).
+
+    Os loggers só enfileiram os eventos (QueueHandler); uma thread de fundo (QueueListener) formata e
+    escreve no stdout, de modo que os laços de busca e gravação não esperam pela saída.
+    """
+    global _configurado_pid
+    if _configurado_pid == os.getpid():
+        return
+    _configurado_pid = os.getpid()
+
+    saida = logging.StreamHandler(sys.stdout)
+    saida.setFormatter(FormatoJson() if (formato or LOG_CONFIG["formato"]) == "json" else FormatoTexto())
+    fila = queue.SimpleQueue()
+    ouvinte = logging.handlers.QueueListener(fila, saida, respect_handler_level=True)
+    ouvinte.start()
+    atexit.register(ouvinte.stop)
+
+    raiz = logging.getLogger()
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    raiz.addHandler(logging.handlers.QueueHandler(fila))
+    raiz.setLevel(nivel or LOG_CONFIG["nivel"])
+    # Bibliotecas de terceiros só com avisos, mesmo no modo verboso
+    for biblioteca in ("urllib3", "requests", "sqlalchemy"):
+        logging.getLogger(biblioteca).setLevel(logging.WARNING)
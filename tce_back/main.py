@@ -1,78 +1,377 @@
-
 # main.py
+import argparse
+import logging
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 from database.db_setup import setup_database
-from database.db_config import get_db_engine
-from data_extraction.data_loader import load_municipios, load_receitas, load_despesas, load_agentes_publicos, load_licitacao, load_prestacao_contas, load_orgaos, load_unidade_orcamentaria, load_orcamentos, load_balancete_despesa_extra_orcamentaria, load_receita_extra_orcamentaria, load_orcamentos_receita, load_despesa_elemento_projeto, load_despesa_projeto_atividade, load_despesa_categoria_economica, load_liquidacoes, load_notas_empenho
-from sqlalchemy.orm import sessionmaker
+from database.db_config import get_db_engine, estatisticas_pool, log_estatisticas_pool
+from database.indices import verificar_uso_indices
+from database.views import atualizar_views
+from database import fila_carga
+from data_extraction import data_loader
+from data_extraction.data_loader import load_municipios, CODIGOS_MUNICIPIOS
+from data_extraction.api_client import get_client, log_estatisticas_conexoes
+from data_extraction.planejamento import planejar, imprimir_plano
+from logs import configurar_logging
+from exportacao import exportar_parquet, TABELAS_EXPORTACAO
+from metricas import get_metricas, gravar_metricas, exportar_prometheus, log_resumo_metricas, execucao_atual
+from sqlalchemy import text
+from config import REFRESH_CONFIG, FILA_CONFIG, PERIODO_CONFIG, LOG_CONFIG, faixa_inteiros
+
+logger = logging.getLogger(__name__)
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-def main():
-    print("[INFO] Configurando o banco de dados...")
-    setup_database()
+# Loaders por município, na ordem de dependência (órgãos antes de notas de empenho etc.)
+ETAPAS = [
+    ("load_orgaos", "órgãos"),
+    ("load_receitas", "receitas"),
+    ("load_despesas", "despesas"),
+    ("load_agentes_publicos", "agentes públicos"),
+    ("load_licitacao", "licitações"),
+    ("load_prestacao_contas", "prestação de contas"),
+    ("load_unidade_orcamentaria", "unidade orcamentaria"),
+    ("load_orcamentos", "orcamentos"),
+    ("load_balancete_despesa_extra_orcamentaria", "despesa extra orcamentaria"),
+    ("load_receita_extra_orcamentaria", "receita extra orcamentaria"),
+    ("load_orcamentos_receita", "orcamentos receitas"),
+    ("load_despesa_elemento_projeto", "elementos dos projetos"),
+    ("load_despesa_projeto_atividade", "despesa projeto atividade"),
+    ("load_despesa_categoria_economica", "despesa categoria economia"),
+    ("load_liquidacoes", "liquidacoes"),
+    ("load_notas_empenho", "notas de empenho"),
+]
 
-    # Cria a conexão com o banco de dados
+def selecionar_etapas(nomes=None):
+    """Filtra ETAPAS pelos loaders informados (com ou sem o prefixo load_), mantendo a ordem de dependência."""
+    if not nomes:
+        return ETAPAS
+    pedidos = {nome if nome.startswith("load_") else f"load_{nome}" for nome in nomes}
+    return [(nome, descricao) for nome, descricao in ETAPAS if nome in pedidos]
+
+def contar_particoes(engine, codigos):
+    """Conta as partições registradas em controle_carga para os municípios informados."""
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT COUNT(*) FROM controle_carga WHERE codigo_municipio = ANY(:codigos)"),
+            {"codigos": list(codigos)}
+        ).scalar()
+
+def executar_shard(nome_loader, codigos):
+    """Executa um loader para um grupo de municípios em um processo do pool (com sua própria conexão)."""
+    configurar_logging()
+    inicio = time.time()
     engine = get_db_engine()
-    Session = sessionmaker(bind=engine)
-    session = Session()
+    antes = contar_particoes(engine, codigos)
+    erro = None
+    try:
+        with get_metricas().medir_loader(nome_loader):
+            getattr(data_loader, nome_loader)(municipios=codigos)
+    except Exception as e:
+        erro = str(e)
+        logger.error(f"Shard {nome_loader} ({codigos[0]}..{codigos[-1]}) falhou: {e}")
+    depois = contar_particoes(engine, codigos)
+    gravar_metricas(engine)
+    return {
+        "loader": nome_loader,
+        "municipios": len(codigos),
+        "particoes": depois - antes,
+        "segundos": time.time() - inicio,
+        "erro": erro,
+        "conexoes": get_client().estatisticas_conexoes(),
+        "pool": estatisticas_pool(),
+    }
 
-    
-    print("[INFO] Carregando dados de municípios...")
-    load_municipios()
+def publicar_metricas():
+    """Grava as métricas pendentes do processo e imprime o resumo da execução (todos os workers)."""
+    engine = get_db_engine()
+    gravar_metricas(engine)
+    log_resumo_metricas(engine, execucao_atual())
+    exportar_prometheus(engine, execucao_atual())
 
-    print("[INFO] Carregando dados de órgãos...")
-    load_orgaos() 
-    
-    print("[INFO] Carregando dados de receitas...")
-    load_receitas()
-    
-    print("[INFO] Carregando dados de despesas...")
-    load_despesas()
-    
-    print("[INFO] Carregando dados de agentes públicos...")
-    load_agentes_publicos()
+def dividir_em_shards(codigos, workers):
+    """Divide os municípios em cerca de quatro grupos por worker, para balancear a carga."""
+    tamanho = max(1, math.ceil(len(codigos) / (workers * 4)))
+    return [codigos[i:i + tamanho] for i in range(0, len(codigos), tamanho)]
 
-    print("[INFO] Carregando dados de licitações...")
-    load_licitacao()
-    
-    print("[INFO] Carregando dados de prestação de contas...")
-    load_prestacao_contas()
-    
-    print("[INFO] Carregando dados unidade orcamentaria...")
-    load_unidade_orcamentaria()
+def listar_municipios():
+    engine = get_db_engine()
+    with engine.connect() as conn:
+        codigos = [row[0] for row in conn.execute(text("SELECT codigo_municipio FROM municipio ORDER BY codigo_municipio"))]
+    return codigos or CODIGOS_MUNICIPIOS
+
+def limpar_armazenamento():
+    """Aplica a retenção do armazenamento local de respostas da API."""
+    store = get_client().store
+    if store.ativo and store.modo != "replay":
+        removidos = store.limpar()
+        logger.info(f"Armazenamento local: {removidos} respostas expiradas removidas.")
+
+def main_sharded(workers, etapas=None, municipios=None, carga_completa=True):
+    if carga_completa:
+        logger.info(f"Configurando o banco de dados (modo sharded, {workers} workers)...")
+        setup_database()
 
-    print("[INFO] Carregando dados de orcamentos...")
-    load_orcamentos()
+        logger.info("Carregando dados de municípios...")
+        load_municipios()
 
-    print("[INFO] Carregando dados de despesa extra orcamentaria...")
-    load_balancete_despesa_extra_orcamentaria()
+    shards = dividir_em_shards(municipios or listar_municipios(), workers)
+    resumo = []
+    contexto = multiprocessing.get_context("spawn")  # Cada worker abre suas próprias conexões
 
-    print("[INFO] Carregando dados de receita extra orcamentaria...")
-    load_receita_extra_orcamentaria()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=contexto) as pool:
+        for nome_loader, descricao in etapas or ETAPAS:
+            logger.info(f"Carregando dados de {descricao} em {len(shards)} shards...")
+            inicio = time.time()
+            futuros = [pool.submit(executar_shard, nome_loader, shard) for shard in shards]
+            resultados = [futuro.result() for futuro in as_completed(futuros)]
+            atualizar_views(get_db_engine(), [nome_loader])
+            resumo.append({
+                "loader": nome_loader,
+                "shards": len(resultados),
+                "particoes": sum(r["particoes"] for r in resultados),
+                "erros": sum(1 for r in resultados if r["erro"]),
+                "segundos": time.time() - inicio,
+                "requisicoes": sum(r["conexoes"]["requisicoes"] for r in resultados),
+                "conexoes_novas": sum(r["conexoes"]["conexoes_novas"] for r in resultados),
+                "pico_pool": max(r["pool"]["pico_em_uso"] for r in resultados),
+            })
 
-    print("[INFO] Carregando dados de orcamentos receitas...")
-    load_orcamentos_receita()
+    publicar_metricas()
+    limpar_armazenamento()
+    logger.info("Resumo da execução:")
+    for item in resumo:
+        logger.info(
+            f"  {item['loader']}: {item['particoes']} partições em {item['segundos']:.1f}s "
+            f"({item['shards']} shards, {item['erros']} com erro, {item['requisicoes']} requisições, "
+            f"{item['conexoes_novas']} conexões novas, pico de {item['pico_pool']} conexões do banco por worker)"
+        )
+    return resumo
 
-    print("[INFO] Carregando dados de elementos dos projetos...")
-    load_despesa_elemento_projeto()
+def main(etapas=None, municipios=None, carga_completa=True):
+    """Carga sequencial; sem seleção, configura o banco, carrega os municípios e roda todas as ETAPAS."""
+    if carga_completa:
+        logger.info("Configurando o banco de dados...")
+        setup_database()
 
-    print("[INFO] Carregando dados de despesa projeto atividade...")
-    load_despesa_projeto_atividade()
+        logger.info("Carregando dados de municípios...")
+        load_municipios()
 
-    print("[INFO] Carregando dados de despesa categoria economia...")
-    load_despesa_categoria_economica()
+    for nome_loader, descricao in etapas or ETAPAS:
+        logger.info(f"Carregando dados de {descricao}...")
+        with get_metricas().medir_loader(nome_loader):
+            getattr(data_loader, nome_loader)(municipios=municipios)
+        atualizar_views(get_db_engine(), [nome_loader])
 
-    print("[INFO] Carregando dados de liquidacoes...")
-    load_liquidacoes()
+    log_estatisticas_conexoes()
+    log_estatisticas_pool()
+    publicar_metricas()
+    limpar_armazenamento()
+    logger.info("Processo concluído com sucesso!")
 
-    print("[INFO] Carregando dados de notas de empenho...")
-    load_notas_empenho()
+def executar_worker(worker=None):
+    """Consome a fila_carga até não haver jobs pendentes nem em execução.
+
+    Cada job é um loader para um município; o lease é renovado por heartbeat enquanto o loader roda.
+    Vários workers (processos ou nós) podem consumir a mesma fila sem repetir trabalho.
+    """
+    configurar_logging()
+    engine = get_db_engine()
+    worker = worker or fila_carga.nome_worker()
+    executados = 0
+    logger.info(f"Worker {worker} consumindo a fila de carga.")
+    while True:
+        job = fila_carga.reservar(engine, worker)
+        if job is None:
+            if not fila_carga.fila_ativa(engine):
+                break
+            # Jobs restantes estão com outros workers ou aguardam etapas anteriores do município
+            time.sleep(FILA_CONFIG["espera_segundos"])
+            continue
 
-    print("[INFO] Processo concluído com sucesso!")
+        job_id, nome_loader, codigo = job.id, job.loader, job.codigo_municipio
+        # Período e modo vêm do job (quem enfileirou), não do ambiente deste worker
+        fila_carga.aplicar_parametros(job)
+        logger.info(
+            f"Worker {worker}: {nome_loader} para o município {codigo} (job {job_id}; anos {job.anos or 'padrão'}, "
+            f"meses {job.meses or 'todos'}{', forçada' if job.forcar else ''}{', atualização' if job.refresh else ''})."
+        )
+        heartbeat = fila_carga.Heartbeat(engine, job_id, worker)
+        try:
+            with heartbeat, get_metricas().medir_loader(nome_loader):
+                getattr(data_loader, nome_loader)(municipios=[codigo])
+        except fila_carga.LeasePerdido:
+            pass
+        except Exception as e:
+            logger.error(f"Job {job_id} ({nome_loader} {codigo}) falhou: {e}")
+            fila_carga.falhar(engine, job_id, worker, str(e))
+            continue
+        finally:
+            gravar_metricas(engine)
+        if heartbeat.perdido.is_set():
+            # O job voltou para a fila (ou já está com outro worker): não é concluído por este
+            logger.warning(f"Job {job_id} ({nome_loader} {codigo}) interrompido: lease perdido.")
+            continue
+        fila_carga.concluir(engine, job_id, worker)
+        executados += 1
+
+    logger.info(f"Worker {worker} encerrado: {executados} jobs concluídos.")
+    return executados
+
+def main_fila(workers, enfileirar=True, etapas=None, municipios=None, carga_completa=True):
+    """Executa a carga pela fila distribuída: enfileira os jobs (se pedido) e consome com `workers` processos.
+
+    Outras máquinas podem somar workers à mesma fila com `main.py --worker`.
+    """
+    if enfileirar:
+        if carga_completa:
+            logger.info("Configurando o banco de dados (modo fila)...")
+            setup_database()
+
+            logger.info("Carregando dados de municípios...")
+            load_municipios()
+
+        novos = fila_carga.enfileirar(
+            get_db_engine(), [(ETAPAS.index(etapa), etapa[0]) for etapa in etapas or ETAPAS],
+            municipios or listar_municipios()
+        )
+        logger.info(f"{novos} jobs enfileirados em fila_carga.")
+
+    if workers > 1:
+        contexto = multiprocessing.get_context("spawn")  # Cada worker abre suas próprias conexões
+        with ProcessPoolExecutor(max_workers=workers, mp_context=contexto) as pool:
+            concluidos = sum(futuro.result() for futuro in [pool.submit(executar_worker) for _ in range(workers)])
+    else:
+        concluidos = executar_worker()
+
+    # Os jobs de um loader terminam em momentos diferentes por município: as views são atualizadas no fim da fila
+    atualizar_views(get_db_engine(), [nome for nome, _ in etapas or ETAPAS])
+    publicar_metricas()
+    limpar_armazenamento()
+    logger.info(f"Fila concluída: {concluidos} jobs executados por estes workers.")
+    for loader, situacoes in fila_carga.resumo_fila(get_db_engine()).items():
+        logger.info(f"  {loader}: {', '.join(f'{total} {status}' for status, total in situacoes.items())}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="ETL dos dados abertos do TCE-CE",
+        epilog="Exemplo: python3 main.py despesas --municipios 057 --anos 2024 --meses 1-3"
+    )
+    parser.add_argument(
+        "loaders", nargs="*", metavar="loader",
+        help="Loaders a executar (ex.: load_receitas ou receitas); sem loaders, executa a carga completa"
+    )
+    parser.add_argument(
+        "--municipios", type=lambda valor: [codigo.strip().zfill(3) for codigo in valor.split(",") if codigo.strip()],
+        help="Códigos dos municípios separados por vírgula (ex.: 002,057)"
+    )
+    parser.add_argument("--anos", type=faixa_inteiros, help="Anos ou faixas (ex.: 2024 ou 2023-2024)")
+    parser.add_argument("--meses", type=faixa_inteiros, help="Meses ou faixas (ex.: 1-3,12)")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Número de processos; acima de 1 divide os municípios entre os workers, 0 usa todos os núcleos (padrão: 1)"
+    )
+    parser.add_argument(
+        "--refresh", action="store_true",
+        help="Modo de atualização: busca de novo os últimos N meses já carregados (ETL_REFRESH_MESES / ETL_REFRESH_JANELAS)"
+    )
+    parser.add_argument(
+        "--forcar", action="store_true",
+        help="Busca de novo as partições selecionadas mesmo que já carregadas (recarga pontual)"
+    )
+    parser.add_argument(
+        "--planejar", action="store_true",
+        help="Simula a carga selecionada: partições pendentes, chamadas à API e tempo estimados (sem API e sem escrita)"
+    )
+    parser.add_argument(
+        "--metricas", action="store_true",
+        help="Imprime as métricas da última execução no formato do Prometheus e encerra"
+    )
+    parser.add_argument(
+        "--exportar-parquet", nargs="*", metavar="tabela", choices=list(TABELAS_EXPORTACAO),
+        help="Exporta as tabelas de fatos e os resumos mensais (padrão: todas) para Parquet, só os (município, ano) alterados, e encerra"
+    )
+    parser.add_argument(
+        "--verificar-indices", action="store_true",
+        help="Lista os índices usados pelas consultas do dashboard (EXPLAIN) e encerra"
+    )
+    parser.add_argument(
+        "--fila", action="store_true",
+        help="Enfileira os jobs (loader, município) em fila_carga e os consome; execuções sobrepostas não repetem trabalho"
+    )
+    parser.add_argument(
+        "--worker", action="store_true",
+        help="Apenas consome a fila_carga já enfileirada (para somar workers de outras máquinas); período e modo vêm de cada job"
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true",
+        help="Log detalhado (nível DEBUG): cada requisição e cada partição já processada"
+    )
+    args = parser.parse_args(argv)
+    if args.workers == 0:
+        args.workers = os.cpu_count() or 1
+
+    validos = {"load_municipios"} | {nome for nome, _ in ETAPAS}
+    desconhecidos = [nome for nome in args.loaders if (nome if nome.startswith("load_") else f"load_{nome}") not in validos]
+    if desconhecidos:
+        parser.error(f"loaders desconhecidos: {', '.join(desconhecidos)} (disponíveis: {', '.join(sorted(validos))})")
+    if any(mes < 1 or mes > 12 for mes in args.meses or []):
+        parser.error("--meses aceita valores de 1 a 12")
+    return args
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.verbose:
+        # Pela variável de ambiente o nível também chega aos workers
+        os.environ["ETL_LOG_NIVEL"] = "DEBUG"
+        LOG_CONFIG["nivel"] = "DEBUG"
+    configurar_logging()
+    if args.refresh:
+        # Pela variável de ambiente o modo também chega aos workers (spawn reimporta config)
+        os.environ["ETL_REFRESH"] = "1"
+        REFRESH_CONFIG["ativo"] = True
+        logger.info(f"Modo de atualização: recarregando os últimos {REFRESH_CONFIG['meses_padrao']} meses (janelas por tipo: {REFRESH_CONFIG['janelas'] or 'padrão'}).")
+    if args.forcar:
+        os.environ["ETL_FORCAR"] = "1"
+        REFRESH_CONFIG["forcar"] = True
+        logger.info("Recarga forçada das partições selecionadas.")
+    if args.anos or args.meses:
+        # Também pelas variáveis de ambiente, para chegar aos workers (spawn reimporta config)
+        if args.anos:
+            os.environ["ETL_ANOS"] = ",".join(map(str, args.anos))
+            PERIODO_CONFIG["anos"] = args.anos
+        if args.meses:
+            os.environ["ETL_MESES"] = ",".join(map(str, args.meses))
+            PERIODO_CONFIG["meses"] = args.meses
+        logger.info(f"Período selecionado: anos {PERIODO_CONFIG['anos'] or 'padrão'}, meses {PERIODO_CONFIG['meses'] or 'todos'}.")
+
+    execucao_atual()  # Identificador da execução, herdado pelos workers pela variável de ambiente
 
+    # Com loaders selecionados a carga é pontual: sem setup do banco e sem recarregar municípios
+    carga_completa = not args.loaders
+    etapas = selecionar_etapas(args.loaders)
 
+    if args.verificar_indices:
+        verificar_uso_indices(get_db_engine())
+    elif args.metricas:
+        print(exportar_prometheus(get_db_engine()), end="")
+    elif args.exportar_parquet is not None:
+        exportar_parquet(get_db_engine(), args.exportar_parquet, args.municipios)
+    elif args.planejar:
+        imprimir_plano(planejar([nome for nome, _ in etapas], args.municipios))
+    else:
+        if {"load_municipios", "municipios"} & set(args.loaders):
+            load_municipios()
+        if carga_completa or etapas:
+            if args.fila or args.worker:
+                main_fila(args.workers, enfileirar=not args.worker, etapas=etapas, municipios=args.municipios, carga_completa=carga_completa)
+            elif args.workers > 1:
+                main_sharded(args.workers, etapas, args.municipios, carga_completa)
+            else:
+                main(etapas, args.municipios, carga_completa)
@@ -0,0 +1,172 @@
+# metricas.py
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import text
+from config import METRICAS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Limites (segundos) do histograma de latência das requisições à API
+BUCKETS_LATENCIA = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+def execucao_atual():
+    """Identificador da execução do ETL (compartilhado com os workers pela variável de ambiente)."""
+    return os.environ.setdefault("ETL_EXECUCAO", datetime.now().strftime("%Y%m%d%H%M%S"))
+
+def _rotulos(**valores):
+    return ",".join(f'{nome}="{valor}"' for nome, valor in valores.items())
+
+class ColetorMetricas:
+    """Contadores por endpoint da API e por loader, no formato de métricas do Prometheus.
+
+    Cada amostra é (métrica, rótulos, valor); os valores são acumulados desde a última gravação
+    em etl_metrics, de modo que a soma das linhas de uma execução dá o total de todos os processos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.valores = {}
+        self.linhas_confirmadas = 0
+
+    def _somar(self, metrica, rotulos, valor=1):
+        chave = (metrica, rotulos)
+        self.valores[chave] = self.valores.get(chave, 0) + valor
+
+    def registrar_requisicao(self, endpoint, segundos, status=None, bytes_=0, decode=0.0, retries=0, erro=None):
+        """Registra uma requisição: latência, status HTTP, bytes, tempo de decodificação e retries."""
+        rotulos = _rotulos(endpoint=endpoint)
+        with self._lock:
+            self._somar("etl_api_requisicoes_total", rotulos)
+            self._somar("etl_api_retries_total", rotulos, retries)
+            self._somar("etl_api_bytes_total", rotulos, bytes_)
+            self._somar("etl_api_decode_segundos_total", rotulos, decode)
+            if erro:
+                self._somar("etl_api_erros_total", _rotulos(endpoint=endpoint, classe=erro))
+            elif status == 429:
+                # Limite de requisições da API (throttling), separado dos demais 4xx
+                self._somar("etl_api_erros_total", _rotulos(endpoint=endpoint, classe="429"))
+            elif status is not None and status >= 400:
+                self._somar("etl_api_erros_total", _rotulos(endpoint=endpoint, classe=f"{status // 100}xx"))
+            for limite in BUCKETS_LATENCIA:
+                if segundos <= limite:
+                    self._somar("etl_api_latencia_segundos_bucket", _rotulos(endpoint=endpoint, le=limite))
+            self._somar("etl_api_latencia_segundos_bucket", _rotulos(endpoint=endpoint, le="+Inf"))
+            self._somar("etl_api_latencia_segundos_sum", rotulos, segundos)
+            self._somar("etl_api_latencia_segundos_count", rotulos)
+
+    def somar_linhas(self, linhas):
+        """Linhas confirmadas (commit) pelos loaders; base da vazão por loader."""
+        with self._lock:
+            self.linhas_confirmadas += linhas
+
+    @contextmanager
+    def medir_loader(self, loader):
+        """Mede duração e linhas confirmadas de um loader (um loader por vez em cada processo)."""
+        inicio = time.perf_counter()
+        linhas_antes = self.linhas_confirmadas
+        try:
+            yield
+        finally:
+            rotulos = _rotulos(loader=loader)
+            with self._lock:
+                self._somar("etl_loader_segundos_total", rotulos, time.perf_counter() - inicio)
+                self._somar("etl_loader_linhas_total", rotulos, self.linhas_confirmadas - linhas_antes)
+
+    def drenar(self):
+        """Retorna as amostras acumuladas e zera os contadores."""
+        with self._lock:
+            amostras = sorted((metrica, rotulos, valor) for (metrica, rotulos), valor in self.valores.items())
+            self.valores = {}
+        return amostras
+
+_coletor = None
+_coletor_pid = None
+_coletor_lock = threading.Lock()
+
+def get_metricas():
+    """Retorna o coletor do processo (recriado após fork)."""
+    global _coletor, _coletor_pid
+    with _coletor_lock:
+        if _coletor is None or _coletor_pid != os.getpid():
+            _coletor = ColetorMetricas()
+            _coletor_pid = os.getpid()
+        return _coletor
+
+def formatar_prometheus(amostras):
+    """Formato de exposição em texto do Prometheus a partir de (métrica, rótulos, valor)."""
+    linhas = []
+    tipos_declarados = set()
+    for metrica, rotulos, valor in amostras:
+        base = metrica.rsplit("_", 1)[0] if metrica.endswith(("_bucket", "_sum", "_count")) else metrica
+        if base not in tipos_declarados:
+            tipo = "histogram" if base != metrica else "counter"
+            linhas.append(f"# TYPE {base} {tipo}")
+            tipos_declarados.add(base)
+        linhas.append(f"{metrica}{{{rotulos}}} {float(valor):.10g}")
+    return "\n".join(linhas) + "\n"
+
+def gravar_metricas(engine):
+    """Grava em etl_metrics as amostras acumuladas no processo desde a última gravação (e as zera)."""
+    amostras = get_metricas().drenar()
+    if not amostras:
+        return 0
+    marcadores = []
+    params = {"execucao": execucao_atual(), "processo": f"{socket.gethostname()}:{os.getpid()}"}
+    for i, (metrica, rotulos, valor) in enumerate(amostras):
+        marcadores.append(f"(:execucao, :processo, :metrica{i}, :rotulos{i}, :valor{i})")
+        params.update({f"metrica{i}": metrica, f"rotulos{i}": rotulos, f"valor{i}": valor})
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            INSERT INTO etl_metrics (execucao, processo, metrica, rotulos, valor)
+            VALUES {', '.join(marcadores)}
+        """), params)
+    return len(amostras)
+
+def metricas_da_execucao(engine, execucao=None):
+    """Soma as amostras de etl_metrics de uma execução (padrão: a mais recente) entre todos os processos."""
+    with engine.connect() as conn:
+        return conn.execute(text("""
+            SELECT metrica, rotulos, SUM(valor)
+            FROM etl_metrics
+            WHERE execucao = COALESCE(:execucao, (SELECT execucao FROM etl_metrics ORDER BY coletado_em DESC LIMIT 1))
+            GROUP BY metrica, rotulos
+            ORDER BY metrica, rotulos
+        """), {"execucao": execucao}).fetchall()
+
+def exportar_prometheus(engine, execucao=None):
+    """Métricas da execução em formato Prometheus; grava também em METRICAS_CONFIG["arquivo"] (textfile collector)."""
+    conteudo = formatar_prometheus(metricas_da_execucao(engine, execucao))
+    if METRICAS_CONFIG["arquivo"]:
+        temporario = f"{METRICAS_CONFIG['arquivo']}.tmp"
+        with open(temporario, "w") as arquivo:
+            arquivo.write(conteudo)
+        os.replace(temporario, METRICAS_CONFIG["arquivo"])
+    return conteudo
+
+def log_resumo_metricas(engine, execucao=None):
+    """Imprime a latência média e os erros por endpoint e a vazão (linhas/s) por loader da execução."""
+    valores = {}
+    for metrica, rotulos, valor in metricas_da_execucao(engine, execucao):
+        if metrica.endswith("_bucket"):
+            continue
+        nome = rotulos.split('"')[1]  # endpoint ou loader (primeiro rótulo)
+        por_nome = valores.setdefault(nome, {})
+        por_nome[metrica] = por_nome.get(metrica, 0) + float(valor)
+
+    for nome, m in sorted(valores.items()):
+        if "etl_api_requisicoes_total" in m:
+            requisicoes = m["etl_api_requisicoes_total"]
+            logger.info(
+                f"Endpoint {nome}: {requisicoes:.0f} requisições, latência média "
+                f"{m.get('etl_api_latencia_segundos_sum', 0) / requisicoes:.2f}s, {m.get('etl_api_retries_total', 0):.0f} retries, "
+                f"{m.get('etl_api_erros_total', 0):.0f} erros, {m.get('etl_api_bytes_total', 0) / 1e6:.1f} MB"
+            )
+        if "etl_loader_segundos_total" in m:
+            segundos = m["etl_loader_segundos_total"]
+            linhas = m.get("etl_loader_linhas_total", 0)
+            logger.info(f"Loader {nome}: {linhas:.0f} linhas em {segundos:.1f}s ({linhas / segundos if segundos else 0:.0f} linhas/s)")
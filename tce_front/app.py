@@ -3,9 +3,10 @@ import dash_bootstrap_components as dbc
 from callbacks import register_callbacks
 from layout import app_layout
 from flask_caching import Cache
-from flask import request, send_file
+from flask import request, send_file, Response
 import pdfkit
 from flask_cors import CORS
+from utils.database import estatisticas_pool, metricas_etl_prometheus
 
 # Inicialização do app
 app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], suppress_callback_exceptions=True)
@@ -58,6 +59,16 @@ def generate_pdf():
     except Exception as e:
         return {"error": str(e)}, 500
 
+# Métricas do pool de conexões com o banco (dimensionamento de DB_POOL_SIZE/DB_MAX_OVERFLOW)
+@app.server.route('/metrics/pool', methods=['GET'])
+def metricas_pool():
+    return estatisticas_pool()
+
+# Métricas da última execução do ETL (latência e erros por endpoint da API, vazão por loader) para o Prometheus
+@app.server.route('/metrics/etl', methods=['GET'])
+def metricas_etl():
+    return Response(metricas_etl_prometheus(), mimetype='text/plain; version=0.0.4')
+
 # Rodar o servidor
 if __name__ == '__main__':
     app.run_server(debug=True, host='0.0.0.0', port=8040)
\ No newline at end of file
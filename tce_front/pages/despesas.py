@@ -85,10 +85,15 @@ def render_content(municipio_id, ano):
             "query": """
                 SELECT 
                     ano::text AS ano, 
-                    SUM(distinct valor_fixado_orcamento_bal_despesa) AS valor_fixado,
-                    SUM(distinct valor_liquidado_no_mes) AS valor_executado
-                FROM despesa
-                WHERE municipio_id = '{municipio_id}'
+                    SUM(valor_fixado) FILTER (WHERE mes = ultimo_mes) AS valor_fixado,
+                    SUM(valor_liquidado) AS valor_executado
+                FROM (
+                    -- A dotação fixada é anual e se repete em todo balancete mensal: usa só o último mês carregado
+                    SELECT ano, mes, valor_fixado, valor_liquidado,
+                           MAX(mes) OVER (PARTITION BY ano) AS ultimo_mes
+                    FROM resumo_despesa_mensal
+                    WHERE municipio_id = '{municipio_id}'
+                ) despesa_ano
                 GROUP BY ano
                 ORDER BY ano;
             """,
@@ -111,10 +116,10 @@ def render_content(municipio_id, ano):
             "query": """
                 SELECT 
                     TO_CHAR(TO_DATE(ano || '-' || mes || '-01', 'YYYY-MM-DD'), 'Month YYYY') AS mes_ano, 
-                    SUM(distinct valor_empenhado_no_mes) as valor_empenhado,
-                    SUM(distinct valor_liquidado_no_mes) as valor_liquidado,
-                    SUM(distinct valor_pago_no_mes) as valor_pago
-                FROM despesa
+                    SUM(valor_empenhado) as valor_empenhado,
+                    SUM(valor_liquidado) as valor_liquidado,
+                    SUM(valor_pago) as valor_pago
+                FROM resumo_despesa_mensal
                 WHERE municipio_id = '{municipio_id}' AND ano = '{ano}'
                 GROUP BY ano,mes
                 ORDER BY ano,mes;
@@ -139,8 +144,8 @@ def render_content(municipio_id, ano):
                 SELECT 
                     ano,
                     mes, 
-                    SUM(distinct valor_liquidado_no_mes) AS valor_liquidado
-                FROM despesa
+                    SUM(valor_liquidado) AS valor_liquidado
+                FROM resumo_despesa_mensal
                 WHERE ano = '{ano}'
                 GROUP BY ano, mes
                 ORDER BY ano, mes;
@@ -164,7 +169,7 @@ def render_content(municipio_id, ano):
                 SELECT 
                     status AS descricao_status, 
                     SUM(valor_estimado) as valorestimado
-                FROM licitacao
+                FROM mv_licitacao_totais
                 WHERE municipio_id = '{municipio_id}' AND status IS NOT NULL
                 GROUP BY status;
             """,
@@ -188,7 +193,7 @@ def render_content(municipio_id, ano):
                 SELECT 
                     modalidade AS descricao_modalidade, 
                     SUM(valor_estimado) as valorestimado
-                FROM licitacao
+                FROM mv_licitacao_totais
                 WHERE municipio_id = '{municipio_id}' AND modalidade IS NOT NULL
                 GROUP BY modalidade;
             """,
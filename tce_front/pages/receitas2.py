@@ -45,10 +45,15 @@ def render_content(municipio_id, ano):
             "query": """
                 SELECT 
                     ano::text AS ano, 
-                    SUM(distinct valor_previsto_orcamento) AS valor_previsto,
-                    SUM(distinct valor_arrecadado_no_mes) AS valor_arrecadado
-                FROM receita
-                WHERE municipio_id = '{municipio_id}'
+                    SUM(valor_previsto) FILTER (WHERE mes = ultimo_mes) AS valor_previsto,
+                    SUM(valor_arrecadado) AS valor_arrecadado
+                FROM (
+                    -- A previsão é anual e se repete em todo balancete mensal: usa só o último mês carregado
+                    SELECT ano, mes, valor_previsto, valor_arrecadado,
+                           MAX(mes) OVER (PARTITION BY ano) AS ultimo_mes
+                    FROM resumo_receita_mensal
+                    WHERE municipio_id = '{municipio_id}'
+                ) receita_ano
                 GROUP BY ano
                 ORDER BY ano;
             """,
@@ -70,8 +75,8 @@ def render_content(municipio_id, ano):
             "query": """
                 SELECT 
                     TO_CHAR(TO_DATE(mes || '-' || '01' || '-' || ano, 'MM-DD-YYYY'), 'Month YYYY') AS mes_ano, 
-                    SUM(distinct valor_arrecadado_no_mes) as valor_arrecadado_no_mes
-                FROM receita
+                    SUM(valor_arrecadado) as valor_arrecadado_no_mes
+                FROM resumo_receita_mensal
                 WHERE municipio_id = '{municipio_id}'
                 GROUP BY ano, mes
                 ORDER BY ano, mes;
@@ -90,23 +95,11 @@ def render_content(municipio_id, ano):
         "receita_por_origem": {
             "query": """
                 SELECT 
-                    CASE 
-                        WHEN codigo_rubrica LIKE '1.1%' THEN 'Receitas Tributárias'
-                        WHEN codigo_rubrica LIKE '1.2%' THEN 'Receitas de Contribuições'
-                        WHEN codigo_rubrica LIKE '1.3%' THEN 'Receita Patrimonial'
-                        WHEN codigo_rubrica LIKE '1.7%' THEN 'Transferências Correntes'
-                        ELSE 'Outras Receitas'
-                    END AS tipo_receita,
-                    SUM(distinct valor_arrecadado_no_mes) AS valor_arrecadado_por_origem
-                FROM receita
-                WHERE municipio_id = '{municipio_id}' AND codigo_rubrica IS NOT NULL
-                GROUP BY CASE 
-                        WHEN codigo_rubrica LIKE '1.1%' THEN 'Receitas Tributárias'
-                        WHEN codigo_rubrica LIKE '1.2%' THEN 'Receitas de Contribuições'
-                        WHEN codigo_rubrica LIKE '1.3%' THEN 'Receita Patrimonial'
-                        WHEN codigo_rubrica LIKE '1.7%' THEN 'Transferências Correntes'
-                        ELSE 'Outras Receitas'
-                    END
+                    origem AS tipo_receita,
+                    SUM(valor_arrecadado) AS valor_arrecadado_por_origem
+                FROM resumo_receita_mensal
+                WHERE municipio_id = '{municipio_id}' AND origem IS NOT NULL
+                GROUP BY origem
                 ORDER BY valor_arrecadado_por_origem ASC;
             """,
             "id_vars": ["tipo_receita"],
@@ -125,31 +118,11 @@ def render_content(municipio_id, ano):
         "receita_transferencia": {
             "query": """
                 SELECT 
-                    CASE 
-                        WHEN codigo_rubrica LIKE '1.7.1%' THEN 'Transferências da União'
-                        WHEN codigo_rubrica LIKE '1.7.2%' THEN 'Transferências dos Estados'
-                        WHEN codigo_rubrica LIKE '1.7.3%' THEN 'Transferências dos Municípios'
-                        WHEN codigo_rubrica LIKE '1.7.4%' THEN 'Transferências Multigovernamentais'
-                        WHEN codigo_rubrica LIKE '1.7.5%' THEN 'Transferências de Consórcios Públicos'
-                        WHEN codigo_rubrica LIKE '1.7.6%' THEN 'Transferências do Exterior'
-                        WHEN codigo_rubrica LIKE '1.7.7%' THEN 'Transferências de Pessoas'
-                        WHEN codigo_rubrica LIKE '1.7.8%' THEN 'Transferências de Convênios'
-                        ELSE 'Outras Transferências'
-                    END AS tipo_receita,
-                    SUM(distinct valor_arrecadado_no_mes) AS valor_arrecadado_por_origem
-                FROM receita
-                WHERE municipio_id = '{municipio_id}' AND codigo_rubrica LIKE '1.7%'
-                GROUP BY CASE 
-                        WHEN codigo_rubrica LIKE '1.7.1%' THEN 'Transferências da União'
-                        WHEN codigo_rubrica LIKE '1.7.2%' THEN 'Transferências dos Estados'
-                        WHEN codigo_rubrica LIKE '1.7.3%' THEN 'Transferências dos Municípios'
-                        WHEN codigo_rubrica LIKE '1.7.4%' THEN 'Transferências Multigovernamentais'
-                        WHEN codigo_rubrica LIKE '1.7.5%' THEN 'Transferências de Consórcios Públicos'
-                        WHEN codigo_rubrica LIKE '1.7.6%' THEN 'Transferências do Exterior'
-                        WHEN codigo_rubrica LIKE '1.7.7%' THEN 'Transferências de Pessoas'
-                        WHEN codigo_rubrica LIKE '1.7.8%' THEN 'Transferências de Convênios'
-                        ELSE 'Outras Transferências'
-                    END
+                    subcategoria AS tipo_receita,
+                    SUM(valor_arrecadado) AS valor_arrecadado_por_origem
+                FROM resumo_receita_mensal
+                WHERE municipio_id = '{municipio_id}' AND origem = 'Transferências Correntes'
+                GROUP BY subcategoria
                 ORDER BY valor_arrecadado_por_origem ASC;
             """,
             "id_vars": ["tipo_receita"],
@@ -168,21 +141,11 @@ def render_content(municipio_id, ano):
         "receita_tributaria": {
             "query": """
                 SELECT 
-                    CASE 
-                        WHEN codigo_rubrica LIKE '1.1.1%' THEN 'Impostos'
-                        WHEN codigo_rubrica LIKE '1.1.2%' THEN 'Taxas'
-                        WHEN codigo_rubrica LIKE '1.1.3%' THEN 'Contribuição de Melhoria'
-                        ELSE 'Outras Receitas Tributárias'
-                    END AS tipo_receita,
-                    SUM(distinct valor_arrecadado_no_mes) AS valor_arrecadado_por_origem
-                FROM receita
-                WHERE municipio_id = '{municipio_id}' AND codigo_rubrica LIKE '1.1%'
-                GROUP BY CASE 
-                        WHEN codigo_rubrica LIKE '1.1.1%' THEN 'Impostos'
-                        WHEN codigo_rubrica LIKE '1.1.2%' THEN 'Taxas'
-                        WHEN codigo_rubrica LIKE '1.1.3%' THEN 'Contribuição de Melhoria'
-                        ELSE 'Outras Receitas Tributárias'
-                    END
+                    subcategoria AS tipo_receita,
+                    SUM(valor_arrecadado) AS valor_arrecadado_por_origem
+                FROM resumo_receita_mensal
+                WHERE municipio_id = '{municipio_id}' AND origem = 'Receitas Tributárias'
+                GROUP BY subcategoria
                 ORDER BY valor_arrecadado_por_origem ASC;
             """,
             "id_vars": ["tipo_receita"],
@@ -0,0 +1,93 @@
+"""
+Compara os backends de consulta (PostgreSQL x DuckDB sobre os snapshots Parquet) nas páginas de despesas e receitas.
+
+Para cada página renderiza o conteúdo com os dois backends, mede a latência da página e de cada consulta
+e confere se os resultados são iguais. Uso, a partir de tce_front (com os snapshots já exportados):
+
+    python -m utils.benchmark_backends --municipio 5 --ano 2024 --repeticoes 5
+"""
+import argparse
+import statistics
+import time
+from decimal import Decimal
+
+import pandas as pd
+
+from pages import despesas, receitas2
+from utils import database
+
+PAGINAS = {'despesas': despesas, 'receitas2': receitas2}
+BACKENDS = ('postgres', 'duckdb')
+
+def executar_pagina(pagina, municipio_id, ano):
+    """
+    Renderiza a página registrando (sql, DataFrame, segundos) de cada consulta feita por query_db.
+    """
+    consultas = []
+    query_db = pagina.query_db
+
+    def medir(sql_query):
+        inicio = time.perf_counter()
+        df = query_db(sql_query)
+        consultas.append((sql_query, df, time.perf_counter() - inicio))
+        return df
+
+    pagina.query_db = medir
+    try:
+        inicio = time.perf_counter()
+        pagina.render_content(municipio_id, ano)
+        total = time.perf_counter() - inicio
+    finally:
+        pagina.query_db = query_db
+    return total, consultas
+
+def _normalizar(df):
+    """
+    Tipos comparáveis entre os backends: NUMERIC do PostgreSQL chega como Decimal, no DuckDB como float.
+    """
+    df = df.reset_index(drop=True).copy()
+    for coluna in df.columns:
+        if df[coluna].map(lambda valor: isinstance(valor, Decimal)).any():
+            df[coluna] = df[coluna].astype(float)
+    return df
+
+def resultados_iguais(a, b):
+    try:
+        pd.testing.assert_frame_equal(_normalizar(a), _normalizar(b), check_dtype=False, rtol=1e-9)
+        return True
+    except AssertionError:
+        return False
+
+def comparar(municipio_id, ano, repeticoes):
+    backend_original = database.QUERY_BACKEND
+    try:
+        for nome, pagina in PAGINAS.items():
+            tempos = {}
+            resultados = {}
+            for backend in BACKENDS:
+                database.QUERY_BACKEND = backend
+                executar_pagina(pagina, municipio_id, ano)  # aquecimento (conexões, views do DuckDB)
+                medicoes = [executar_pagina(pagina, municipio_id, ano) for _ in range(repeticoes)]
+                tempos[backend] = (
+                    statistics.median(total for total, _ in medicoes),
+                    [statistics.median(consultas[i][2] for _, consultas in medicoes) for i in range(len(medicoes[0][1]))],
+                )
+                resultados[backend] = [df for _, df, _ in medicoes[0][1]]
+
+            (pagina_pg, consultas_pg), (pagina_duck, consultas_duck) = tempos['postgres'], tempos['duckdb']
+            print(f"Página {nome}: postgres {pagina_pg * 1000:.1f} ms, duckdb {pagina_duck * 1000:.1f} ms "
+                  f"({pagina_pg / pagina_duck if pagina_duck else 0:.1f}x)")
+            for i, (pg, duck) in enumerate(zip(consultas_pg, consultas_duck)):
+                iguais = resultados_iguais(resultados['postgres'][i], resultados['duckdb'][i])
+                print(f"  consulta {i + 1}: postgres {pg * 1000:.1f} ms, duckdb {duck * 1000:.1f} ms, "
+                      f"resultados {'iguais' if iguais else 'DIFERENTES'}")
+    finally:
+        database.QUERY_BACKEND = backend_original
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Latência por página: PostgreSQL x DuckDB (snapshots Parquet)")
+    parser.add_argument('--municipio', required=True, help="municipio_id usado pelas páginas")
+    parser.add_argument('--ano', required=True, type=int)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+    comparar(args.municipio, args.ano, args.repeticoes)
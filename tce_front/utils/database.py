@@ -1,9 +1,12 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 import pandas as pd
 from functools import lru_cache
 
 # Configuração de conexão - usando variáveis de ambiente como no backend
+import glob
 import os
+import re
+import threading
 
 DB_CONFIG = {
     'host': os.getenv('DB_HOST', 'localhost'),
@@ -13,14 +16,147 @@ DB_CONFIG = {
     'password': os.getenv('DB_PASSWORD', 'postgres')
 }
 
-# Criação do engine SQLAlchemy
+# Pool de conexões: mesmas variáveis do backend (tce_back/config.py, DB_POOL_CONFIG).
+# O container do frontend contém apenas tce_front, por isso a configuração é espelhada aqui.
+DB_POOL_CONFIG = {
+    'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+    'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '10')),
+    'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', '30')),
+    'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+    'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', '1') == '1',
+}
+
+# Criação do engine SQLAlchemy (único por processo, compartilhado por todas as páginas)
 DB_URI = f"postgresql+psycopg2://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
-engine = create_engine(DB_URI)
+engine = create_engine(DB_URI, **DB_POOL_CONFIG)
+
+# Métricas do pool para dimensionamento (checkouts, conexões abertas, pico em uso)
+_metricas_pool = {'checkouts': 0, 'conexoes_abertas': 0, 'em_uso': 0, 'pico_em_uso': 0}
+_metricas_lock = threading.Lock()
+
+@event.listens_for(engine, "connect")
+def _ao_conectar(dbapi_connection, connection_record):
+    with _metricas_lock:
+        _metricas_pool['conexoes_abertas'] += 1
+
+@event.listens_for(engine, "checkout")
+def _ao_retirar(dbapi_connection, connection_record, connection_proxy):
+    with _metricas_lock:
+        _metricas_pool['checkouts'] += 1
+        _metricas_pool['em_uso'] += 1
+        _metricas_pool['pico_em_uso'] = max(_metricas_pool['pico_em_uso'], _metricas_pool['em_uso'])
+
+@event.listens_for(engine, "checkin")
+def _ao_devolver(dbapi_connection, connection_record):
+    with _metricas_lock:
+        _metricas_pool['em_uso'] = max(_metricas_pool['em_uso'] - 1, 0)
+
+def estatisticas_pool():
+    """
+    Retorna as métricas do pool de conexões do dashboard.
+    """
+    with _metricas_lock:
+        stats = dict(_metricas_pool)
+    stats['capacidade'] = DB_POOL_CONFIG['pool_size'] + DB_POOL_CONFIG['max_overflow']
+    stats['status'] = engine.pool.status()
+    return stats
+
+def metricas_etl_prometheus():
+    """
+    Métricas da última execução do ETL (tabela etl_metrics, somadas entre os workers) no formato do Prometheus.
+    """
+    try:
+        with engine.connect() as connection:
+            linhas = connection.execute(text("""
+                SELECT metrica, rotulos, SUM(valor)
+                FROM etl_metrics
+                WHERE execucao = (SELECT execucao FROM etl_metrics ORDER BY coletado_em DESC LIMIT 1)
+                GROUP BY metrica, rotulos
+                ORDER BY metrica, rotulos
+            """)).fetchall()
+    except Exception as e:
+        print(f"Erro ao ler métricas do ETL: {e}")
+        return ""
+    return "".join(f"{metrica}{{{rotulos}}} {float(valor):.10g}\n" for metrica, rotulos, valor in linhas)
+
+# Backend das consultas analíticas: 'postgres' (padrão) ou 'duckdb', um DuckDB embutido que lê os snapshots
+# Parquet das tabelas de fatos exportados pelo ETL (tce_back/main.py --exportar-parquet, mesmo ETL_EXPORTACAO_DIR).
+# Consultas que usam tabelas fora dos snapshots (municipio, licitacao...) continuam no PostgreSQL.
+QUERY_BACKEND = os.getenv('DASH_QUERY_BACKEND', 'postgres')
+PARQUET_DIR = os.getenv('ETL_EXPORTACAO_DIR', 'data/parquet')
+# Os resumos mensais lidos pelas páginas também são exportados: a classificação das receitas fica só no ETL
+# (tce_back/database/resumo_mensal.py) e o DuckDB lê o mesmo resultado que o PostgreSQL
+TABELAS_PARQUET = (
+    'receita', 'despesa', 'notas_empenho', 'liquidacoes', 'agentes_publicos',
+    'resumo_receita_mensal', 'resumo_despesa_mensal',
+)
+
+# Funções do PostgreSQL usadas pelas páginas e ausentes no DuckDB (apenas os formatos usados nas consultas;
+# 'Month' ocupa 9 caracteres, como no PostgreSQL)
+MACROS_DUCKDB = [
+    """
+    CREATE MACRO to_date(s, f) AS CAST(CASE f
+        WHEN 'YYYY-MM-DD' THEN strptime(s, '%Y-%m-%d')
+        WHEN 'MM-DD-YYYY' THEN strptime(s, '%m-%d-%Y')
+    END AS DATE)
+    """,
+    """
+    CREATE MACRO to_char(d, f) AS replace(replace(f, 'Month', rpad(strftime(d, '%B'), 9, ' ')), 'YYYY', strftime(d, '%Y'))
+    """,
+]
+
+_duckdb = None
+_duckdb_tabelas = set()
+_duckdb_lock = threading.Lock()
+_duckdb_local = threading.local()
+
+def _cursor_duckdb():
+    """
+    Cursor DuckDB da thread corrente. A conexão (em memória) é criada uma vez; a cada chamada as tabelas ainda
+    sem view são conferidas de novo, de modo que tabelas exportadas depois do início do dashboard já entram.
+    """
+    global _duckdb
+    with _duckdb_lock:
+        if _duckdb is None:
+            import duckdb
+            conexao = duckdb.connect()
+            for macro in MACROS_DUCKDB:
+                conexao.execute(macro)
+            _duckdb = conexao
+        for tabela in TABELAS_PARQUET:
+            if tabela in _duckdb_tabelas:
+                continue
+            arquivos = os.path.join(PARQUET_DIR, tabela, '*', '*', '*.parquet')
+            if glob.glob(arquivos):
+                # O glob é avaliado a cada consulta: arquivos regravados pela exportação incremental já entram
+                _duckdb.execute(
+                    f"CREATE VIEW {tabela} AS SELECT * FROM read_parquet('{arquivos}', hive_partitioning = false)"
+                )
+                _duckdb_tabelas.add(tabela)
+    if getattr(_duckdb_local, 'cursor', None) is None:
+        _duckdb_local.cursor = _duckdb.cursor()
+    return _duckdb_local.cursor
+
+def _usa_duckdb(sql_query):
+    """
+    Indica se a consulta roda no DuckDB: backend configurado e todas as tabelas lidas estão nos snapshots.
+    """
+    if QUERY_BACKEND != 'duckdb':
+        return False
+    _cursor_duckdb()
+    tabelas = set(re.findall(r'\b(?:FROM|JOIN)\s+([a-z_][a-z0-9_]*)', sql_query, re.IGNORECASE))
+    return bool(tabelas) and {tabela.lower() for tabela in tabelas} <= _duckdb_tabelas
 
 def query_db(sql_query):
     """
     Executa uma query SQL no banco de dados PostgreSQL usando SQLAlchemy e retorna um DataFrame do Pandas.
+    Com DASH_QUERY_BACKEND=duckdb, consultas sobre as tabelas de fatos rodam no DuckDB (ver _usa_duckdb).
     """
+    if _usa_duckdb(sql_query):
+        try:
+            return _cursor_duckdb().execute(sql_query).df()
+        except Exception as e:
+            print(f"Erro ao executar a query no DuckDB, usando o PostgreSQL: {e}")
     try:
         with engine.connect() as connection:
             df = pd.read_sql_query(sql_query, connection)
@@ -32,7 +168,14 @@ def query_db(sql_query):
 def query_db_params(sql_query: str, params: dict):
     """
     Executa uma query SQL parametrizada usando SQLAlchemy text() para evitar injeção.
+    No DuckDB os parâmetros :nome viram $nome (casts ::tipo não são afetados).
     """
+    if _usa_duckdb(sql_query):
+        try:
+            sql_duckdb = re.sub(r'(?<![:\w]):([a-zA-Z_]\w*)', r'$\1', sql_query)
+            return _cursor_duckdb().execute(sql_duckdb, params).df()
+        except Exception as e:
+            print(f"Erro ao executar a query parametrizada no DuckDB, usando o PostgreSQL: {e}")
     try:
         with engine.connect() as connection:
             result = connection.execute(text(sql_query), params)